@@ -1,13 +1,53 @@
 # app.py
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import (
+    Flask, render_template, request, redirect, url_for, flash, jsonify, make_response, session, Response,
+    stream_with_context, send_file, send_from_directory, g, abort,
+)
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text, and_, or_
+import click
+from sqlalchemy import text, and_, or_, event, select, bindparam, inspect as sa_inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.orm import Session, joinedload, contains_eager, validates
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime, timedelta, date, time, UTC
 import os
 import json
+import math
+import threading
+import hashlib
+import hmac
+import secrets
+import queue
+import csv
+import io
+import zipfile
+import zlib
+import mimetypes
+import sys
+import sqlite3
+from array import array
+from bisect import bisect_right
+from xml.sax.saxutils import escape as xml_escape
+from time import monotonic
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from config import config
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the forecaster falls back to the roster engine
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; background jobs then run in every process
+    fcntl = None
+
 # Minimum rest hours required between consecutive shifts (used in swap validation)
 MIN_REST_HOURS = 8
 
@@ -17,6 +57,50 @@ MAX_WORK_HOURS_PER_24H = 16
 # Minimum effective overlap for extra-car coverage/capacity counting
 EXTRA_CAR_MIN_PARTIAL_HOURS = 2.0
 
+# Limits for the what-if swap planner and batch swap validation endpoints
+SWAP_PLAN_MAX_DAYS = 62
+SWAP_BATCH_MAX_PROPOSALS = 100
+
+# Longest date range the working-time compliance report will scan in one go
+COMPLIANCE_MAX_DAYS = 366
+
+# Longest date range the extra-car auto-fill planner will cover in one plan
+AUTOFILL_MAX_DAYS = 31
+
+# Longest date range a roster export may cover, and drivers resolved per roster window
+EXPORT_MAX_DAYS = 366
+EXPORT_DRIVER_BATCH = 50
+
+# Days before and after today published in iCalendar feeds
+ICS_PAST_DAYS = 14
+ICS_FUTURE_DAYS = 90
+
+# Most days of daily sheets rendered into a single PDF
+DAILY_SHEET_PDF_MAX_DAYS = 31
+
+# Cache lifetime for content-hashed bundles; their URL changes with their content
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Precompressed sibling suffixes written by scripts/build_js_bundles.py, in preference order
+STATIC_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Hour at which the operational day rolls over (dispatch sees yesterday's roster until then)
+OPERATIONAL_DAY_START_HOUR = 6
+
+# Resolution of the cars-working curve, and rosters kept per process for it
+CARS_WORKING_CURVE_STEP_MINUTES = 15
+CARS_WORKING_CACHE_SIZE = 16
+
+# Most rows accepted by one bulk pattern assignment or CSV import
+BULK_ASSIGNMENT_MAX_ROWS = 5000
+
+# Drivers written per INSERT ... ON CONFLICT batch by the driver CSV import (and read per batch on export)
+DRIVER_IMPORT_BATCH = 500
+
+# Default and maximum horizon (in weeks) for the coverage forecast page
+FORECAST_DEFAULT_WEEKS = 13
+FORECAST_MAX_WEEKS = 53
+
 # -----------------------------------------------------------------------------
 # App Setup
 # -----------------------------------------------------------------------------
@@ -60,9 +144,106 @@ def get_bundle_manifest():
 
 
 def bundle_url(bundle_name):
+    """Resolve a logical bundle name (JS or CSS) to its hashed static URL."""
+    resolved = get_bundle_manifest().get("bundles", {}).get(bundle_name)
+    if resolved is None:
+        # Unbuilt tree: fall back to the unhashed source locations
+        resolved = f"css/{bundle_name}" if bundle_name.endswith(".css") else f"js/bundles/{bundle_name}"
+    return url_for("static", filename=resolved)
+
+
+@app.endpoint("static")
+def serve_static(filename):
+    """Serve static files, preferring precompressed bundles and caching hashed names forever."""
     manifest = get_bundle_manifest()
-    resolved_name = manifest.get(bundle_name, bundle_name)
-    return url_for("static", filename=f"js/bundles/{resolved_name}")
+    hashed = filename in manifest.get("encodings", {})
+    available = manifest.get("encodings", {}).get(filename, ())
+
+    response = None
+    for encoding, suffix in STATIC_PRECOMPRESSED:
+        if encoding in available and request.accept_encodings[encoding] > 0:
+            compressed = filename + suffix
+            if not os.path.exists(os.path.join(app.static_folder, compressed)):
+                continue
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(app.static_folder, compressed, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = send_from_directory(app.static_folder, filename)
+
+    if hashed:
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
+
+# -----------------------------------------------------------------------------
+# Read Snapshots
+# -----------------------------------------------------------------------------
+
+# GET endpoints that must not hold a read transaction open (static files, endless streams)
+READ_SNAPSHOT_EXCLUDED_ENDPOINTS = {'static', 'live_roster_stream'}
+
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Apply the configured journal mode; WAL lets snapshot readers and writers proceed side by side."""
+    journal_mode = app.config.get('SQLITE_JOURNAL_MODE')
+    if not journal_mode or not str(journal_mode).isalpha() or not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+    finally:
+        cursor.close()
+
+
+def begin_read_snapshot():
+    """Run the rest of the request's queries in one read transaction on one session.
+
+    Every loader goes through ``db.session``, so all of a page's SELECTs see
+    the same committed state instead of straddling a concurrent commit, and
+    SQLite skips the per-statement implicit transaction. The session keeps
+    loaded objects across any commit the view makes (``expire_on_commit``).
+    """
+    session = db.session()
+    session.expire_on_commit = False
+    already_open = session.in_transaction()
+    connection = session.connection()
+    if connection.dialect.name == 'sqlite':
+        # pysqlite only opens transactions before writes; start the read one explicitly
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN DEFERRED")
+    elif not already_open:
+        # the isolation level can only be set before the transaction's first query
+        connection.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    g.read_snapshot = True
+
+
+def end_read_snapshot():
+    """Close the request's read transaction and restore default session behaviour."""
+    if not g.pop('read_snapshot', False):
+        return
+    session = db.session()
+    session.rollback()
+    session.expire_on_commit = True
+
+
+@app.before_request
+def open_read_snapshot():
+    if not app.config.get('READ_SNAPSHOT_GETS'):
+        return
+    if request.method not in ('GET', 'HEAD') or request.endpoint in READ_SNAPSHOT_EXCLUDED_ENDPOINTS:
+        return
+    begin_read_snapshot()
+
+
+@app.teardown_request
+def close_read_snapshot(exc=None):
+    end_read_snapshot()
 
 # -----------------------------------------------------------------------------
 # Database Models
@@ -78,6 +259,8 @@ class Driver(db.Model):
     assistance_guide_dogs_exempt = db.Column(db.Boolean, default=False)
     electric_vehicle = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=utc_now)
+    # Bumped on commit whenever this driver's own scheduling inputs change
+    schedule_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     assignments = db.relationship('DriverAssignment', backref='driver', lazy=True, cascade='all, delete-orphan')
@@ -103,40 +286,66 @@ class Driver(db.Model):
         """Get the driver's current shift pattern assignment"""
         if not target_date:
             target_date = datetime.now().date()
-            
-        assignment = DriverAssignment.query.filter(
-            DriverAssignment.driver_id == self.id,
-            DriverAssignment.start_date <= target_date,
-            db.or_(
-                DriverAssignment.end_date.is_(None),
-                DriverAssignment.end_date >= target_date
-            )
-        ).first()
-        
-        return assignment
+
+        assignments = get_assignments_active_on(self.id, target_date)
+        return assignments[0] if assignments else None
 
 class ShiftPattern(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
     description = db.Column(db.Text)
     cycle_length = db.Column(db.Integer, nullable=False)  # number of days in cycle
-    pattern_data = db.Column(db.Text, nullable=False)  # JSON string of daily shift assignments
+    # JSON import/export form; deferred because reads go through the packed columns below
+    pattern_data = db.deferred(db.Column(db.Text, nullable=False))
+    # Packed form: distinct day combinations ("early,late" per line) plus one uint16 code per cycle day
+    day_shift_keys = db.Column(db.Text, nullable=False, default='', server_default='')
+    pattern_codes = db.Column(db.LargeBinary, nullable=False, default=b'')
     created_at = db.Column(db.DateTime, default=utc_now)
     
     # Relationships
     assignments = db.relationship('DriverAssignment', backref='shift_pattern', lazy=True, cascade='all, delete-orphan')
+    # Normalized (cycle_day, shift_type) index, rebuilt whenever pattern_data changes
+    day_shifts = db.relationship('PatternDayShift', lazy=True, cascade='all, delete-orphan')
     
-    # Helper method to get pattern as list
+    # Helper method to get pattern as list (JSON export form)
     def get_pattern_data(self):
-        try:
-            return json.loads(self.pattern_data)
-        except (json.JSONDecodeError, TypeError):
-            return []
+        return [compact_day_shifts(day_shifts) for day_shifts in self.get_day_shifts()]
     
     # Helper method to set pattern data
     def set_pattern_data(self, pattern_list):
         normalized_pattern = [compact_day_shifts(day_entry) for day_entry in pattern_list]
         self.pattern_data = json.dumps(normalized_pattern)
+
+    @validates('pattern_data')
+    def _pack_pattern_data(self, key, value):
+        """Keep the packed columns in step with every write of the JSON form."""
+        try:
+            pattern_list = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            pattern_list = []
+        if not isinstance(pattern_list, list):
+            pattern_list = []
+        self.day_shift_keys, self.pattern_codes = pack_pattern_days(
+            [normalize_day_shifts(day_entry) for day_entry in pattern_list]
+        )
+        return value
+
+    def get_day_shift_keys(self):
+        """Return the pattern's distinct day combinations, decoded once per instance."""
+        cached = self.__dict__.get('_day_shift_keys_cache')
+        if cached is None or cached[0] is not self.day_shift_keys:
+            cached = (self.day_shift_keys, unpack_day_shift_keys(self.day_shift_keys))
+            self.__dict__['_day_shift_keys_cache'] = cached
+        return cached[1]
+
+    def get_cycle_codes(self):
+        """Return the per-cycle-day combination codes as a uint16 sequence."""
+        return unpack_cycle_codes(self.pattern_codes)
+
+    def get_day_shifts(self):
+        """Return normalized shift lists for every cycle day."""
+        keys = self.get_day_shift_keys()
+        return [list(keys[code]) for code in self.get_cycle_codes()]
     
     # Get count of unique drivers assigned to this pattern
     def get_unique_driver_count(self):
@@ -171,11 +380,76 @@ class ShiftPattern(db.Model):
         return None
 
     def get_shifts_for_day(self, cycle_day):
-        pattern = self.get_pattern_data()
-        if 0 <= cycle_day < len(pattern):
-            return normalize_day_shifts(pattern[cycle_day])
+        codes = self.get_cycle_codes()
+        if 0 <= cycle_day < len(codes):
+            return list(self.get_day_shift_keys()[codes[cycle_day]])
         return []
 
+class PatternDayShift(db.Model):
+    """One row per shift type worked on a pattern's cycle day, for indexed usage lookups."""
+    __tablename__ = 'pattern_day_shift'
+
+    pattern_id = db.Column(db.Integer, db.ForeignKey('shift_pattern.id', ondelete='CASCADE'), primary_key=True)
+    cycle_day = db.Column(db.Integer, primary_key=True)  # 0-based day in cycle
+    shift_type = db.Column(db.String(50), primary_key=True, index=True)
+
+
+def build_pattern_day_shifts(pattern):
+    """Return the PatternDayShift rows describing a pattern's current data."""
+    return [
+        PatternDayShift(cycle_day=cycle_day, shift_type=shift_type)
+        for cycle_day, day_shifts in enumerate(pattern.get_day_shifts())
+        for shift_type in day_shifts
+    ]
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_pattern_day_shifts(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty):
+        if not isinstance(obj, ShiftPattern):
+            continue
+        state = sa_inspect(obj)
+        if state.pending or state.attrs.pattern_data.history.has_changes():
+            obj.day_shifts = build_pattern_day_shifts(obj)
+
+
+def rebuild_pattern_day_shifts():
+    """Backfill the pattern_day_shift index from every pattern's packed data."""
+    db.session.execute(PatternDayShift.__table__.delete())
+    rows = [
+        {'pattern_id': pattern.id, 'cycle_day': row.cycle_day, 'shift_type': row.shift_type}
+        for pattern in ShiftPattern.query.all()
+        for row in build_pattern_day_shifts(pattern)
+    ]
+    if rows:
+        db.session.execute(PatternDayShift.__table__.insert(), rows)
+    return len(rows)
+
+
+def get_shift_type_usage():
+    """Map shift types to the patterns using them and how many drivers those patterns cover."""
+    usage = {}
+    pattern_rows = (
+        db.session.query(PatternDayShift.shift_type, ShiftPattern)
+        .join(ShiftPattern, ShiftPattern.id == PatternDayShift.pattern_id)
+        .distinct()
+        .order_by(ShiftPattern.name)
+        .all()
+    )
+    for shift_type, pattern in pattern_rows:
+        usage.setdefault(shift_type, {'patterns': [], 'driver_count': 0})['patterns'].append(pattern)
+    driver_counts = (
+        db.session.query(PatternDayShift.shift_type, db.func.count(db.distinct(DriverAssignment.driver_id)))
+        .join(DriverAssignment, DriverAssignment.shift_pattern_id == PatternDayShift.pattern_id)
+        .group_by(PatternDayShift.shift_type)
+        .all()
+    )
+    for shift_type, count in driver_counts:
+        if shift_type in usage:
+            usage[shift_type]['driver_count'] = count
+    return usage
+
+
 # Add Shift Timing Configuration Model
 class ShiftTiming(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -204,17 +478,27 @@ class ShiftTiming(db.Model):
 
     def get_patterns_using_shift(self):
         """Get list of patterns that use this shift type."""
-        patterns = []
-        all_patterns = ShiftPattern.query.all()
-        for pattern in all_patterns:
-            pattern_data = pattern.get_pattern_data()
-            for day_entry in pattern_data:
-                # Handle both single shift and list of shifts
-                day_shifts = day_entry if isinstance(day_entry, list) else [day_entry]
-                if self.shift_type in day_shifts:
-                    patterns.append(pattern)
-                    break  # Found in this pattern, no need to check further days
-        return patterns
+        return (
+            ShiftPattern.query
+            .filter(ShiftPattern.id.in_(
+                select(PatternDayShift.pattern_id).where(PatternDayShift.shift_type == self.shift_type)
+            ))
+            .order_by(ShiftPattern.id)
+            .all()
+        )
+
+    def get_drivers_using_shift(self):
+        """Get drivers with any assignment to a pattern that uses this shift type."""
+        return (
+            Driver.query
+            .filter(Driver.id.in_(
+                select(DriverAssignment.driver_id)
+                .join(PatternDayShift, PatternDayShift.pattern_id == DriverAssignment.shift_pattern_id)
+                .where(PatternDayShift.shift_type == self.shift_type)
+            ))
+            .order_by(Driver.driver_number)
+            .all()
+        )
 
 
 # Driver Custom Timing Configuration Model
@@ -265,7 +549,17 @@ class DriverCustomTiming(db.Model):
             DriverCustomTiming.assignment_id.is_(None)
         ).order_by(DriverCustomTiming.priority).all()
         candidates.extend(driver_wide)
-        
+
+        return DriverCustomTiming.select_custom_timing(candidates, assignment_id, shift_type, cycle_day, weekday)
+
+    @staticmethod
+    def select_custom_timing(timings, assignment_id, shift_type, cycle_day, weekday):
+        """Pick the winning custom timing from an already-loaded list of a driver's timings."""
+        candidates = [
+            timing for timing in timings
+            if timing.assignment_id is None or (assignment_id and timing.assignment_id == assignment_id)
+        ]
+
         # Collect all matches, then choose deterministically by:
         # assignment-specific > driver-wide, lower priority number, higher specificity
         matching_candidates = []
@@ -445,6 +739,9 @@ class ExtraCarRequest(db.Model):
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=utc_now)
 
+    # Statuses chosen by hand that coverage changes never overwrite
+    MANUAL_STATUSES = ('DRAFT', 'CLOSED')
+
     assignments = db.relationship(
         'ExtraCarAssignment',
         back_populates='request',
@@ -452,10 +749,13 @@ class ExtraCarRequest(db.Model):
         order_by='ExtraCarAssignment.created_at',
     )
 
-    def get_time_window(self):
+    def get_time_window(self, timings_dict=None):
         """Return (start_datetime, end_datetime) for this request."""
         if self.request_type == 'shift_type' and self.shift_type:
-            timing = ShiftTiming.query.filter_by(shift_type=self.shift_type).first()
+            if timings_dict is not None:
+                timing = timings_dict.get(self.shift_type)
+            else:
+                timing = ShiftTiming.query.filter_by(shift_type=self.shift_type).first()
             if not timing or not timing.start_time or not timing.end_time:
                 return None, None
             start_dt = datetime.combine(self.date, timing.start_time)
@@ -476,9 +776,9 @@ class ExtraCarRequest(db.Model):
             return '—'
         return f"{start_dt.strftime('%H:%M')} – {end_dt.strftime('%H:%M')}"
 
-    def _get_valid_coverage_intervals(self):
+    def _get_valid_coverage_intervals(self, timings_dict=None):
         """Return (req_start, req_end, valid_intervals) for coverage/capacity checks."""
-        req_start, req_end = self.get_time_window()
+        req_start, req_end = self.get_time_window(timings_dict)
         if not req_start or not req_end:
             return None, None, []
 
@@ -570,7 +870,7 @@ class ExtraCarRequest(db.Model):
         best = max(candidates, key=lambda item: (item[1] - item[0]).total_seconds())
         return best
 
-    def compute_coverage(self):
+    def compute_coverage(self, timings_dict=None):
         """
                 Compute how many slot lanes are fully covered for the whole request window.
 
@@ -581,7 +881,7 @@ class ExtraCarRequest(db.Model):
                 - Any valid assignment activity (even if not continuous) yields PARTIALLY_FILLED status.
                 - Returns (filled_slots, suggested_status).
         """
-        req_start, req_end, valid = self._get_valid_coverage_intervals()
+        req_start, req_end, valid = self._get_valid_coverage_intervals(timings_dict)
         if not req_start or not req_end:
             return 0, self.status
 
@@ -644,8 +944,8 @@ class ExtraCarRequest(db.Model):
                     break
                 filled_slots = threshold
 
-        if self.status == 'CLOSED':
-            return filled_slots, 'CLOSED'
+        if self.status in self.MANUAL_STATUSES:
+            return filled_slots, self.status
 
         if self.unlimited:
             new_status = 'PARTIALLY_FILLED' if has_any_coverage else 'OPEN'
@@ -660,6 +960,13 @@ class ExtraCarRequest(db.Model):
 
         return filled_slots, new_status
 
+    def refresh_status(self):
+        """Store the coverage-derived status (DRAFT and CLOSED are kept); returns filled slots."""
+        filled_slots, new_status = self.compute_coverage()
+        if self.status not in self.MANUAL_STATUSES:
+            self.status = new_status
+        return filled_slots
+
 
 class ExtraCarAssignment(db.Model):
     """A car/driver assignment to an ExtraCarRequest."""
@@ -681,16 +988,16 @@ class ExtraCarAssignment(db.Model):
     request = db.relationship('ExtraCarRequest', back_populates='assignments')
     driver = db.relationship('Driver', backref=db.backref('extra_assignments', lazy=True))
 
-    def effective_start(self):
+    def effective_start(self, timings_dict=None):
         """Return the effective start datetime for this assignment."""
-        req_start, req_end = self.request.get_time_window()
+        req_start, req_end = self.request.get_time_window(timings_dict)
         if self.start_time and req_start:
             return resolve_request_relative_datetime(req_start, req_end, self.start_time)
         return req_start
 
-    def effective_end(self):
+    def effective_end(self, timings_dict=None):
         """Return the effective end datetime for this assignment."""
-        req_start, req_end = self.request.get_time_window()
+        req_start, req_end = self.request.get_time_window(timings_dict)
         if self.end_time and req_end:
             return resolve_request_relative_datetime(req_start, req_end, self.end_time)
         return req_end
@@ -719,40 +1026,220 @@ class AppSetting(db.Model):
     value = db.Column(db.String(255), nullable=False)
     updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
 
+
+class Job(db.Model):
+    """A background job queued through ``enqueue_job``; status and result are kept for polling."""
+    __tablename__ = 'job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    # Idempotency key: re-queuing the same work returns the existing job
+    job_key = db.Column(db.String(255), nullable=True, unique=True)
+    params = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='QUEUED', index=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=utc_now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def get_params(self):
+        return json.loads(self.params or '{}')
+
+    def get_result(self):
+        return json.loads(self.result) if self.result else None
+
+    @property
+    def is_finished(self):
+        return self.status in ('SUCCEEDED', 'FAILED')
+
+    def is_stale(self, now=None):
+        """True when a queued or running job has outlived ``JOB_STALE_SECONDS`` (its process likely died)."""
+        if self.is_finished:
+            return False
+        limit = app.config.get('JOB_STALE_SECONDS', 3600)
+        last_activity = self.started_at or self.created_at
+        return last_activity is not None and (now or utc_now()) - last_activity > timedelta(seconds=limit)
+
+    def result_file_missing(self):
+        """True when a finished job's result file has since been pruned from ``JOB_RESULTS_DIR``."""
+        filename = (self.get_result() or {}).get('file') if self.status == 'SUCCEEDED' else None
+        return bool(filename) and not os.path.isfile(os.path.join(get_job_results_dir(), filename))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'job_key': self.job_key,
+            'status': self.status,
+            'result': self.get_result(),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
 # -----------------------------------------------------------------------------
-# Initialization
+# Pattern Storage Helpers
 # -----------------------------------------------------------------------------
 
-with app.app_context():
-    db.create_all()
+def normalize_day_shifts(day_entry):
+    """Normalize a pattern day value into a deduplicated list of shift types."""
+    if day_entry is None:
+        return ['day_off']
 
-    existing_columns = {
-        row[1]
-        for row in db.session.execute(text("PRAGMA table_info(shift_timing)")).fetchall()
-    }
+    if isinstance(day_entry, str):
+        values = [day_entry]
+    elif isinstance(day_entry, list):
+        values = day_entry
+    else:
+        return ['day_off']
+
+    cleaned = []
+    seen = set()
+    for value in values:
+        shift = str(value).strip()
+        if not shift or shift == 'day_off':
+            continue
+        if shift not in seen:
+            cleaned.append(shift)
+            seen.add(shift)
+
+    if len(cleaned) > 1:
+        timing_order = {
+            timing.shift_type: (timing.start_time, timing.end_time, timing.shift_type)
+            for timing in ShiftTiming.query.filter(ShiftTiming.shift_type.in_(cleaned)).all()
+        }
+
+        cleaned.sort(
+            key=lambda shift: (
+                shift not in timing_order,
+                timing_order.get(shift, (None, None, shift))[0] is None,
+                timing_order.get(shift, (None, None, shift))[0] or datetime.max.time(),
+                timing_order.get(shift, (None, None, shift))[1] is None,
+                timing_order.get(shift, (None, None, shift))[1] or datetime.max.time(),
+                shift,
+            )
+        )
 
-    if 'display_name' not in existing_columns:
-        db.session.execute(text("ALTER TABLE shift_timing ADD COLUMN display_name VARCHAR(100)"))
+    return cleaned or ['day_off']
 
-    if 'badge_color' not in existing_columns:
-        db.session.execute(text("ALTER TABLE shift_timing ADD COLUMN badge_color VARCHAR(50) DEFAULT 'bg-primary'"))
+def compact_day_shifts(day_entry):
+    """Return day_off, a single shift string, or a list for multi-shift days."""
+    normalized = normalize_day_shifts(day_entry)
+    if normalized == ['day_off']:
+        return 'day_off'
+    if len(normalized) == 1:
+        return normalized[0]
+    return normalized
 
-    if 'icon' not in existing_columns:
-        db.session.execute(text("ALTER TABLE shift_timing ADD COLUMN icon VARCHAR(100) DEFAULT 'fas fa-clock'"))
 
-    if 'parent_shift_type' not in existing_columns:
-        db.session.execute(text("ALTER TABLE shift_timing ADD COLUMN parent_shift_type VARCHAR(50)"))
+def pack_pattern_days(days):
+    """Pack normalized per-day shift lists into (day_shift_keys, pattern_codes)."""
+    keys = []
+    code_for_key = {}
+    codes = array('H')
+    for day_shifts in days:
+        key = ','.join(day_shifts)
+        code = code_for_key.get(key)
+        if code is None:
+            code = code_for_key[key] = len(keys)
+            keys.append(key)
+        codes.append(code)
+    if sys.byteorder != 'little':
+        codes.byteswap()
+    return '\n'.join(keys), codes.tobytes()
+
+
+def unpack_day_shift_keys(keys_text):
+    """Decode day_shift_keys into a tuple of shift-type tuples, indexed by code."""
+    if not keys_text:
+        return ()
+    return tuple(tuple(key.split(',')) for key in keys_text.split('\n'))
+
+
+def unpack_cycle_codes(blob):
+    """Return a uint16 view over packed cycle codes (zero-copy on little-endian hosts)."""
+    if not blob:
+        return ()
+    if sys.byteorder == 'little':
+        return memoryview(blob).cast('H')
+    codes = array('H')
+    codes.frombytes(blob)
+    codes.byteswap()
+    return codes
+
+
+def pattern_shift_matrix(pattern, type_index):
+    """Return a (cycle day x shift type) boolean NumPy matrix built straight from the packed codes."""
+    key_matrix = np.zeros((len(pattern.get_day_shift_keys()), len(type_index)), dtype=bool)
+    for code, day_shifts in enumerate(pattern.get_day_shift_keys()):
+        for shift_type in day_shifts:
+            if shift_type in type_index:
+                key_matrix[code, type_index[shift_type]] = True
+    codes = np.frombuffer(pattern.pattern_codes or b'', dtype='<u2')[:pattern.cycle_length]
+    matrix = np.zeros((pattern.cycle_length, len(type_index)), dtype=bool)
+    matrix[:len(codes)] = key_matrix[codes]
+    return matrix
 
-    if 'school_term_only' not in existing_columns:
-        db.session.execute(text("ALTER TABLE shift_timing ADD COLUMN school_term_only BOOLEAN DEFAULT 0"))
 
-    shift_swap_columns = {
-        row[1]
-        for row in db.session.execute(text("PRAGMA table_info(shift_swap)")).fetchall()
-    }
+# -----------------------------------------------------------------------------
+# Initialization
+# -----------------------------------------------------------------------------
+
+def add_missing_columns(table_name, columns):
+    """Add any of ``columns`` an existing table lacks, rendering the DDL for the current dialect."""
+    connection = db.session.connection()
+    existing = {column['name'] for column in sa_inspect(connection).get_columns(table_name)}
+    for column in columns:
+        if column.name not in existing:
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            db.session.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+
+
+with app.app_context():
+    db.create_all()
+
+    add_missing_columns('shift_timing', [
+        db.Column('display_name', db.String(100)),
+        db.Column('badge_color', db.String(50), server_default='bg-primary'),
+        db.Column('icon', db.String(100), server_default='fas fa-clock'),
+        db.Column('parent_shift_type', db.String(50)),
+        db.Column('school_term_only', db.Boolean, server_default=db.false()),
+    ])
+    add_missing_columns('driver', [
+        db.Column('schedule_version', db.Integer, nullable=False, server_default='0'),
+    ])
+    add_missing_columns('shift_swap', [
+        db.Column('work_shift_type', db.String(50)),
+    ])
+    add_missing_columns('shift_pattern', [
+        db.Column('day_shift_keys', db.Text, nullable=False, server_default=''),
+        db.Column('pattern_codes', db.LargeBinary),
+    ])
+
+    # Pack patterns saved before the packed columns existed
+    for pattern_id, pattern_json in db.session.execute(
+        text("SELECT id, pattern_data FROM shift_pattern WHERE pattern_codes IS NULL OR length(pattern_codes) = 0")
+    ).fetchall():
+        try:
+            pattern_list = json.loads(pattern_json)
+        except (json.JSONDecodeError, TypeError):
+            pattern_list = []
+        if not isinstance(pattern_list, list):
+            pattern_list = []
+        keys_text, codes = pack_pattern_days([normalize_day_shifts(day_entry) for day_entry in pattern_list])
+        db.session.execute(
+            text("UPDATE shift_pattern SET day_shift_keys = :keys, pattern_codes = :codes WHERE id = :id"),
+            {'keys': keys_text, 'codes': codes, 'id': pattern_id},
+        )
 
-    if 'work_shift_type' not in shift_swap_columns:
-        db.session.execute(text("ALTER TABLE shift_swap ADD COLUMN work_shift_type VARCHAR(50)"))
+    # Backfill the shift-type usage index for databases created before it existed
+    has_day_shift_rows = db.session.execute(text("SELECT 1 FROM pattern_day_shift LIMIT 1")).first()
+    has_patterns = db.session.execute(text("SELECT 1 FROM shift_pattern LIMIT 1")).first()
+    if has_patterns and not has_day_shift_rows:
+        rebuild_pattern_day_shifts()
 
     db.session.execute(
         text(
@@ -772,6 +1259,10 @@ with app.app_context():
             """
         )
     )
+
+    # The fleet calendar feed token is created here, so the pages that read it stay read-only
+    if db.session.get(AppSetting, 'calendar_feed_token') is None:
+        db.session.add(AppSetting(key='calendar_feed_token', value=secrets.token_urlsafe(24)))
     db.session.commit()
 
 # -----------------------------------------------------------------------------
@@ -910,24 +1401,36 @@ def calculate_hours(start_time, end_time, break_minutes=0):
     except (ValueError, TypeError):
         return 0.0
 
-def get_operational_date():
+def get_operational_date(now=None):
     """Get current operational date considering 6am crossover"""
-    now = datetime.now()
-    if now.hour < 6:
+    now = now or datetime.now()
+    if now.hour < OPERATIONAL_DAY_START_HOUR:
         # Before 6am, still previous operational day
         return (now - timedelta(days=1)).date()
     else:
         # 6am or later, current operational day
         return now.date()
 
-def get_drivers_count_by_shift(target_date):
+
+def get_next_operational_crossover(now=None):
+    """Return the datetime at which the next operational day starts."""
+    now = now or datetime.now()
+    crossover = now.replace(hour=OPERATIONAL_DAY_START_HOUR, minute=0, second=0, microsecond=0)
+    if crossover <= now:
+        crossover += timedelta(days=1)
+    return crossover
+
+def get_drivers_count_by_shift(target_date, drivers_by_shift=None):
     """Get count of drivers by shift type for a specific date"""
-    drivers_by_shift = get_drivers_for_date(target_date)
+    if drivers_by_shift is None:
+        drivers_by_shift = get_drivers_for_date(target_date)
     return {shift_type: len(drivers_list) for shift_type, drivers_list in drivers_by_shift.items()}
 
 
-def is_driver_on_holiday(driver_id, target_date):
+def is_driver_on_holiday(driver_id, target_date, roster=None):
     """Return True when the driver has an approved holiday on target_date."""
+    if roster is not None and roster.covers(driver_id, target_date):
+        return roster.is_on_holiday(driver_id, target_date)
     return (
         DriverHoliday.query.filter_by(driver_id=driver_id, holiday_date=target_date).first()
         is not None
@@ -935,104 +1438,125 @@ def is_driver_on_holiday(driver_id, target_date):
 
 def get_drivers_for_date(target_date):
     """Get all drivers working on a specific date with their shift assignments and timing info"""
-    all_timings = ShiftTiming.query.all()
-    timings_dict = {t.shift_type: t for t in all_timings}
+    return get_drivers_for_dates([target_date])[target_date]
 
-    # Pre-build buckets for top-level (non-sub) shift types only
-    drivers_working = {}
-    for t in all_timings:
-        if not t.parent_shift_type:
-            drivers_working[t.shift_type] = []
 
-    # Collect all driver IDs to check: pattern-based assignments + work-day swaps
-    assignments = get_active_assignments_for_date(target_date)
-    driver_ids = {a.driver_id for a in assignments}
+def get_drivers_for_dates(target_dates):
+    """Resolve get_drivers_for_date() for several dates from one preloaded RosterWindow."""
+    dates = sorted(set(target_dates))
+    if not dates:
+        return {}
 
-    # Also include drivers who are working via a swap on this date (they may
-    # have no matching pattern assignment for this date).
-    swap_workers = ShiftSwap.query.filter(
-        ShiftSwap.date_b == target_date,
-        ShiftSwap.work_shift_type.isnot(None),
-    ).with_entities(ShiftSwap.driver_a_id).all()
-    for row in swap_workers:
-        driver_ids.add(row.driver_a_id)
-
-    extra_workers = (
-        ExtraCarAssignment.query
-        .join(ExtraCarRequest, ExtraCarAssignment.request_id == ExtraCarRequest.id)
-        .filter(ExtraCarRequest.date == target_date)
-        .with_entities(ExtraCarAssignment.driver_id)
-        .all()
-    )
-    for row in extra_workers:
-        driver_ids.add(row.driver_id)
+    all_timings = ShiftTiming.query.all()
+    timings_dict = {t.shift_type: t for t in all_timings}
+    roster = RosterWindow(dates[0], dates[-1], timings_dict=timings_dict)
+
+    # Drivers to check per date: pattern assignments, work-day swaps and extra-car work
+    candidate_ids = {target_date: roster.candidate_driver_ids(target_date) for target_date in dates}
+    all_ids = set().union(*candidate_ids.values())
+    drivers = Driver.query.filter(Driver.id.in_(all_ids)).order_by(Driver.id).all() if all_ids else []
+
+    result = {}
+    for target_date in dates:
+        # Pre-build buckets for top-level (non-sub) shift types only
+        drivers_working = {}
+        for t in all_timings:
+            if not t.parent_shift_type:
+                drivers_working[t.shift_type] = []
+
+        for driver in drivers:
+            if driver.id not in candidate_ids[target_date]:
+                continue
+            effective_shifts = get_driver_shifts_for_date(
+                driver,
+                target_date,
+                timings_dict,
+                include_swaps=True,
+                include_extra=True,
+                roster=roster,
+            )
+            for entry in effective_shifts:
+                shift_type = entry['shift_type']
+                if shift_type == 'day_off':
+                    continue
 
-    if not driver_ids:
-        return drivers_working
+                driver_info = {
+                    'driver': driver,
+                    'start_time': entry['start_time'],
+                    'end_time': entry['end_time'],
+                    'is_custom': entry.get('is_override') or entry.get('is_custom_time'),
+                    'is_adjusted': entry['is_adjusted'],
+                    'timing_note': None,
+                    'shift_type': shift_type,
+                }
 
-    drivers = Driver.query.filter(Driver.id.in_(driver_ids)).all()
+                # Determine where to group this driver
+                current_timing = timings_dict.get(shift_type)
+                if current_timing and current_timing.parent_shift_type:
+                    # Sub-shift: group under parent bucket
+                    parent = current_timing.parent_shift_type
+                    if parent not in drivers_working:
+                        drivers_working[parent] = []
+                    drivers_working[parent].append(driver_info)
+                else:
+                    if shift_type not in drivers_working:
+                        drivers_working[shift_type] = []
+                    drivers_working[shift_type].append(driver_info)
 
-    for driver in drivers:
-        effective_shifts = get_driver_shifts_for_date(
-            driver,
-            target_date,
-            timings_dict,
-            include_swaps=True,
-            include_extra=True,
-        )
-        for entry in effective_shifts:
-            shift_type = entry['shift_type']
-            if shift_type == 'day_off':
-                continue
+        result[target_date] = drivers_working
 
-            driver_info = {
-                'driver': driver,
-                'start_time': entry['start_time'],
-                'end_time': entry['end_time'],
-                'is_custom': entry.get('is_override') or entry.get('is_custom_time'),
-                'is_adjusted': entry['is_adjusted'],
-                'timing_note': None,
-                'shift_type': shift_type,
-            }
+    return result
 
-            # Determine where to group this driver
-            current_timing = timings_dict.get(shift_type)
-            if current_timing and current_timing.parent_shift_type:
-                # Sub-shift: group under parent bucket
-                parent = current_timing.parent_shift_type
-                if parent not in drivers_working:
-                    drivers_working[parent] = []
-                drivers_working[parent].append(driver_info)
-            else:
-                if shift_type not in drivers_working:
-                    drivers_working[shift_type] = []
-                drivers_working[shift_type].append(driver_info)
 
-    return drivers_working
+def get_driver_shifts_for_date(driver, target_date, timings_dict=None, include_swaps=True, include_extra=False, roster=None):
+    """Resolve the driver's effective shift entries for one date.
 
+    When ``roster`` (a RosterWindow) covers the driver and date, every lookup is
+    answered from its preloaded data instead of per-date queries, and the
+    result is memoised on the window.
+    """
+    if roster is not None and not roster.covers(driver.id, target_date):
+        roster = None
+
+    if roster is not None:
+        cache_key = (driver.id, target_date, include_swaps, include_extra)
+        cached_entries = roster.shift_cache.get(cache_key)
+        if cached_entries is not None:
+            return list(cached_entries)
+        entries = _resolve_driver_shifts_for_date(
+            driver, target_date, timings_dict or roster.timings_dict, include_swaps, include_extra, roster
+        )
+        roster.shift_cache[cache_key] = entries
+        return list(entries)
 
-def get_driver_shifts_for_date(driver, target_date, timings_dict=None, include_swaps=True, include_extra=False):
     if timings_dict is None:
         all_timings = ShiftTiming.query.all()
         timings_dict = {timing.shift_type: timing for timing in all_timings}
 
+    return _resolve_driver_shifts_for_date(driver, target_date, timings_dict, include_swaps, include_extra, None)
+
+
+def _resolve_driver_shifts_for_date(driver, target_date, timings_dict, include_swaps, include_extra, roster):
     extra_entries = []
     if include_extra:
-        extra_assignments = (
-            ExtraCarAssignment.query
-            .join(ExtraCarRequest, ExtraCarAssignment.request_id == ExtraCarRequest.id)
-            .filter(
-                ExtraCarAssignment.driver_id == driver.id,
-                ExtraCarRequest.date == target_date,
+        if roster is not None:
+            extra_assignments = roster.extra_assignments_for(driver.id, target_date)
+        else:
+            extra_assignments = (
+                ExtraCarAssignment.query
+                .join(ExtraCarRequest, ExtraCarAssignment.request_id == ExtraCarRequest.id)
+                .filter(
+                    ExtraCarAssignment.driver_id == driver.id,
+                    ExtraCarRequest.date == target_date,
+                )
+                .order_by(ExtraCarAssignment.id.asc())
+                .all()
             )
-            .order_by(ExtraCarAssignment.id.asc())
-            .all()
-        )
 
         for extra_assignment in extra_assignments:
-            request_start, request_end = extra_assignment.request.get_time_window()
-            effective_start = extra_assignment.effective_start()
-            effective_end = extra_assignment.effective_end()
+            request_start, request_end = extra_assignment.request.get_time_window(timings_dict)
+            effective_start = extra_assignment.effective_start(timings_dict)
+            effective_end = extra_assignment.effective_end(timings_dict)
             if not request_start or not request_end or not effective_start or not effective_end:
                 continue
 
@@ -1044,8 +1568,8 @@ def get_driver_shifts_for_date(driver, target_date, timings_dict=None, include_s
             else:
                 # For shift_type requests: check if assignment times match the shift's nominal times
                 _timing = timings_dict.get(_req.shift_type)
-                assign_start = extra_assignment.effective_start()
-                assign_end = extra_assignment.effective_end()
+                assign_start = effective_start
+                assign_end = effective_end
                 if _timing and assign_start and assign_end:
                     shift_start_datetime = datetime.combine(target_date, _timing.start_time)
                     shift_end_datetime = datetime.combine(target_date, _timing.end_time)
@@ -1120,26 +1644,29 @@ def get_driver_shifts_for_date(driver, target_date, timings_dict=None, include_s
         if not timing or not timing.school_term_only:
             return True
         if school_term_day_allowed is None:
-            school_term_day_allowed = is_school_term_operational_day(target_date)
+            school_term_day_allowed = is_school_term_operational_day(target_date, roster=roster)
         return school_term_day_allowed
 
-    if is_driver_on_holiday(driver.id, target_date):
+    if is_driver_on_holiday(driver.id, target_date, roster=roster):
         return finalize_entries([])
 
     if include_swaps:
-        swaps_for_date = ShiftSwap.query.filter(
-            ShiftSwap.driver_a_id == driver.id,
-            ShiftSwap.driver_b_id == driver.id,
-            ShiftSwap.work_shift_type.isnot(None),
-            db.or_(
-                ShiftSwap.date_a == target_date,
-                ShiftSwap.date_b == target_date,
-            )
-        ).order_by(ShiftSwap.id.desc()).all()
+        if roster is not None:
+            swaps_for_date = roster.swaps_for(driver.id, target_date)
+        else:
+            swaps_for_date = ShiftSwap.query.filter(
+                ShiftSwap.driver_a_id == driver.id,
+                ShiftSwap.driver_b_id == driver.id,
+                ShiftSwap.work_shift_type.isnot(None),
+                db.or_(
+                    ShiftSwap.date_a == target_date,
+                    ShiftSwap.date_b == target_date,
+                )
+            ).order_by(ShiftSwap.id.desc()).all()
 
         work_day_swaps = [swap for swap in swaps_for_date if swap.date_b == target_date]
         if work_day_swaps:
-            latest_late_start, earliest_early_finish = get_adjustment_conflict_bounds(driver.id, target_date)
+            latest_late_start, earliest_early_finish = get_adjustment_conflict_bounds(driver.id, target_date, roster=roster)
             swap_entries = []
 
             for swap in work_day_swaps:
@@ -1190,21 +1717,20 @@ def get_driver_shifts_for_date(driver, target_date, timings_dict=None, include_s
         if give_up_only_swaps:
             return finalize_entries([build_day_off_entry(is_swap=True, swap_role='give_up')])
 
-    latest_late_start, earliest_early_finish = get_adjustment_conflict_bounds(driver.id, target_date)
+    latest_late_start, earliest_early_finish = get_adjustment_conflict_bounds(driver.id, target_date, roster=roster)
 
-    assignments = DriverAssignment.query.filter(
-        DriverAssignment.driver_id == driver.id,
-        DriverAssignment.start_date <= target_date,
-        db.or_(
-            DriverAssignment.end_date.is_(None),
-            DriverAssignment.end_date >= target_date
-        )
-    ).all()
+    if roster is not None:
+        assignments = roster.assignments_for(driver.id, target_date)
+    else:
+        assignments = get_assignments_active_on(driver.id, target_date)
 
     entries = []
     filtered_term_only_shift = False
     for assignment in assignments:
-        shift_types = assignment.get_shifts_for_date(target_date) or []
+        if roster is not None:
+            shift_types = roster.assignment_shifts_for_date(assignment, target_date)
+        else:
+            shift_types = assignment.get_shifts_for_date(target_date) or []
         if not shift_types:
             continue
 
@@ -1213,13 +1739,16 @@ def get_driver_shifts_for_date(driver, target_date, timings_dict=None, include_s
         weekday = target_date.weekday()
 
         for base_shift_type in shift_types:
-            custom_timing = DriverCustomTiming.get_custom_timing(
-                assignment.driver_id,
-                assignment.id,
-                base_shift_type,
-                cycle_day,
-                weekday
-            )
+            if roster is not None:
+                custom_timing = roster.custom_timing_for(assignment, base_shift_type, cycle_day, weekday)
+            else:
+                custom_timing = DriverCustomTiming.get_custom_timing(
+                    assignment.driver_id,
+                    assignment.id,
+                    base_shift_type,
+                    cycle_day,
+                    weekday
+                )
 
             effective_shift_type = base_shift_type
             if custom_timing and custom_timing.override_shift and custom_timing.override_shift in timings_dict:
@@ -1355,14 +1884,7 @@ def get_driver_adjustment_time_window(driver, target_date, timings_dict=None):
             school_term_day_allowed = is_school_term_operational_day(target_date)
         return school_term_day_allowed
 
-    assignments = DriverAssignment.query.filter(
-        DriverAssignment.driver_id == driver.id,
-        DriverAssignment.start_date <= target_date,
-        db.or_(
-            DriverAssignment.end_date.is_(None),
-            DriverAssignment.end_date >= target_date
-        )
-    ).all()
+    assignments = get_assignments_active_on(driver.id, target_date)
 
     window_starts = []
     window_ends = []
@@ -1420,17 +1942,23 @@ def get_driver_adjustment_time_window(driver, target_date, timings_dict=None):
     return min(window_starts), max(window_ends)
 
 
-def get_adjustment_conflict_bounds(driver_id, target_date, exclude_adjustment_id=None):
+def get_adjustment_conflict_bounds(driver_id, target_date, exclude_adjustment_id=None, roster=None):
     """Return (latest_late_start, earliest_early_finish) from existing adjustments on same date."""
-    query = ShiftAdjustment.query.filter(
-        ShiftAdjustment.driver_id == driver_id,
-        ShiftAdjustment.adjustment_date == target_date,
-    )
+    if roster is not None and roster.covers(driver_id, target_date):
+        adjustments = [
+            adjustment for adjustment in roster.adjustments_for(driver_id, target_date)
+            if exclude_adjustment_id is None or adjustment.id != exclude_adjustment_id
+        ]
+    else:
+        query = ShiftAdjustment.query.filter(
+            ShiftAdjustment.driver_id == driver_id,
+            ShiftAdjustment.adjustment_date == target_date,
+        )
 
-    if exclude_adjustment_id is not None:
-        query = query.filter(ShiftAdjustment.id != exclude_adjustment_id)
+        if exclude_adjustment_id is not None:
+            query = query.filter(ShiftAdjustment.id != exclude_adjustment_id)
 
-    adjustments = query.all()
+        adjustments = query.all()
     late_starts = [a.adjusted_time for a in adjustments if a.adjustment_type == 'late_start']
     early_finishes = [a.adjusted_time for a in adjustments if a.adjustment_type == 'early_finish']
 
@@ -1549,111 +2077,583 @@ def parse_positive_int(value):
         return None
     return parsed
 
-def normalize_day_shifts(day_entry):
-    """Normalize a pattern day value into a deduplicated list of shift types."""
-    if day_entry is None:
-        return ['day_off']
+def parse_day_shifts_from_form(form_data, day_index):
+    """Parse one day's shift selection(s) from submitted form data."""
+    day_key = f"day_{day_index}_shift"
+    values = [v for v in form_data.getlist(day_key) if str(v).strip()]
+    if not values:
+        return 'day_off'
 
-    if isinstance(day_entry, str):
-        values = [day_entry]
-    elif isinstance(day_entry, list):
-        values = day_entry
-    else:
-        return ['day_off']
+    normalized_values = [str(v).strip() for v in values]
+    if 'day_off' in normalized_values:
+        non_day_off = [v for v in normalized_values if v != 'day_off']
+        if non_day_off:
+            raise ValueError('Day Off cannot be combined with working shifts')
+        return 'day_off'
 
-    cleaned = []
-    seen = set()
-    for value in values:
-        shift = str(value).strip()
-        if not shift or shift == 'day_off':
-            continue
-        if shift not in seen:
-            cleaned.append(shift)
-            seen.add(shift)
+    return compact_day_shifts(normalized_values)
 
-    if len(cleaned) > 1:
-        timing_order = {
-            timing.shift_type: (timing.start_time, timing.end_time, timing.shift_type)
-            for timing in ShiftTiming.query.filter(ShiftTiming.shift_type.in_(cleaned)).all()
-        }
+def iter_pattern_shift_types(pattern_data):
+    """Yield all working shift types used by a pattern, including multi-shift days."""
+    for day_entry in pattern_data:
+        for shift_type in normalize_day_shifts(day_entry):
+            if shift_type != 'day_off':
+                yield shift_type
 
-        cleaned.sort(
-            key=lambda shift: (
-                shift not in timing_order,
-                timing_order.get(shift, (None, None, shift))[0] is None,
-                timing_order.get(shift, (None, None, shift))[0] or datetime.max.time(),
-                timing_order.get(shift, (None, None, shift))[1] is None,
-                timing_order.get(shift, (None, None, shift))[1] or datetime.max.time(),
-                shift,
+def compute_weekly_shift_counts(pattern_days):
+    """Return working-day counts for every 7-day window of a pattern cycle.
+
+    ``counts[s]`` is the number of working days in cycle days ``s .. s+6``
+    (wrapping around the cycle), built with a single sliding pass.
+    """
+    cycle_length = len(pattern_days)
+    if not cycle_length:
+        return []
+    working = [1 if any(st != 'day_off' for st in day) else 0 for day in pattern_days]
+    counts = [sum(working[i % cycle_length] for i in range(7))]
+    for start in range(1, cycle_length):
+        counts.append(counts[-1] - working[start - 1] + working[(start + 6) % cycle_length])
+    return counts
+
+class AssignmentTimeline:
+    """Per-driver interval index over assignments, sorted by start date.
+
+    Alongside each driver's start dates it keeps a running maximum of end
+    dates, so "active on a date" is a bisect plus a backward walk that stops
+    as soon as no earlier interval can still be open. Long pause/resume
+    chains therefore cost O(log n) per lookup instead of a scan or a query.
+    Items only need ``id``, ``driver_id``, ``start_date`` and ``end_date``.
+    """
+
+    def __init__(self, assignments):
+        by_driver = {}
+        for assignment in assignments:
+            by_driver.setdefault(assignment.driver_id, []).append(assignment)
+        self._timelines = {}
+        for driver_id, items in by_driver.items():
+            items.sort(key=lambda item: (item.start_date, item.id))
+            ends = [item.end_date or date.max for item in items]
+            max_ends = []
+            running = date.min
+            for end in ends:
+                running = max(running, end)
+                max_ends.append(running)
+            self._timelines[driver_id] = ([item.start_date for item in items], ends, max_ends, items)
+
+    def driver_ids(self):
+        return list(self._timelines)
+
+    def active_between(self, driver_id, start_date, end_date):
+        """Items for the driver overlapping [start_date, end_date], in id order."""
+        timeline = self._timelines.get(driver_id)
+        if timeline is None:
+            return []
+        starts, ends, max_ends, items = timeline
+        found = []
+        index = bisect_right(starts, end_date) - 1
+        while index >= 0 and max_ends[index] >= start_date:
+            if ends[index] >= start_date:
+                found.append(items[index])
+            index -= 1
+        found.sort(key=lambda item: item.id)
+        return found
+
+    def active_on(self, driver_id, target_date):
+        """Items for the driver active on target_date, in id order."""
+        return self.active_between(driver_id, target_date, target_date)
+
+    def all_active_between(self, start_date, end_date):
+        """Bulk form of ``active_between``: {driver_id: items} for drivers with any overlap."""
+        active = {}
+        for driver_id in self._timelines:
+            items = self.active_between(driver_id, start_date, end_date)
+            if items:
+                active[driver_id] = items
+        return active
+
+
+_assignment_timeline_cache = {"version": None, "timeline": None}
+_assignment_timeline_lock = threading.Lock()
+
+
+def get_assignment_timeline():
+    """Return the fleet-wide timeline of assignment spans, rebuilt when assignments change.
+
+    Entries are light (id, driver_id, start_date, end_date) rows. The cache is
+    keyed by the committed assignment version, so other processes' writes are
+    picked up by the next transaction. Within one transaction the version is
+    checked once: the timeline is kept in ``session.info`` until it ends.
+    """
+    session = db.session()
+    timeline = session.info.get('assignment_timeline')
+    if timeline is not None:
+        return timeline
+    version = get_roster_version(ASSIGNMENT_VERSION_KEY)
+    with _assignment_timeline_lock:
+        timeline = _assignment_timeline_cache["timeline"] if _assignment_timeline_cache["version"] == version else None
+    if timeline is None:
+        rows = session.execute(
+            select(
+                DriverAssignment.id, DriverAssignment.driver_id, DriverAssignment.start_date, DriverAssignment.end_date,
             )
-        )
+        ).all()
+        timeline = AssignmentTimeline(rows)
+        with _assignment_timeline_lock:
+            _assignment_timeline_cache["version"] = version
+            _assignment_timeline_cache["timeline"] = timeline
+    session.info['assignment_timeline'] = timeline
+    return timeline
 
-    return cleaned or ['day_off']
 
-def compact_day_shifts(day_entry):
-    """Return day_off, a single shift string, or a list for multi-shift days."""
-    normalized = normalize_day_shifts(day_entry)
-    if normalized == ['day_off']:
-        return 'day_off'
-    if len(normalized) == 1:
-        return normalized[0]
-    return normalized
+def _assignment_writes_pending():
+    """True when this session holds assignment changes the committed timeline cannot see yet.
 
-def parse_day_shifts_from_form(form_data, day_index):
-    """Parse one day's shift selection(s) from submitted form data."""
-    day_key = f"day_{day_index}_shift"
-    values = [v for v in form_data.getlist(day_key) if str(v).strip()]
-    if not values:
-        return 'day_off'
+    Pending changes are autoflushed first, as the query this replaces would
+    have been, so the before_flush flag answers; flushing a clean session is
+    a no-op. Only under ``no_autoflush`` are the pending objects scanned.
+    """
+    session = db.session()
+    if session.autoflush:
+        session.flush()
+    elif any(_changes_assignments(session, obj) for obj in (*session.new, *session.dirty, *session.deleted)):
+        return True
+    return bool(session.info.get('assignments_changed'))
 
-    normalized_values = [str(v).strip() for v in values]
-    if 'day_off' in normalized_values:
-        non_day_off = [v for v in normalized_values if v != 'day_off']
-        if non_day_off:
-            raise ValueError('Day Off cannot be combined with working shifts')
-        return 'day_off'
 
-    return compact_day_shifts(normalized_values)
+def load_assignments(assignment_ids):
+    """Return the assignments with the given ids, in id order.
+
+    Rows already in the session's identity map are reused; the rest are
+    loaded with a single IN query.
+    """
+    session = db.session()
+    found = {}
+    missing = []
+    for assignment_id in assignment_ids:
+        assignment = session.identity_map.get(session.identity_key(DriverAssignment, assignment_id))
+        if assignment is None:
+            missing.append(assignment_id)
+        else:
+            found[assignment_id] = assignment
+    if missing:
+        found.update(
+            (assignment.id, assignment)
+            for assignment in DriverAssignment.query.filter(DriverAssignment.id.in_(missing))
+        )
+    return [found[assignment_id] for assignment_id in sorted(found)]
+
+
+def get_assignments_active_on(driver_id, target_date):
+    """Get a driver's assignments active on target_date, in id order."""
+    if _assignment_writes_pending():
+        return DriverAssignment.query.filter(
+            DriverAssignment.driver_id == driver_id,
+            DriverAssignment.start_date <= target_date,
+            db.or_(
+                DriverAssignment.end_date.is_(None),
+                DriverAssignment.end_date >= target_date
+            )
+        ).order_by(DriverAssignment.id.asc()).all()
+    return load_assignments(span.id for span in get_assignment_timeline().active_on(driver_id, target_date))
+
+
+def get_active_assignment_ids(start_date, end_date):
+    """Return {driver_id: [assignment ids]} for assignments overlapping [start_date, end_date]."""
+    return {
+        driver_id: [span.id for span in spans]
+        for driver_id, spans in get_assignment_timeline().all_active_between(start_date, end_date).items()
+    }
 
-def iter_pattern_shift_types(pattern_data):
-    """Yield all working shift types used by a pattern, including multi-shift days."""
-    for day_entry in pattern_data:
-        for shift_type in normalize_day_shifts(day_entry):
-            if shift_type != 'day_off':
-                yield shift_type
 
 def get_active_assignments_for_date(target_date):
     """Get assignments active for a given date."""
-    return DriverAssignment.query.filter(
-        DriverAssignment.start_date <= target_date,
-        db.or_(
-            DriverAssignment.end_date.is_(None),
-            DriverAssignment.end_date >= target_date
+    if _assignment_writes_pending():
+        return DriverAssignment.query.filter(
+            DriverAssignment.start_date <= target_date,
+            db.or_(
+                DriverAssignment.end_date.is_(None),
+                DriverAssignment.end_date >= target_date
+            )
+        ).all()
+    assignment_ids = [
+        assignment_id
+        for ids in get_active_assignment_ids(target_date, target_date).values()
+        for assignment_id in ids
+    ]
+    return load_assignments(assignment_ids)
+
+
+# One statement expanding every assignment's pattern over a date range, per dialect.
+# Both join pattern_day_shift on the cycle day (days since start + start offset, modulo cycle length).
+ROSTER_EXPANSION_SQL = {
+    'postgresql': """
+        SELECT CAST(series.roster_day AS DATE) AS roster_date, a.driver_id, pds.shift_type
+        FROM driver_assignment AS a
+        JOIN shift_pattern AS p ON p.id = a.shift_pattern_id
+        CROSS JOIN LATERAL generate_series(
+            GREATEST(a.start_date, CAST(:start_date AS DATE)),
+            LEAST(COALESCE(a.end_date, CAST(:end_date AS DATE)), CAST(:end_date AS DATE)),
+            INTERVAL '1 day'
+        ) AS series(roster_day)
+        JOIN pattern_day_shift AS pds
+            ON pds.pattern_id = a.shift_pattern_id
+            AND pds.cycle_day = MOD(
+                CAST(series.roster_day AS DATE) - a.start_date + a.start_day_of_cycle - 1, p.cycle_length
+            )
+        WHERE a.start_date <= CAST(:end_date AS DATE)
+            AND (a.end_date IS NULL OR a.end_date >= CAST(:start_date AS DATE))
+            AND a.id NOT IN :excluded
+            AND pds.shift_type <> 'day_off'
+    """,
+    'sqlite': """
+        WITH RECURSIVE days(roster_day) AS (
+            SELECT DATE(:start_date)
+            UNION ALL
+            SELECT DATE(roster_day, '+1 day') FROM days WHERE roster_day < DATE(:end_date)
         )
-    ).all()
+        SELECT days.roster_day AS roster_date, a.driver_id, pds.shift_type
+        FROM driver_assignment AS a
+        JOIN shift_pattern AS p ON p.id = a.shift_pattern_id
+        JOIN days ON days.roster_day >= a.start_date AND (a.end_date IS NULL OR days.roster_day <= a.end_date)
+        JOIN pattern_day_shift AS pds
+            ON pds.pattern_id = a.shift_pattern_id
+            AND pds.cycle_day = (
+                CAST(julianday(days.roster_day) - julianday(a.start_date) AS INTEGER) + a.start_day_of_cycle - 1
+            ) % p.cycle_length
+        WHERE a.id NOT IN :excluded
+            AND pds.shift_type <> 'day_off'
+    """,
+}
+
+
+def expand_pattern_roster(start_date, end_date, exclude_assignment_ids=None):
+    """Expand every assignment's pattern between the dates inside the database.
+
+    Returns ``(date, driver_id, shift_type)`` tuples for plain pattern shifts
+    only: holidays, swaps, adjustments and custom timings are not applied.
+    Returns None when the database dialect has no expansion query.
+    """
+    sql = ROSTER_EXPANSION_SQL.get(db.session.get_bind().dialect.name)
+    if sql is None:
+        return None
+    rows = db.session.execute(
+        text(sql).bindparams(bindparam('excluded', expanding=True)),
+        {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'excluded': sorted(exclude_assignment_ids or ()),
+        },
+    )
+    return [
+        (
+            roster_date if isinstance(roster_date, date) else date.fromisoformat(roster_date),
+            driver_id,
+            shift_type,
+        )
+        for roster_date, driver_id, shift_type in rows
+    ]
+
+
+class RosterWindow:
+    """Preloaded scheduling inputs for a date range (optionally limited to some drivers).
+
+    Holidays, swaps, adjustments, assignments, custom timings, extra-car work and
+    school term data are loaded with one query each, so resolving many
+    (driver, date) pairs through ``get_driver_shifts_for_date(..., roster=...)``
+    costs no further queries. Lookups outside the window fall back to the
+    regular per-date queries. ``exclude_assignment_ids`` leaves those
+    assignments out, to model the roster without them.
+    """
+
+    def __init__(self, start_date, end_date, driver_ids=None, timings_dict=None, exclude_assignment_ids=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.driver_ids = set(driver_ids) if driver_ids is not None else None
+        if timings_dict is None:
+            timings_dict = {timing.shift_type: timing for timing in ShiftTiming.query.all()}
+        self.timings_dict = timings_dict
+        self.shift_cache = {}
+        self._pattern_days = {}
+        self._weekly_counts = {}
+        self._week_working_days = {}
+        self._term_day_cache = {}
+
+        holidays = self._scoped(
+            DriverHoliday.query.filter(
+                DriverHoliday.holiday_date >= start_date,
+                DriverHoliday.holiday_date <= end_date,
+            ),
+            DriverHoliday.driver_id,
+        ).with_entities(DriverHoliday.driver_id, DriverHoliday.holiday_date).all()
+        self._holidays = {(row.driver_id, row.holiday_date) for row in holidays}
+
+        swaps = self._scoped(
+            ShiftSwap.query.filter(
+                ShiftSwap.driver_a_id == ShiftSwap.driver_b_id,
+                ShiftSwap.work_shift_type.isnot(None),
+                or_(
+                    and_(ShiftSwap.date_a >= start_date, ShiftSwap.date_a <= end_date),
+                    and_(ShiftSwap.date_b >= start_date, ShiftSwap.date_b <= end_date),
+                ),
+            ),
+            ShiftSwap.driver_a_id,
+        ).order_by(ShiftSwap.id.desc()).all()
+        self._swaps = {}
+        for swap in swaps:
+            for swap_date in {swap.date_a, swap.date_b}:
+                self._swaps.setdefault((swap.driver_a_id, swap_date), []).append(swap)
+
+        adjustments = self._scoped(
+            ShiftAdjustment.query.filter(
+                ShiftAdjustment.adjustment_date >= start_date,
+                ShiftAdjustment.adjustment_date <= end_date,
+            ),
+            ShiftAdjustment.driver_id,
+        ).all()
+        self._adjustments = {}
+        for adjustment in adjustments:
+            self._adjustments.setdefault((adjustment.driver_id, adjustment.adjustment_date), []).append(adjustment)
+
+        assignments = self._scoped(
+            DriverAssignment.query.options(joinedload(DriverAssignment.shift_pattern)).filter(
+                DriverAssignment.start_date <= end_date,
+                or_(
+                    DriverAssignment.end_date.is_(None),
+                    DriverAssignment.end_date >= start_date,
+                ),
+            ),
+            DriverAssignment.driver_id,
+        ).order_by(DriverAssignment.id.asc()).all()
+        self._assignments = {}
+        for assignment in assignments:
+            if exclude_assignment_ids and assignment.id in exclude_assignment_ids:
+                continue
+            self._assignments.setdefault(assignment.driver_id, []).append(assignment)
+        self._assignment_timeline = AssignmentTimeline(
+            assignment for driver_assignments in self._assignments.values() for assignment in driver_assignments
+        )
+
+        custom_timings = self._scoped(DriverCustomTiming.query, DriverCustomTiming.driver_id).all()
+        self._custom_timings = {}
+        for timing in custom_timings:
+            self._custom_timings.setdefault(timing.driver_id, []).append(timing)
+
+        extra_assignments = self._scoped(
+            ExtraCarAssignment.query
+            .join(ExtraCarRequest, ExtraCarAssignment.request_id == ExtraCarRequest.id)
+            .options(contains_eager(ExtraCarAssignment.request))
+            .filter(
+                ExtraCarRequest.date >= start_date,
+                ExtraCarRequest.date <= end_date,
+            ),
+            ExtraCarAssignment.driver_id,
+        ).order_by(ExtraCarAssignment.id.asc()).all()
+        self._extra_assignments = {}
+        for extra_assignment in extra_assignments:
+            key = (extra_assignment.driver_id, extra_assignment.request.date)
+            self._extra_assignments.setdefault(key, []).append(extra_assignment)
+
+        self._school_terms = [
+            (term.start_date, term.end_date)
+            for term in SchoolTerm.query.filter(
+                SchoolTerm.start_date <= end_date,
+                SchoolTerm.end_date >= start_date,
+            ).all()
+        ]
+        self._school_closures = {
+            row.closure_date
+            for row in SchoolClosureDate.query.filter(
+                SchoolClosureDate.closure_date >= start_date,
+                SchoolClosureDate.closure_date <= end_date,
+            ).with_entities(SchoolClosureDate.closure_date).all()
+        }
+
+    def _scoped(self, query, driver_column):
+        if self.driver_ids is None:
+            return query
+        return query.filter(driver_column.in_(self.driver_ids))
+
+    def covers(self, driver_id, target_date):
+        """Return True when the window holds complete data for this driver and date."""
+        if target_date is None or target_date < self.start_date or target_date > self.end_date:
+            return False
+        return self.driver_ids is None or driver_id in self.driver_ids
+
+    def is_on_holiday(self, driver_id, target_date):
+        return (driver_id, target_date) in self._holidays
+
+    def swaps_for(self, driver_id, target_date):
+        """Swaps giving up or working ``target_date``, newest first."""
+        return self._swaps.get((driver_id, target_date), [])
+
+    def adjustments_for(self, driver_id, target_date):
+        return self._adjustments.get((driver_id, target_date), [])
+
+    def extra_assignments_for(self, driver_id, target_date):
+        return self._extra_assignments.get((driver_id, target_date), [])
+
+    def assignments_for(self, driver_id, target_date):
+        return self._assignment_timeline.active_on(driver_id, target_date)
+
+    def all_assignments_for(self, driver_id):
+        return self._assignments.get(driver_id, [])
+
+    def add_extra_assignment(self, extra_assignment):
+        """Make a newly added (or planned, unsaved) extra-car assignment visible to later lookups."""
+        target_date = extra_assignment.request.date
+        key = (extra_assignment.driver_id, target_date)
+        self._extra_assignments.setdefault(key, []).append(extra_assignment)
+        for cache_key in [k for k in self.shift_cache if k[0] == key[0] and k[1] == target_date and k[3]]:
+            del self.shift_cache[cache_key]
+
+    def assigned_driver_ids(self):
+        return list(self._assignments)
+
+    def candidate_driver_ids(self, target_date):
+        """Return ids of drivers with an active assignment, a work-day swap or extra-car work on target_date."""
+        driver_ids = {
+            driver_id for driver_id in self._assignments if self.assignments_for(driver_id, target_date)
+        }
+        for (driver_id, swap_date), swaps in self._swaps.items():
+            if swap_date == target_date and any(swap.date_b == target_date for swap in swaps):
+                driver_ids.add(driver_id)
+        for driver_id, extra_date in self._extra_assignments:
+            if extra_date == target_date:
+                driver_ids.add(driver_id)
+        return driver_ids
+
+    def roster_exception_keys(self):
+        """Return (driver_id, date) pairs where holidays or swaps replace the plain pattern roster."""
+        return set(self._holidays) | set(self._swaps)
+
+    def drivers_with_override_timings(self):
+        """Return ids of drivers with custom timings that swap in a different shift type."""
+        return {
+            driver_id
+            for driver_id, timings in self._custom_timings.items()
+            if any(timing.override_shift for timing in timings)
+        }
+
+    def pattern_days(self, pattern):
+        """Return the pattern's normalized per-cycle-day shift lists, decoded once per window."""
+        days = self._pattern_days.get(pattern.id)
+        if days is None:
+            days = pattern.get_day_shifts()
+            self._pattern_days[pattern.id] = days
+        return days
+
+    def pattern_weekly_counts(self, pattern):
+        """Return the pattern's weekly shift-count table (see ``compute_weekly_shift_counts``)."""
+        counts = self._weekly_counts.get(pattern.id)
+        if counts is None:
+            counts = compute_weekly_shift_counts(self.pattern_days(pattern))
+            self._weekly_counts[pattern.id] = counts
+        return counts
+
+    def weekly_assignment_limit(self, driver_id, target_date):
+        """Return ``(limit, pattern)`` for the ISO week containing ``target_date``.
+
+        The limit is the most working days the driver's pattern ever schedules
+        in a Monday-Sunday week, given the assignment's ``start_day_of_cycle``
+        offset. When several assignments touch the week the highest limit wins.
+        Returns ``(None, None)`` when no assignment is active that week.
+        """
+        monday = target_date - timedelta(days=target_date.weekday())
+        sunday = monday + timedelta(days=6)
+        best_limit, best_pattern = None, None
+        for assignment in self.all_assignments_for(driver_id):
+            if assignment.start_date > sunday:
+                continue
+            if assignment.end_date is not None and assignment.end_date < monday:
+                continue
+            pattern = assignment.shift_pattern
+            counts = self.pattern_weekly_counts(pattern)
+            if not counts:
+                continue
+            cycle_length = len(counts)
+            monday_cycle_day = ((monday - assignment.start_date).days + assignment.start_day_of_cycle - 1) % cycle_length
+            # Mondays only ever land on cycle days congruent to this one modulo gcd(7, cycle_length)
+            step = math.gcd(7, cycle_length)
+            limit = max(counts[day] for day in range(monday_cycle_day % step, cycle_length, step))
+            if best_limit is None or limit > best_limit:
+                best_limit, best_pattern = limit, pattern
+        return best_limit, best_pattern
+
+    def working_days_in_week(self, driver, target_date):
+        """Count days with a working (non-extra) shift in the ISO week containing ``target_date``."""
+        iso_year, iso_week, _ = target_date.isocalendar()
+        key = (driver.id, iso_year, iso_week)
+        count = self._week_working_days.get(key)
+        if count is None:
+            monday = target_date - timedelta(days=target_date.weekday())
+            count = 0
+            for offset in range(7):
+                entries = get_driver_shifts_for_date(
+                    driver, monday + timedelta(days=offset), self.timings_dict, include_swaps=True, roster=self
+                )
+                if any(entry.get('shift_type') != 'day_off' for entry in entries):
+                    count += 1
+            self._week_working_days[key] = count
+        return count
+
+    def assignment_shifts_for_date(self, assignment, target_date):
+        """In-memory equivalent of ``DriverAssignment.get_shifts_for_date``."""
+        if target_date < assignment.start_date:
+            return []
+        if assignment.end_date and target_date > assignment.end_date:
+            return []
+        pattern = assignment.shift_pattern
+        days_since_start = (target_date - assignment.start_date).days
+        cycle_day = (days_since_start + (assignment.start_day_of_cycle - 1)) % pattern.cycle_length
+        days = self.pattern_days(pattern)
+        if 0 <= cycle_day < len(days):
+            return days[cycle_day]
+        return []
+
+    def custom_timing_for(self, assignment, shift_type, cycle_day, weekday):
+        return DriverCustomTiming.select_custom_timing(
+            self._custom_timings.get(assignment.driver_id, []),
+            assignment.id,
+            shift_type,
+            cycle_day,
+            weekday,
+        )
+
+    def is_school_term_operational_day(self, target_date):
+        if target_date < self.start_date or target_date > self.end_date:
+            return is_date_in_school_term(target_date) and not is_school_closed_day(target_date)
+        cached = self._term_day_cache.get(target_date)
+        if cached is None:
+            in_term = target_date.weekday() < 5 and any(
+                term_start <= target_date <= term_end for term_start, term_end in self._school_terms
+            )
+            cached = in_term and target_date not in self._school_closures
+            self._term_day_cache[target_date] = cached
+        return cached
 
 # -----------------------------------------------------------------------------
 # Extra Cars Helper Functions
 # -----------------------------------------------------------------------------
 
-def get_driver_all_work_intervals(driver, ref_date, timings_dict=None, exclude_request_id=None):
+def get_driver_all_work_intervals(driver, ref_date, timings_dict=None, exclude_request_id=None, roster=None):
     """Return a list of (source, start_datetime, end_datetime) tuples representing
     all working periods for ``driver`` across ref_date-1, ref_date, and ref_date+1.
 
     ``source`` is ``'scheduled'`` for pattern-based shifts or ``'extra'`` for
     ExtraCarAssignment entries.  Entries from the extra-car request identified by
     ``exclude_request_id`` are omitted so that the current request's own existing
-    assignments do not count against the driver being validated.
+    assignments do not count against the driver being validated. A ``roster``
+    covering the three days avoids all per-driver queries.
     """
     if timings_dict is None:
-        timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+        timings_dict = roster.timings_dict if roster is not None else {st.shift_type: st for st in ShiftTiming.query.all()}
 
     intervals = []
 
     # Collect regular scheduled shifts for the three-day window
     for delta in range(-1, 2):
         check_date = ref_date + timedelta(days=delta)
-        shifts = get_driver_shifts_for_date(driver, check_date, timings_dict)
+        shifts = get_driver_shifts_for_date(driver, check_date, timings_dict, roster=roster)
         for shift in shifts:
             if shift['shift_type'] == 'day_off':
                 continue
@@ -1668,22 +2668,34 @@ def get_driver_all_work_intervals(driver, ref_date, timings_dict=None, exclude_r
     # Collect existing extra-car assignments in the same window
     window_start_date = ref_date - timedelta(days=1)
     window_end_date = ref_date + timedelta(days=1)
-    extra_asgns = (
-        ExtraCarAssignment.query
-        .filter(ExtraCarAssignment.driver_id == driver.id)
-        .join(ExtraCarRequest)
-        .filter(
-            ExtraCarRequest.date >= window_start_date,
-            ExtraCarRequest.date <= window_end_date,
-            ExtraCarRequest.status != 'CLOSED',
+    if (
+        roster is not None
+        and roster.covers(driver.id, window_start_date)
+        and roster.covers(driver.id, window_end_date)
+    ):
+        extra_asgns = [
+            ea
+            for delta in range(-1, 2)
+            for ea in roster.extra_assignments_for(driver.id, ref_date + timedelta(days=delta))
+            if ea.request.status != 'CLOSED'
+        ]
+    else:
+        extra_asgns = (
+            ExtraCarAssignment.query
+            .filter(ExtraCarAssignment.driver_id == driver.id)
+            .join(ExtraCarRequest)
+            .filter(
+                ExtraCarRequest.date >= window_start_date,
+                ExtraCarRequest.date <= window_end_date,
+                ExtraCarRequest.status != 'CLOSED',
+            )
+            .all()
         )
-        .all()
-    )
     if exclude_request_id is not None:
         extra_asgns = [a for a in extra_asgns if a.request_id != exclude_request_id]
 
     for ea in extra_asgns:
-        req_start, req_end = ea.request.get_time_window()
+        req_start, req_end = ea.request.get_time_window(timings_dict)
         if not req_start or not req_end:
             continue
         s = (
@@ -1781,6 +2793,458 @@ def set_app_setting(key, value):
         setting.value = str(value)
 
 
+# -----------------------------------------------------------------------------
+# Roster Version and Daily Sheet Cache
+# -----------------------------------------------------------------------------
+
+ROSTER_VERSION_KEY = 'roster_version'
+# Bumped when inputs shared by every driver change (patterns, shift timings, school terms)
+SHARED_SCHEDULE_VERSION_KEY = 'shared_schedule_version'
+# Bumped when driver_assignment rows are written; keys the cached AssignmentTimeline
+ASSIGNMENT_VERSION_KEY = 'assignment_version'
+
+# Models whose rows belong to particular drivers, with the attributes naming them
+DRIVER_SCOPED_ATTRS = {
+    'Driver': ('id',),
+    'DriverAssignment': ('driver_id',),
+    'DriverCustomTiming': ('driver_id',),
+    'DriverHoliday': ('driver_id',),
+    'ShiftAdjustment': ('driver_id',),
+    'ShiftSwap': ('driver_a_id', 'driver_b_id'),
+    'ExtraCarAssignment': ('driver_id',),
+}
+
+_daily_sheet_cache = OrderedDict()
+_daily_sheet_cache_lock = threading.Lock()
+
+# Summaries keyed by (operational date, roster version); a few are kept so the
+# pre-crossover warm-up isn't evicted by views of the current day
+_dashboard_cache = OrderedDict()
+_dashboard_cache_lock = threading.Lock()
+DASHBOARD_CACHE_SIZE = 4
+
+
+# Bookkeeping tables whose writes never change a roster
+NON_ROSTER_MODELS = (AppSetting, Job)
+
+
+def _is_roster_entity(mapper):
+    return mapper is not None and not issubclass(mapper.class_, NON_ROSTER_MODELS)
+
+
+def _changes_assignments(session, obj):
+    """True when a pending change writes driver_assignment rows, directly or by delete cascade."""
+    if isinstance(obj, DriverAssignment):
+        return True
+    return isinstance(obj, (Driver, ShiftPattern)) and obj in session.deleted
+
+
+def _changed_roster_dates(obj):
+    """Return the dates a changed object affects, or None when they are not known."""
+    if isinstance(obj, ExtraCarAssignment):
+        extra_request = obj.__dict__.get('request')
+        return {extra_request.date} if extra_request is not None else None
+    date_attrs = {
+        DriverHoliday: ('holiday_date',),
+        ShiftAdjustment: ('adjustment_date',),
+        ShiftSwap: ('date_a', 'date_b'),
+        ExtraCarRequest: ('date',),
+    }.get(type(obj))
+    if date_attrs is None:
+        return None
+    state = sa_inspect(obj)
+    dates = set()
+    for attr in date_attrs:
+        history = state.attrs[attr].history
+        dates.update(value for value in (*history.added, *history.unchanged, *history.deleted) if value)
+    return dates
+
+
+def _changed_schedule_driver_ids(obj):
+    """Return ids of drivers whose own schedule a changed object affects, or None for every driver."""
+    state = sa_inspect(obj)
+    if isinstance(obj, ExtraCarRequest):
+        changed = {attr.key for attr in state.attrs if attr.history.has_changes()}
+        if state.persistent and not state.deleted and changed <= {'status', 'notes'}:
+            return set()
+        return {assignment.driver_id for assignment in obj.assignments}
+    id_attrs = DRIVER_SCOPED_ATTRS.get(type(obj).__name__)
+    if id_attrs is None:
+        return None
+    driver_ids = set()
+    for attr in id_attrs:
+        history = state.attrs[attr].history
+        driver_ids.update(value for value in (*history.added, *history.unchanged, *history.deleted) if value)
+    if not driver_ids:
+        # A brand-new driver has no feed yet; other rows without a driver id are unknown.
+        return set() if isinstance(obj, Driver) else None
+    return driver_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _flag_roster_flush(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, NON_ROSTER_MODELS):
+            continue
+        session.info['roster_changed'] = True
+        if _changes_assignments(session, obj):
+            session.info['assignments_changed'] = True
+        dates = _changed_roster_dates(obj)
+        if dates is None:
+            session.info['roster_all_dates'] = True
+        else:
+            session.info.setdefault('roster_dates', set()).update(dates)
+        driver_ids = _changed_schedule_driver_ids(obj)
+        if driver_ids is None:
+            session.info['schedule_shared_changed'] = True
+        else:
+            session.info.setdefault('schedule_driver_ids', set()).update(driver_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_roster_bulk_write(orm_execute_state):
+    is_write = orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    if is_write and _is_roster_entity(
+        orm_execute_state.bind_mapper
+    ):
+        orm_execute_state.session.info['roster_changed'] = True
+        orm_execute_state.session.info['roster_all_dates'] = True
+        orm_execute_state.session.info['schedule_shared_changed'] = True
+        if orm_execute_state.bind_mapper.class_ in (DriverAssignment, Driver, ShiftPattern):
+            orm_execute_state.session.info['assignments_changed'] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_roster_version_on_commit(session):
+    # Flush first so pending changes raise the flag before it is checked.
+    session.flush()
+    if session.info.pop('roster_changed', False):
+        bump_roster_version(session)
+    if session.info.pop('schedule_shared_changed', False):
+        bump_roster_version(session, SHARED_SCHEDULE_VERSION_KEY)
+    if session.info.pop('assignments_changed', False):
+        bump_roster_version(session, ASSIGNMENT_VERSION_KEY)
+    driver_ids = session.info.pop('schedule_driver_ids', None)
+    if driver_ids:
+        session.execute(
+            text(
+                "UPDATE driver SET schedule_version = schedule_version + 1 WHERE id IN :ids"
+            ).bindparams(bindparam('ids', expanding=True)),
+            {'ids': sorted(driver_ids)},
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_roster_changes(session):
+    dates = session.info.pop('roster_dates', set())
+    if session.info.pop('roster_all_dates', False):
+        live_roster_broker.notify()
+    elif dates:
+        live_roster_broker.notify(dates)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_roster_flag(session):
+    for key in (
+        'roster_changed', 'roster_dates', 'roster_all_dates', 'schedule_shared_changed', 'schedule_driver_ids',
+        'assignments_changed',
+    ):
+        session.info.pop(key, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_transaction_caches(session, transaction):
+    # Per-transaction lookups (see get_assignment_timeline) end with the outermost transaction
+    if transaction.parent is None:
+        session.info.pop('assignment_timeline', None)
+
+
+def bump_roster_version(session=None, key=ROSTER_VERSION_KEY):
+    """Atomically increment a stored version counter inside the current transaction."""
+    session = session or db.session
+    params = {'key': key, 'now': utc_now()}
+    result = session.execute(
+        text(
+            """
+            UPDATE app_setting
+            SET value = CAST(CAST(value AS INTEGER) + 1 AS VARCHAR(255)), updated_at = :now
+            WHERE key = :key
+            """
+        ),
+        params,
+    )
+    if result.rowcount == 0:
+        session.execute(
+            text("INSERT INTO app_setting (key, value, updated_at) VALUES (:key, '1', :now)"),
+            params,
+        )
+
+
+def get_roster_version(key=ROSTER_VERSION_KEY):
+    """Return (version, updated_at) of the roster; (0, None) before the first write."""
+    row = db.session.execute(
+        select(AppSetting.value, AppSetting.updated_at).where(AppSetting.key == key)
+    ).first()
+    if row is None:
+        return 0, None
+    try:
+        return int(row.value), row.updated_at
+    except (TypeError, ValueError):
+        return 0, row.updated_at
+
+
+def lru_cache_get(cache, lock, key):
+    """Return a cached value (marking it recently used), or None."""
+    with lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def lru_cache_put(cache, lock, key, value, max_size):
+    with lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def build_daily_sheet_context(target_date):
+    drivers_by_shift = get_drivers_for_date(target_date)
+    all_timings = ShiftTiming.query.order_by(ShiftTiming.start_time, ShiftTiming.shift_type).all()
+    timings = {timing.shift_type: timing for timing in all_timings}
+    total_drivers = len({info['driver'].id for drivers_list in drivers_by_shift.values() for info in drivers_list})
+    return dict(
+        target_date=target_date,
+        drivers_by_shift=drivers_by_shift,
+        timings=timings,
+        total_drivers=total_drivers,
+    )
+
+
+def render_cached_daily_sheet(template_name, target_date):
+    """
+    Render a daily sheet with a content ETag and Last-Modified, answering
+    conditional requests with 304 and reusing rendered pages per roster version.
+    """
+    if request.method != 'GET' or session.get('_flashes'):
+        # Pending flash messages are part of the page; never cache them.
+        return render_template(template_name, **build_daily_sheet_context(target_date))
+
+    version, version_at = get_roster_version()
+    modified_at = version_at
+    theme_row = db.session.execute(
+        select(AppSetting.value, AppSetting.updated_at).where(AppSetting.key == 'ui_theme')
+    ).first()
+    if theme_row is not None and theme_row.updated_at and (
+        modified_at is None or theme_row.updated_at > modified_at
+    ):
+        modified_at = theme_row.updated_at
+
+    # The full path is part of the key: base.html reads ?modal and echoes the URL back
+    # in the theme form, so differently-queried requests render different pages.
+    cache_key = (
+        template_name, target_date, request.full_path,
+        version, version_at, theme_row.value if theme_row else None,
+    )
+    cached = lru_cache_get(_daily_sheet_cache, _daily_sheet_cache_lock, cache_key)
+    if cached is None:
+        html = render_template(template_name, **build_daily_sheet_context(target_date))
+        cached = (html, hashlib.sha1(html.encode('utf-8')).hexdigest())
+        lru_cache_put(
+            _daily_sheet_cache, _daily_sheet_cache_lock, cache_key, cached,
+            app.config.get('DAILY_SHEET_CACHE_SIZE', 64),
+        )
+
+    html, etag = cached
+    response = make_response(html)
+    response.set_etag(etag)
+    if modified_at is not None:
+        response.last_modified = modified_at.replace(tzinfo=UTC)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def get_dashboard_summary(today, ttl=None):
+    """
+    Return today's and tomorrow's driver totals plus today's per-shift counts,
+    resolved together and cached briefly per roster version (``ttl`` seconds,
+    default ``DASHBOARD_CACHE_TTL_SECONDS``).
+    """
+    version, version_at = get_roster_version()
+    cache_key = (today, version, version_at)
+    now = monotonic()
+    cached = lru_cache_get(_dashboard_cache, _dashboard_cache_lock, cache_key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    tomorrow = today + timedelta(days=1)
+    rosters = get_drivers_for_dates([today, tomorrow])
+
+    def count_drivers(drivers_by_shift):
+        return len({info['driver'].id for drivers_list in drivers_by_shift.values() for info in drivers_list})
+
+    data = {
+        'today_total': count_drivers(rosters[today]),
+        'tomorrow_total': count_drivers(rosters[tomorrow]),
+        'today_shift_counts': get_drivers_count_by_shift(today, rosters[today]),
+    }
+    if ttl is None:
+        ttl = app.config.get('DASHBOARD_CACHE_TTL_SECONDS', 30)
+    lru_cache_put(_dashboard_cache, _dashboard_cache_lock, cache_key, (now + ttl, data), DASHBOARD_CACHE_SIZE)
+    return data
+
+
+def build_live_roster_snapshot(today):
+    """Return {'dates': [...], 'entries': {key: entry}} for today's and tomorrow's roster."""
+    dates = [today, today + timedelta(days=1)]
+    rosters = get_drivers_for_dates(dates)
+    entries = {}
+    for target_date in dates:
+        for group, drivers_list in rosters[target_date].items():
+            for info in drivers_list:
+                base_key = f"{target_date.isoformat()}:{info['driver'].id}:{info['shift_type']}"
+                key = base_key
+                suffix = 1
+                while key in entries:
+                    suffix += 1
+                    key = f"{base_key}:{suffix}"
+                entries[key] = {
+                    'key': key,
+                    'date': target_date.isoformat(),
+                    'group': group,
+                    'shift_type': info['shift_type'],
+                    'driver_id': info['driver'].id,
+                    'driver_number': info['driver'].formatted_driver_number(),
+                    'driver_name': info['driver'].formatted_name(),
+                    'start_time': info['start_time'].strftime('%H:%M') if info['start_time'] else None,
+                    'end_time': info['end_time'].strftime('%H:%M') if info['end_time'] else None,
+                }
+    return {'dates': [d.isoformat() for d in dates], 'entries': entries}
+
+
+def diff_live_roster(old_snapshot, new_snapshot):
+    """Return the added, removed and changed entries between two snapshots.
+
+    Removed entries are the old ones, so clients can still name the driver.
+    """
+    old_entries = old_snapshot['entries'] if old_snapshot else {}
+    new_entries = new_snapshot['entries']
+    return {
+        'dates': new_snapshot['dates'],
+        'added': [entry for key, entry in new_entries.items() if key not in old_entries],
+        'removed': [entry for key, entry in old_entries.items() if key not in new_entries],
+        'changed': [
+            entry
+            for key, entry in new_entries.items()
+            if key in old_entries and old_entries[key] != entry
+        ],
+    }
+
+
+def format_sse(event_name, payload):
+    return f"event: {event_name}\ndata: {json.dumps(payload)}\n\n"
+
+
+class LiveRosterBroker:
+    """In-process pub/sub pushing today's and tomorrow's roster changes to SSE subscribers.
+
+    Commits in this process wake a publisher thread through ``notify``; it
+    recomputes the two-day roster once, diffs it against the last snapshot and
+    queues the diff for every subscriber. Each heartbeat also compares the
+    stored roster version, so commits made by other processes are picked up.
+    """
+
+    def __init__(self, queue_size=100):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self._snapshot = None
+        self._state = None
+        self._queue_size = queue_size
+
+    def subscribe(self, start_worker=True):
+        """Register a subscriber; returns (queue, current snapshot)."""
+        self.refresh()
+        subscriber = queue.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            snapshot = self._snapshot
+            if start_worker and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='live-roster', daemon=True)
+                self._thread.start()
+        return subscriber, snapshot
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def is_subscribed(self, subscriber):
+        with self._lock:
+            return subscriber in self._subscribers
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def notify(self, dates=None):
+        """Wake the publisher when a commit touched the live dates (or unknown dates)."""
+        if dates is not None:
+            today = get_operational_date()
+            if not {today, today + timedelta(days=1)} & set(dates):
+                return
+        self._wake.set()
+
+    def refresh(self, force=False):
+        """Recompute the snapshot when the roster may have changed and publish any diff."""
+        state = (get_operational_date(), get_roster_version())
+        with self._lock:
+            if not force and self._snapshot is not None and self._state == state:
+                return None
+        # Built outside the lock so subscribe/unsubscribe never wait on roster queries
+        snapshot = build_live_roster_snapshot(state[0])
+        with self._lock:
+            if self._state is not None and (self._state[0], self._state[1][0]) > (state[0], state[1][0]):
+                # A concurrent refresh already published a newer roster
+                return None
+            diff = diff_live_roster(self._snapshot, snapshot)
+            had_snapshot = self._snapshot is not None
+            self._snapshot = snapshot
+            self._state = state
+            if had_snapshot and (diff['added'] or diff['removed'] or diff['changed']):
+                for subscriber in list(self._subscribers):
+                    try:
+                        subscriber.put_nowait(diff)
+                    except queue.Full:
+                        # A stalled client is dropped; it reconnects and gets a fresh snapshot.
+                        self._subscribers.discard(subscriber)
+            return diff
+
+    def _run(self):
+        interval = app.config.get('LIVE_ROSTER_HEARTBEAT_SECONDS', 15)
+        while True:
+            woke = self._wake.wait(interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._snapshot = None
+                    self._thread = None
+                    return
+            with app.app_context():
+                try:
+                    self.refresh(force=woke)
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Refreshing the live roster failed")
+                finally:
+                    db.session.remove()
+
+
+live_roster_broker = LiveRosterBroker()
+
+
 def is_date_in_school_term(target_date):
     """Return True when date falls within any configured school term range."""
     if not target_date:
@@ -1802,8 +3266,10 @@ def is_school_closed_day(target_date):
     return SchoolClosureDate.query.filter_by(closure_date=target_date).first() is not None
 
 
-def is_school_term_operational_day(target_date):
+def is_school_term_operational_day(target_date, roster=None):
     """Return True when date is in term time and not a closed day."""
+    if roster is not None:
+        return roster.is_school_term_operational_day(target_date)
     return is_date_in_school_term(target_date) and not is_school_closed_day(target_date)
 
 
@@ -1827,7 +3293,7 @@ def school_closure_delete_allowed_at(closure):
     return school_closure_finished_at(closure) + timedelta(hours=24)
 
 
-def validate_extra_car_assignment(driver, request, proposed_start_dt, proposed_end_dt, timings_dict=None):
+def validate_extra_car_assignment(driver, request, proposed_start_dt, proposed_end_dt, timings_dict=None, roster=None):
     """Validate a proposed extra-car assignment against driver work rules.
 
     Rules enforced:
@@ -1848,16 +3314,19 @@ def validate_extra_car_assignment(driver, request, proposed_start_dt, proposed_e
        net-new hours >= MIN_OVERLAP_BENEFIT (2h by default), and the suggested
        window is trimmed to the non-overlapping portion.
 
+    Pass a ``roster`` spanning the request date +/- 1 day to validate many
+    drivers without per-driver queries.
+
     Returns ``(is_valid, errors, suggested_start_dt, suggested_end_dt)``.
     """
     MIN_OVERLAP_BENEFIT = 2.0  # hours; minimum net-new hours that make an overlapping extra worthwhile
 
     if timings_dict is None:
-        timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+        timings_dict = roster.timings_dict if roster is not None else {st.shift_type: st for st in ShiftTiming.query.all()}
 
     errors = []
     raw_intervals = get_driver_all_work_intervals(
-        driver, request.date, timings_dict, exclude_request_id=request.id
+        driver, request.date, timings_dict, exclude_request_id=request.id, roster=roster
     )
     existing_intervals = [(s, e) for _, s, e in raw_intervals]
 
@@ -2024,6 +3493,303 @@ def validate_extra_car_assignment(driver, request, proposed_start_dt, proposed_e
     return (not errors), errors, suggested_start, suggested_end
 
 
+EXTRA_CAR_VEHICLE_FLAGS = ('school_badge', 'pet_friendly', 'electric_vehicle')
+
+
+def measure_extra_car_window(existing_intervals, start_dt, end_dt):
+    """Return ``(net_new_hours, rest_margin_hours)`` for adding [start_dt, end_dt] to existing work.
+
+    ``rest_margin_hours`` is how far the tighter of the rest gaps around the
+    resulting work block exceeds MIN_REST_HOURS, or None with no neighbouring work.
+    """
+    merged_existing = merge_work_intervals(existing_intervals)
+    covered = sum(
+        max(timedelta(0), min(end_dt, e) - max(start_dt, s)).total_seconds() / 3600
+        for s, e in merged_existing
+    )
+    net_new = max(0.0, (end_dt - start_dt).total_seconds() / 3600 - covered)
+
+    block_start, block_end = start_dt, end_dt
+    for blk_start, blk_end in merge_work_intervals(existing_intervals + [(start_dt, end_dt)]):
+        if blk_start <= start_dt and blk_end >= end_dt:
+            block_start, block_end = blk_start, blk_end
+            break
+    gaps = [(block_start - e).total_seconds() / 3600 for s, e in merged_existing if e <= block_start]
+    gaps += [(s - block_end).total_seconds() / 3600 for s, e in merged_existing if s >= block_end]
+    rest_margin = min(gaps) - MIN_REST_HOURS if gaps else None
+    return net_new, rest_margin
+
+
+def rank_extra_car_candidates(req, preferences=None, timings_dict=None, roster=None, drivers=None):
+    """Return every driver who can legally take ``req``, best first.
+
+    All drivers are checked against one roster window preloaded for the
+    request date +/- 1 day. Each driver gets the request's available
+    window, or the validator's suggested legal sub-window. Drivers already
+    on the request are skipped.
+
+    Ranking is by net-new hours, then rest margin, then the number of
+    ``preferences`` matched. Preferences can be ``car_type`` and the
+    boolean vehicle flags. You can pass in a shared ``roster`` and a
+    ``drivers`` list, as the auto-fill planner does.
+
+    Returns ``(candidates, evaluated_count)``, where each candidate is a
+    JSON-ready dict.
+    """
+    preferences = preferences or {}
+    if timings_dict is None:
+        timings_dict = roster.timings_dict if roster is not None else {st.shift_type: st for st in ShiftTiming.query.all()}
+
+    req_start, req_end = req.get_time_window(timings_dict)
+    if not req_start or not req_end:
+        return [], 0
+    if req.unlimited:
+        proposed_start, proposed_end = req_start, req_end
+    else:
+        proposed_start, proposed_end = req.get_recommended_available_window()
+        if not proposed_start or not proposed_end:
+            return [], 0
+
+    if roster is None:
+        roster = RosterWindow(req.date - timedelta(days=1), req.date + timedelta(days=1), timings_dict=timings_dict)
+    if drivers is None:
+        drivers = Driver.query.order_by(Driver.driver_number).all()
+    assigned_driver_ids = {assignment.driver_id for assignment in req.assignments}
+
+    ranked = []
+    evaluated = 0
+    for driver in drivers:
+        if driver.id in assigned_driver_ids:
+            continue
+        evaluated += 1
+        start_dt, end_dt = proposed_start, proposed_end
+        is_valid, _, suggested_start, suggested_end = validate_extra_car_assignment(
+            driver, req, start_dt, end_dt, timings_dict, roster=roster
+        )
+        if not is_valid and suggested_start and suggested_end and (suggested_start, suggested_end) != (start_dt, end_dt):
+            start_dt, end_dt = suggested_start, suggested_end
+            is_valid, _, suggested_start, suggested_end = validate_extra_car_assignment(
+                driver, req, start_dt, end_dt, timings_dict, roster=roster
+            )
+        if not is_valid:
+            continue
+        if suggested_start and suggested_end:
+            start_dt, end_dt = suggested_start, suggested_end
+
+        existing = [
+            (s, e)
+            for _, s, e in get_driver_all_work_intervals(
+                driver, req.date, timings_dict, exclude_request_id=req.id, roster=roster
+            )
+        ]
+        net_new, rest_margin = measure_extra_car_window(existing, start_dt, end_dt)
+        matches = 0
+        if preferences.get('car_type') and (driver.car_type or '').lower() == preferences['car_type'].lower():
+            matches += 1
+        matches += sum(1 for flag in EXTRA_CAR_VEHICLE_FLAGS if preferences.get(flag) and getattr(driver, flag))
+
+        sort_key = (-round(net_new, 2), -(rest_margin if rest_margin is not None else math.inf), -matches)
+        ranked.append((sort_key, {
+            'driver_id': driver.id,
+            'driver_number': driver.formatted_driver_number(),
+            'name': driver.formatted_name(),
+            'car_type': driver.car_type,
+            'school_badge': bool(driver.school_badge),
+            'pet_friendly': bool(driver.pet_friendly),
+            'electric_vehicle': bool(driver.electric_vehicle),
+            'suggested_start': start_dt.strftime('%H:%M'),
+            'suggested_end': end_dt.strftime('%H:%M'),
+            'net_new_hours': round(net_new, 2),
+            'rest_margin_hours': round(rest_margin, 2) if rest_margin is not None else None,
+            'preference_matches': matches,
+        }))
+
+    ranked.sort(key=lambda item: item[0])
+    return [candidate for _, candidate in ranked], evaluated
+
+
+def get_autofill_requests(start_date, end_date):
+    """Return OPEN and PARTIALLY_FILLED requests with a fixed slot count in the range, in date order."""
+    return (
+        ExtraCarRequest.query
+        .filter(
+            ExtraCarRequest.date >= start_date,
+            ExtraCarRequest.date <= end_date,
+            ExtraCarRequest.status.in_(('OPEN', 'PARTIALLY_FILLED')),
+            ExtraCarRequest.unlimited.is_(False),
+        )
+        .order_by(ExtraCarRequest.date.asc(), ExtraCarRequest.id.asc())
+        .all()
+    )
+
+
+def check_autofill_item(req, driver, start_dt, end_dt, timings_dict, roster):
+    """Return the errors that would stop ``driver`` taking [start_dt, end_dt] on ``req`` right now."""
+    if any(assignment.driver_id == driver.id for assignment in req.assignments):
+        return [f"{driver.formatted_name()} is already assigned to this request."]
+    if (end_dt - start_dt).total_seconds() / 3600 < EXTRA_CAR_MIN_PARTIAL_HOURS:
+        return [f"Driver assignment must be at least {EXTRA_CAR_MIN_PARTIAL_HOURS:g} hours."]
+    if not interval_within_any_segment(start_dt, end_dt, req.get_available_capacity_segments()):
+        return ["Proposed assignment exceeds currently available capacity window."]
+    is_valid, errors, suggested_start, suggested_end = validate_extra_car_assignment(
+        driver, req, start_dt, end_dt, timings_dict, roster=roster
+    )
+    if is_valid and (suggested_start, suggested_end) != (start_dt, end_dt):
+        return ["Proposed assignment overlaps the driver's existing work."]
+    return errors
+
+
+def _add_autofill_assignment(req, driver, start_dt, end_dt, roster):
+    assignment = ExtraCarAssignment(
+        request_id=req.id,
+        driver_id=driver.id,
+        start_time=start_dt.time(),
+        end_time=end_dt.time(),
+        notes='Auto-filled',
+    )
+    req.assignments.append(assignment)
+    db.session.flush()
+    roster.add_extra_assignment(assignment)
+    req.refresh_status()
+    return assignment
+
+
+def _plan_autofill_assignment(req, driver, start_dt, end_dt, roster):
+    """Add an unsaved assignment to ``req`` and ``roster`` so later planning sees it.
+
+    ``set_committed_value`` puts it in the loaded collection without history
+    or cascade, so the session never writes it; the caller expires the
+    collection afterwards.
+    """
+    assignment = ExtraCarAssignment(
+        request_id=req.id,
+        driver_id=driver.id,
+        start_time=start_dt.time(),
+        end_time=end_dt.time(),
+        notes='Auto-filled',
+    )
+    set_committed_value(assignment, 'request', req)
+    set_committed_value(req, 'assignments', [*req.assignments, assignment])
+    roster.add_extra_assignment(assignment)
+    return assignment
+
+
+def serialize_autofill_item(req, driver, start_dt, end_dt):
+    return {
+        'request_id': req.id,
+        'date': req.date.strftime('%Y-%m-%d'),
+        'driver_id': driver.id,
+        'driver_name': driver.formatted_name(),
+        'start_time': start_dt.strftime('%H:%M'),
+        'end_time': end_dt.strftime('%H:%M'),
+    }
+
+
+def plan_extra_car_autofill(start_date, end_date):
+    """Greedily propose assignments that fill open extra-car requests between the dates.
+
+    Requests are handled in date order; finished ones are skipped. Each request repeatedly takes the
+    top-ranked candidate (see ``rank_extra_car_candidates``) for its largest
+    uncovered segment until it is filled or nobody legal is left. Planned
+    assignments are kept in memory only, on the requests' loaded collections
+    and the shared roster, so later choices see them (rest, 24-hour and
+    capacity rules, one assignment per driver per request). Nothing is
+    written, so the preview is safe inside a GET's read snapshot.
+
+    Returns ``(plan, unfilled)``: lists of JSON-ready dicts.
+    """
+    requests_to_fill = get_autofill_requests(start_date, end_date)
+    if not requests_to_fill:
+        return [], []
+
+    timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+    roster = RosterWindow(start_date - timedelta(days=1), end_date + timedelta(days=1), timings_dict=timings_dict)
+    drivers = Driver.query.order_by(Driver.driver_number).all()
+    drivers_by_id = {driver.id: driver for driver in drivers}
+
+    plan = []
+    unfilled = []
+    now = datetime.now()
+    try:
+        for req in requests_to_fill:
+            req_start, req_end = req.get_time_window(timings_dict)
+            if not req_start or not req_end or req_end <= now:
+                continue
+            while True:
+                candidates, _ = rank_extra_car_candidates(req, timings_dict=timings_dict, roster=roster, drivers=drivers)
+                if not candidates:
+                    break
+                best = candidates[0]
+                driver = drivers_by_id[best['driver_id']]
+                start_dt = resolve_request_relative_datetime(req_start, req_end, parse_time_string(best['suggested_start']))
+                end_dt = resolve_request_relative_datetime(req_start, req_end, parse_time_string(best['suggested_end']))
+                if end_dt <= start_dt:
+                    end_dt += timedelta(days=1)
+                _plan_autofill_assignment(req, driver, start_dt, end_dt, roster)
+                plan.append(serialize_autofill_item(req, driver, start_dt, end_dt))
+
+            remaining = req.get_available_capacity_segments()
+            if remaining:
+                unfilled.append({
+                    'request_id': req.id,
+                    'date': req.date.strftime('%Y-%m-%d'),
+                    'window': req.display_window(),
+                    'uncovered': [
+                        f"{seg_start.strftime('%H:%M')}–{seg_end.strftime('%H:%M')}" for seg_start, seg_end in remaining
+                    ],
+                })
+    finally:
+        for req in requests_to_fill:
+            db.session.expire(req, ['assignments'])
+
+    return plan, unfilled
+
+
+def apply_extra_car_autofill(plan_items):
+    """Save a previewed auto-fill plan in one transaction.
+
+    Each item (``request_id``, ``driver_id``, ``start_time``, ``end_time``) is
+    re-validated against the current data, including earlier items in the
+    plan. If any item is no longer legal nothing is saved.
+
+    Returns ``(saved_count, errors)``.
+    """
+    if not plan_items:
+        return 0, []
+
+    parsed = []
+    for index, item in enumerate(plan_items, start=1):
+        req = db.session.get(ExtraCarRequest, parse_optional_int(item.get('request_id')))
+        driver = db.session.get(Driver, parse_optional_int(item.get('driver_id')))
+        start_time = parse_time_string(item.get('start_time'))
+        end_time = parse_time_string(item.get('end_time'))
+        if not req or not driver or not start_time or not end_time:
+            return 0, [f"Plan item {index} is incomplete or refers to a missing request or driver."]
+        parsed.append((req, driver, start_time, end_time))
+
+    dates = [req.date for req, _, _, _ in parsed]
+    timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+    roster = RosterWindow(min(dates) - timedelta(days=1), max(dates) + timedelta(days=1), timings_dict=timings_dict)
+
+    for index, (req, driver, start_time, end_time) in enumerate(parsed, start=1):
+        req_start, req_end = req.get_time_window(timings_dict)
+        if not req_start or not req_end or req.status in ('DRAFT', 'CLOSED'):
+            db.session.rollback()
+            return 0, [f"Plan item {index}: request is no longer open."]
+        start_dt = resolve_request_relative_datetime(req_start, req_end, start_time)
+        end_dt = resolve_request_relative_datetime(req_start, req_end, end_time)
+        if end_dt <= start_dt:
+            end_dt += timedelta(days=1)
+        errors = check_autofill_item(req, driver, start_dt, end_dt, timings_dict, roster)
+        if errors:
+            db.session.rollback()
+            return 0, [f"Plan item {index} ({driver.formatted_name()}): {error}" for error in errors]
+        _add_autofill_assignment(req, driver, start_dt, end_dt, roster)
+
+    db.session.commit()
+    return len(parsed), []
+
+
 # -----------------------------------------------------------------------------
 # Routes: Dashboard and Navigation
 # -----------------------------------------------------------------------------
@@ -2031,21 +3797,12 @@ def validate_extra_car_assignment(driver, request, proposed_start_dt, proposed_e
 @app.route("/")
 def index():
     """Main dashboard"""
-    drivers = Driver.query.all()
-    
     # Get operational dates
     today = get_operational_date()
     tomorrow = today + timedelta(days=1)
-    
-    # Get driver counts for today and tomorrow
-    today_drivers = get_drivers_for_date(today)
-    tomorrow_drivers = get_drivers_for_date(tomorrow)
-    
-    today_total = len({info['driver'].id for drivers_list in today_drivers.values() for info in drivers_list})
-    tomorrow_total = len({info['driver'].id for drivers_list in tomorrow_drivers.values() for info in drivers_list})
-    
-    # Get shift distribution for today
-    today_shift_counts = get_drivers_count_by_shift(today)
+
+    # Driver totals for today and tomorrow plus today's shift distribution
+    summary = get_dashboard_summary(today)
     
     # Get all user-defined shift types for the dashboard
     all_shift_types = ShiftTiming.query.filter(
@@ -2053,12 +3810,11 @@ def index():
     ).order_by(ShiftTiming.start_time, ShiftTiming.shift_type).all()
     
     return render_template("index.html", 
-                         drivers=drivers,
                          today=today,
                          tomorrow=tomorrow,
-                         today_total=today_total,
-                         tomorrow_total=tomorrow_total,
-                         today_shift_counts=today_shift_counts,
+                         today_total=summary['today_total'],
+                         tomorrow_total=summary['tomorrow_total'],
+                         today_shift_counts=summary['today_shift_counts'],
                          all_shift_types=all_shift_types)
 
 @app.route("/drivers")
@@ -2089,6 +3845,7 @@ def drivers():
         driver_assignments[driver.id] = serialize_driver_assignment_items(driver)
         custom_timing_pattern_ids[driver.id] = sorted(get_custom_timing_affected_pattern_ids(driver))
 
+    feed_token = get_calendar_feed_token()
     return render_template(
         "drivers.html",
         drivers=all_drivers,
@@ -2098,6 +3855,7 @@ def drivers():
         datetime=datetime,
         driver_assignments=driver_assignments,
         custom_timing_pattern_ids=custom_timing_pattern_ids,
+        fleet_calendar_url=url_for('fleet_calendar_feed', token=feed_token, _external=True) if feed_token else None,
     )
 
 
@@ -2168,7 +3926,13 @@ def shifts():
     all_patterns = ShiftPattern.query.order_by(ShiftPattern.name).all()
     all_timings = ShiftTiming.query.order_by(ShiftTiming.start_time, ShiftTiming.shift_type).all()
     timings = {timing.shift_type: timing for timing in all_timings}
-    return render_template("shifts.html", patterns=all_patterns, timings=timings, all_timings=all_timings)
+    return render_template(
+        "shifts.html",
+        patterns=all_patterns,
+        timings=timings,
+        all_timings=all_timings,
+        shift_type_usage=get_shift_type_usage(),
+    )
 
 # -----------------------------------------------------------------------------
 # Routes: Shift Types and Patterns
@@ -2270,7 +4034,9 @@ def update_shift_types():
 
         changed_names = {old: new for old, new in rename_map.items() if old != new}
         if changed_names:
-            patterns = ShiftPattern.query.all()
+            patterns = ShiftPattern.query.filter(ShiftPattern.id.in_(
+                select(PatternDayShift.pattern_id).where(PatternDayShift.shift_type.in_(changed_names))
+            )).all()
             for pattern in patterns:
                 pattern_data = pattern.get_pattern_data()
                 updated_data = []
@@ -2293,7 +4059,10 @@ def update_shift_types():
                 )
         
         db.session.commit()
-        return json_success()
+        # New timings move shift-based extra car windows; recompute their statuses off the request thread
+        version, _ = get_roster_version()
+        job = enqueue_job('refresh_extra_car_statuses', key=f"refresh_extra_car_statuses:{version}")
+        return json_success(job_id=job.id)
     except (ValueError, TypeError) as e:
         db.session.rollback()
         return json_error(str(e))
@@ -2723,6 +4492,277 @@ def assign_pattern_to_driver(driver_id):
     
     return render_template("assign_pattern.html", driver=driver, patterns=patterns, today=date.today())
 
+BULK_ASSIGNMENT_COLUMNS = ('driver_number', 'pattern', 'start_date', 'end_date', 'start_day_of_cycle')
+
+
+def parse_bulk_assignment_row(row, driver_ids_by_number, patterns_by_key):
+    """Validate one bulk assignment row; returns ``(values, error_message)``."""
+    driver_number = str(row.get('driver_number') or '').strip()
+    if not driver_number:
+        return None, "Driver number is required"
+    driver_id = driver_ids_by_number.get(driver_number)
+    if driver_id is None:
+        return None, f"Unknown driver number: {driver_number}"
+
+    pattern_key = str(row.get('pattern') or '').strip()
+    pattern = patterns_by_key.get(pattern_key) or patterns_by_key.get(pattern_key.casefold())
+    if pattern is None:
+        return None, f"Unknown shift pattern: {pattern_key}" if pattern_key else "Shift pattern is required"
+
+    start_date = parse_date_string(str(row.get('start_date') or '').strip())
+    if not start_date:
+        return None, "Invalid start date"
+    end_text = str(row.get('end_date') or '').strip()
+    end_date = parse_date_string(end_text) if end_text else None
+    if end_text and not end_date:
+        return None, "Invalid end date"
+    if end_date and end_date < start_date:
+        return None, "End date cannot be before start date"
+
+    raw_cycle = row.get('start_day_of_cycle')
+    cycle_text = '' if raw_cycle is None else str(raw_cycle).strip()
+    start_day_of_cycle = parse_positive_int(cycle_text) if cycle_text else 1
+    if not start_day_of_cycle or start_day_of_cycle > pattern.cycle_length:
+        return None, f"Start day of cycle must be between 1 and {pattern.cycle_length}"
+
+    return {
+        'driver_id': driver_id,
+        'driver_number': driver_number,
+        'pattern_id': pattern.id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'start_day_of_cycle': start_day_of_cycle,
+    }, None
+
+
+def apply_bulk_pattern_assignments(rows, dry_run=False):
+    """Assign shift patterns to many drivers in one transaction.
+
+    ``rows`` are dicts keyed by ``BULK_ASSIGNMENT_COLUMNS`` (``pattern`` is an
+    id or a name) plus an optional ``line``. Drivers, pattern headers and every
+    named driver's assignments are loaded once; each valid row then pauses and
+    resumes overlapping assignments in memory exactly as
+    ``assign_pattern_to_driver`` would, in input order, and all inserts and
+    updates are flushed together. Invalid rows are skipped. Returns one result
+    dict per row; with ``dry_run`` nothing is saved.
+    """
+    driver_ids_by_number = {
+        number: driver_id
+        for driver_id, number in db.session.execute(select(Driver.id, Driver.driver_number))
+    }
+    patterns_by_key = {}
+    for pattern in db.session.execute(select(ShiftPattern.id, ShiftPattern.name, ShiftPattern.cycle_length)):
+        patterns_by_key[str(pattern.id)] = pattern
+        patterns_by_key.setdefault(pattern.name.strip().casefold(), pattern)
+
+    parsed = []
+    for index, row in enumerate(rows, start=1):
+        values, error = parse_bulk_assignment_row(row, driver_ids_by_number, patterns_by_key)
+        parsed.append((row.get('line', index), values, error))
+
+    driver_ids = {values['driver_id'] for _, values, _ in parsed if values}
+    assignments_by_driver = {driver_id: [] for driver_id in driver_ids}
+    if driver_ids:
+        existing = (
+            DriverAssignment.query
+            .filter(DriverAssignment.driver_id.in_(driver_ids))
+            .order_by(DriverAssignment.start_date, DriverAssignment.id)
+            .all()
+        )
+        for assignment in existing:
+            assignments_by_driver[assignment.driver_id].append(assignment)
+
+    results = []
+    created = []
+    # Pause/resume links are recorded here and written as FK columns once new rows have ids,
+    # so the inserts and updates are each sent as one batch rather than ordered row by row
+    paused_by = {}
+    resumes = {}
+    for line, values, error in parsed:
+        if error:
+            results.append({'line': line, 'ok': False, 'error': error})
+            continue
+        start_date, end_date = values['start_date'], values['end_date']
+        driver_assignments = assignments_by_driver[values['driver_id']]
+        overlapping_assignments = [
+            existing for existing in driver_assignments
+            if existing.start_date < start_date and (existing.end_date is None or existing.end_date >= start_date)
+        ]
+        assignment = DriverAssignment(
+            driver_id=values['driver_id'],
+            shift_pattern_id=values['pattern_id'],
+            start_date=start_date,
+            end_date=end_date,
+            start_day_of_cycle=values['start_day_of_cycle'],
+        )
+        db.session.add(assignment)
+        driver_assignments.append(assignment)
+
+        resumptions = []
+        for overlapping in overlapping_assignments:
+            original_end_date = overlapping.end_date
+            overlapping.original_end_date = original_end_date
+            overlapping.end_date = start_date - timedelta(days=1)
+            paused_by[overlapping] = assignment
+            # A temporary assignment hands back to whatever it interrupted
+            if end_date and (original_end_date is None or original_end_date > end_date):
+                resumption = DriverAssignment(
+                    driver_id=values['driver_id'],
+                    shift_pattern_id=overlapping.shift_pattern_id,
+                    start_date=end_date + timedelta(days=1),
+                    end_date=original_end_date,
+                    start_day_of_cycle=overlapping.start_day_of_cycle,
+                )
+                resumes[resumption] = overlapping
+                db.session.add(resumption)
+                driver_assignments.append(resumption)
+                resumptions.append(resumption)
+
+        result = {
+            'line': line,
+            'ok': True,
+            'driver_number': values['driver_number'],
+            'paused': len(overlapping_assignments),
+            'resumed': len(resumptions),
+        }
+        results.append(result)
+        created.append((result, assignment))
+
+    if not created or dry_run:
+        db.session.rollback()
+        return results
+
+    db.session.flush()
+    for paused, assignment in paused_by.items():
+        paused.paused_by_assignment_id = assignment.id
+    for resumption, resumed in resumes.items():
+        resumption.resumes_assignment_id = resumed.id
+    for result, assignment in created:
+        result['assignment_id'] = assignment.id
+    db.session.commit()
+    return results
+
+
+def read_bulk_assignment_csv(csv_text):
+    """Parse bulk assignment CSV text into rows; returns ``(rows, error_message)``."""
+    reader = csv.DictReader(io.StringIO(csv_text))
+    fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in ('driver_number', 'pattern', 'start_date') if column not in fieldnames]
+    if missing:
+        return None, f"CSV is missing column(s): {', '.join(missing)}"
+    reader.fieldnames = fieldnames
+    rows = []
+    for row in reader:
+        if len(rows) >= BULK_ASSIGNMENT_MAX_ROWS:
+            return None, f"Cannot import more than {BULK_ASSIGNMENT_MAX_ROWS} rows at once."
+        if not any((value or '').strip() for value in row.values() if isinstance(value, str)):
+            continue
+        row['line'] = reader.line_num
+        rows.append(row)
+    return rows, None
+
+
+def bulk_assignment_response(rows, dry_run):
+    try:
+        results = apply_bulk_pattern_assignments(rows, dry_run=dry_run)
+    except Exception as e:
+        db.session.rollback()
+        return json_error(f"Error assigning patterns: {str(e)}", 500)
+    failed = sum(1 for result in results if not result['ok'])
+    return json_success(
+        dry_run=dry_run,
+        assigned=len(results) - failed,
+        failed=failed,
+        results=results,
+    )
+
+
+@app.route("/assignments/bulk", methods=["POST"])
+def bulk_assign_patterns():
+    """Assign patterns to many drivers in one transaction (JSON rows; per-row results)."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('rows'), list):
+        return json_error("Expected a JSON object with a 'rows' list.")
+    rows = payload['rows']
+    if len(rows) > BULK_ASSIGNMENT_MAX_ROWS:
+        return json_error(f"Cannot assign more than {BULK_ASSIGNMENT_MAX_ROWS} rows at once.")
+    if not all(isinstance(row, dict) for row in rows):
+        return json_error("Each row must be an object.")
+    return bulk_assignment_response(rows, bool(payload.get('dry_run')))
+
+
+@app.route("/assignments/import", methods=["POST"])
+def import_pattern_assignments():
+    """Assign patterns from an uploaded CSV (driver_number, pattern, start_date, end_date, start_day_of_cycle)."""
+    upload = request.files.get('file')
+    raw = upload.read() if upload else request.get_data()
+    try:
+        csv_text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return json_error("CSV must be UTF-8 encoded.")
+    if not csv_text.strip():
+        return json_error("No CSV data received.")
+    rows, error = read_bulk_assignment_csv(csv_text)
+    if error:
+        return json_error(error)
+    dry_run = request.values.get('dry_run') in ('1', 'true', 'on', 'yes')
+    return bulk_assignment_response(rows, dry_run)
+
+@app.route("/driver/<int:driver_id>/assign-pattern/suggest-offset", methods=["POST"])
+def suggest_assignment_offset(driver_id):
+    """Rank every start_day_of_cycle for a pattern by projected coverage (AJAX/JSON)."""
+    driver = db.get_or_404(Driver, driver_id)
+    if np is None:
+        return json_error("Offset suggestions require NumPy to be installed.", 501)
+
+    payload = request.get_json(silent=True) or request.form
+    if not isinstance(payload, dict):
+        return json_error("Expected a JSON object.")
+    assignment = None
+    assignment_id = parse_optional_int(payload.get("assignment_id"))
+    if assignment_id:
+        assignment = DriverAssignment.query.filter_by(id=assignment_id, driver_id=driver.id).first()
+        if not assignment:
+            return json_error("Assignment not found.", 404)
+
+    pattern_id = parse_optional_int(payload.get("pattern_id")) or (assignment.shift_pattern_id if assignment else None)
+    pattern = db.session.get(ShiftPattern, pattern_id) if pattern_id else None
+    if not pattern:
+        return json_error("Invalid shift pattern")
+
+    if payload.get("start_date"):
+        start_date = parse_date_string(payload.get("start_date"))
+    elif assignment:
+        start_date = max(assignment.start_date, get_operational_date())
+    else:
+        start_date = None
+    if not start_date:
+        return json_error("Invalid start date")
+    end_date = parse_date_string(payload.get("end_date")) if payload.get("end_date") else (assignment.end_date if assignment else None)
+    if end_date and end_date < start_date:
+        return json_error("End date cannot be before start date")
+
+    weeks = parse_positive_int(payload.get("weeks"))
+    if payload.get("weeks") and (not weeks or weeks > FORECAST_MAX_WEEKS):
+        return json_error(f"Weeks must be between 1 and {FORECAST_MAX_WEEKS}.")
+
+    buckets, _ = get_forecast_buckets({timing.shift_type: timing for timing in ShiftTiming.query.all()})
+    targets, error = parse_forecast_targets(payload.get("targets") if request.is_json else None, buckets)
+    if error:
+        return json_error(error)
+
+    suggestion = suggest_cycle_offsets(
+        driver, pattern, start_date, end_date=end_date, assignment=assignment, weeks=weeks, targets=targets
+    )
+    return json_success(
+        pattern_id=pattern.id,
+        start_date=suggestion['dates'][0].strftime("%Y-%m-%d"),
+        end_date=suggestion['dates'][1].strftime("%Y-%m-%d"),
+        buckets=suggestion['buckets'],
+        current_start_day_of_cycle=suggestion['current_start_day_of_cycle'],
+        offsets=suggestion['offsets'],
+    )
+
 @app.route("/driver/<int:driver_id>/assignment/<int:assignment_id>/end", methods=["POST"])
 def end_assignment(driver_id, assignment_id):
     """End an active driver assignment"""
@@ -3137,6 +5177,189 @@ def delete_driver(driver_id):
     
     return redirect(url_for("drivers"))
 
+DRIVER_CSV_COLUMNS = (
+    'driver_number', 'name', 'car_type', 'school_badge', 'pet_friendly',
+    'assistance_guide_dogs_exempt', 'electric_vehicle',
+)
+DRIVER_CSV_FLAGS = ('school_badge', 'pet_friendly', 'assistance_guide_dogs_exempt', 'electric_vehicle')
+DRIVER_CSV_TRUE = ('1', 'true', 'yes', 'y', 'on')
+DRIVER_CSV_FALSE = ('', '0', 'false', 'no', 'n', 'off')
+
+
+def parse_driver_csv_row(row, columns):
+    """Validate one driver CSV row; returns ``(values, error_message)`` for the given columns."""
+    values = {}
+    for column, limit in (('driver_number', 50), ('name', 100), ('car_type', 100)):
+        value = (row.get(column) or '').strip()
+        if not value:
+            return None, f"{column.replace('_', ' ').capitalize()} is required"
+        if len(value) > limit:
+            return None, f"{column.replace('_', ' ').capitalize()} cannot exceed {limit} characters"
+        values[column] = value
+    for column in DRIVER_CSV_FLAGS:
+        if column not in columns:
+            continue
+        flag = (row.get(column) or '').strip().lower()
+        if flag in DRIVER_CSV_TRUE:
+            values[column] = True
+        elif flag in DRIVER_CSV_FALSE:
+            values[column] = False
+        else:
+            return None, f"Invalid value for {column}: {row.get(column)}"
+    return values, None
+
+
+def upsert_drivers(rows, update_columns):
+    """Insert or update a batch of driver rows keyed by ``driver_number``.
+
+    Uses one ``INSERT ... ON CONFLICT (driver_number) DO UPDATE`` on SQLite and
+    PostgreSQL; other databases fall back to loading the batch's drivers and
+    updating them through the ORM.
+    """
+    dialect_insert = {'sqlite': sqlite_insert, 'postgresql': pg_insert}.get(db.session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(Driver)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Driver.driver_number],
+            set_={column: stmt.excluded[column] for column in update_columns},
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    existing = {
+        driver.driver_number: driver
+        for driver in Driver.query.filter(Driver.driver_number.in_([row['driver_number'] for row in rows]))
+    }
+    for row in rows:
+        driver = existing.get(row['driver_number'])
+        if driver is None:
+            db.session.add(Driver(**row))
+        else:
+            for column in update_columns:
+                setattr(driver, column, row[column])
+    db.session.flush()
+
+
+def import_drivers_csv(lines, dry_run=False, batch_size=DRIVER_IMPORT_BATCH):
+    """Upsert drivers from CSV text lines, a batch at a time, in one transaction.
+
+    The header must include driver_number, name and car_type; flag columns
+    that are left out keep their stored values on update. Rows that fail
+    validation, or repeat a driver number from earlier in the file, are
+    skipped. Returns ``{'created', 'updated', 'errors': [{'line', 'error'}]}``.
+    """
+    reader = csv.DictReader(lines)
+    columns = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in ('driver_number', 'name', 'car_type') if column not in columns]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    reader.fieldnames = columns
+    update_columns = [column for column in DRIVER_CSV_COLUMNS if column in columns and column != 'driver_number']
+
+    summary = {'created': 0, 'updated': 0, 'errors': []}
+    seen_lines = {}
+    batch = []
+
+    def flush_batch():
+        numbers = [row['driver_number'] for row in batch]
+        existing = set(db.session.scalars(select(Driver.driver_number).where(Driver.driver_number.in_(numbers))))
+        summary['updated'] += len(existing)
+        summary['created'] += len(batch) - len(existing)
+        if not dry_run:
+            upsert_drivers(batch, update_columns)
+        batch.clear()
+
+    for row in reader:
+        if not any((value or '').strip() for value in row.values() if isinstance(value, str)):
+            continue
+        line = reader.line_num
+        values, error = parse_driver_csv_row(row, columns)
+        if values and values['driver_number'] in seen_lines:
+            error = f"Driver number {values['driver_number']} already appears on line {seen_lines[values['driver_number']]}"
+        if error:
+            summary['errors'].append({'line': line, 'error': error})
+            continue
+        seen_lines[values['driver_number']] = line
+        batch.append(values)
+        if len(batch) >= batch_size:
+            flush_batch()
+    if batch:
+        flush_batch()
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return summary
+
+
+@app.route("/drivers/import", methods=["POST"])
+def import_drivers():
+    """Create or update drivers from an uploaded CSV, matched by driver number."""
+    # Form posts from the drivers page get flashes; scripts and AJAX get the per-line report as JSON
+    is_ajax = is_ajax_request() or request.accept_mimetypes.best == 'application/json'
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    dry_run = request.values.get('dry_run') in ('1', 'true', 'on', 'yes')
+
+    try:
+        summary = import_drivers_csv(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''), dry_run=dry_run)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        error_msg = f"Error importing drivers: {str(e)}"
+        if is_ajax:
+            return json_error(error_msg)
+        flash(error_msg, "error")
+        return redirect(url_for("drivers"))
+    except Exception as e:
+        db.session.rollback()
+        error_msg = f"Error importing drivers: {str(e)}"
+        if is_ajax:
+            return json_error(error_msg, 500)
+        flash(error_msg, "error")
+        return redirect(url_for("drivers"))
+
+    if is_ajax:
+        return json_success(dry_run=dry_run, **summary)
+    if dry_run:
+        message = f"File checked: {summary['created']} driver(s) would be added, {summary['updated']} updated. Nothing was saved."
+    else:
+        message = f"{summary['created']} driver(s) added, {summary['updated']} updated."
+    flash(message, "success")
+    for error in summary['errors'][:10]:
+        flash(f"Line {error['line']}: {error['error']}", "error")
+    if len(summary['errors']) > 10:
+        flash(f"{len(summary['errors']) - 10} more line(s) were skipped.", "error")
+    return redirect(url_for("drivers"))
+
+
+def stream_drivers_csv(batch_size=DRIVER_IMPORT_BATCH):
+    """Yield the driver list as CSV, reading ``batch_size`` drivers at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(DRIVER_CSV_COLUMNS)
+    columns = [getattr(Driver, column) for column in DRIVER_CSV_COLUMNS]
+    query = select(*columns).order_by(Driver.driver_number).execution_options(yield_per=batch_size)
+    for row in db.session.execute(query):
+        writer.writerow([
+            ('Y' if value else '') if column in DRIVER_CSV_FLAGS else value
+            for column, value in zip(DRIVER_CSV_COLUMNS, row)
+        ])
+        if buffer.tell() >= 16384:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+@app.route("/export/drivers.csv")
+def export_drivers_csv():
+    """Stream every driver as CSV in the format accepted by the driver import."""
+    response = Response(stream_with_context(stream_drivers_csv()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = 'attachment; filename="drivers.csv"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 # -----------------------------------------------------------------------------
 # Routes: Daily Sheets
 # -----------------------------------------------------------------------------
@@ -3146,27 +5369,20 @@ def daily_sheet_form():
     """Show form to generate daily shift sheet"""
     return render_template("daily_sheet_form.html")
 
-@app.route("/daily-sheet/generate", methods=["POST"])
+@app.route("/daily-sheet/generate", methods=["GET", "POST"])
 def generate_daily_sheet():
     """Generate daily shift sheet for a specific date"""
-    target_date_str = request.form.get("target_date")
+    target_date_str = request.values.get("target_date")
     
     try:
         target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
     except (ValueError, TypeError):
         flash("Invalid date format", "error")
         return redirect(url_for("daily_sheet_form"))
-    
-    drivers_by_shift = get_drivers_for_date(target_date)
-    all_timings = ShiftTiming.query.order_by(ShiftTiming.start_time, ShiftTiming.shift_type).all()
-    timings = {timing.shift_type: timing for timing in all_timings}
-    total_drivers = len({info['driver'].id for drivers_list in drivers_by_shift.values() for info in drivers_list})
 
-    return render_template("daily_sheet.html",
-                         target_date=target_date,
-                         drivers_by_shift=drivers_by_shift,
-                         timings=timings,
-                         total_drivers=total_drivers)
+    if request.method == "GET":
+        return render_cached_daily_sheet("daily_sheet.html", target_date)
+    return render_template("daily_sheet.html", **build_daily_sheet_context(target_date))
 
 @app.route("/daily-sheet/print")
 def print_daily_sheet():
@@ -3178,65 +5394,217 @@ def print_daily_sheet():
     except (ValueError, TypeError):
         flash("Invalid date format", "error")
         return redirect(url_for("daily_sheet_form"))
-    
-    drivers_by_shift = get_drivers_for_date(target_date)
-    all_timings = ShiftTiming.query.order_by(ShiftTiming.start_time, ShiftTiming.shift_type).all()
-    timings = {timing.shift_type: timing for timing in all_timings}
-    total_drivers = len({info['driver'].id for drivers_list in drivers_by_shift.values() for info in drivers_list})
 
-    return render_template("print_daily_sheet.html",
-                         target_date=target_date,
-                         drivers_by_shift=drivers_by_shift,
-                         timings=timings,
-                         total_drivers=total_drivers)
+    return render_cached_daily_sheet("print_daily_sheet.html", target_date)
+
+@app.route("/daily-sheet/print.pdf")
+def print_daily_sheet_pdf():
+    """Daily shift sheet(s) as a server-rendered PDF (``days`` for a multi-day batch)."""
+    target_date = parse_date_string(request.args.get("date", ""))
+    if not target_date:
+        flash("Invalid date format", "error")
+        return redirect(url_for("daily_sheet_form"))
+    days = parse_positive_int(request.args.get("days")) or 1
+    if days > DAILY_SHEET_PDF_MAX_DAYS:
+        flash(f"A PDF can hold at most {DAILY_SHEET_PDF_MAX_DAYS} days of sheets.", "error")
+        return redirect(url_for("daily_sheet_form"))
+
+    path = get_daily_sheet_pdf(target_date, days)
+    filename = f"daily-sheet_{target_date.isoformat()}" + (f"_{days}d" if days > 1 else '') + '.pdf'
+    return send_file(path, mimetype='application/pdf', download_name=filename, conditional=True, max_age=0)
+
+
+@app.route("/live/roster")
+def live_roster_stream():
+    """Server-sent events: today's and tomorrow's roster, then a diff after each change."""
+    max_streams = app.config.get('LIVE_ROSTER_MAX_STREAMS', 0)
+    if max_streams and live_roster_broker.subscriber_count() >= max_streams:
+        # Each stream holds a worker thread; past the limit the sheet just isn't live
+        response = make_response(json_error("Too many live roster streams on this worker.", 503))
+        response.headers['Retry-After'] = str(app.config.get('LIVE_ROSTER_HEARTBEAT_SECONDS', 15))
+        return response
+    subscriber, snapshot = live_roster_broker.subscribe(start_worker=not app.testing)
+    heartbeat = app.config.get('LIVE_ROSTER_HEARTBEAT_SECONDS', 15)
+
+    def stream():
+        try:
+            yield format_sse('snapshot', {
+                'dates': snapshot['dates'],
+                'entries': list(snapshot['entries'].values()),
+            })
+            while True:
+                try:
+                    diff = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    if not live_roster_broker.is_subscribed(subscriber):
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse('diff', diff)
+        finally:
+            live_roster_broker.unsubscribe(subscriber)
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# -----------------------------------------------------------------------------
+# Routes: Roster Export
+# -----------------------------------------------------------------------------
+
+def parse_export_range(from_str, to_str):
+    """Parse a roster export range, defaulting to the current calendar month.
+
+    Returns ``(start_date, end_date, error_message)``.
+    """
+    today = date.today()
+    month_start = today.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    start_date = parse_date_string(from_str) if from_str else month_start
+    end_date = parse_date_string(to_str) if to_str else month_end
+    if not start_date or not end_date:
+        return None, None, "Invalid date format."
+    if end_date < start_date:
+        return None, None, "End date must be on or after the start date."
+    if (end_date - start_date).days + 1 > EXPORT_MAX_DAYS:
+        return None, None, f"Date range cannot exceed {EXPORT_MAX_DAYS} days."
+    return start_date, end_date, None
+
+
+def roster_export_response(body, mimetype, extension, start_date, end_date):
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    filename = f"roster_{start_date.isoformat()}_{end_date.isoformat()}.{extension}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route("/export/roster.csv")
+def export_roster_csv():
+    """Stream who worked what and when over a date range as CSV."""
+    start_date, end_date, error = parse_export_range(request.args.get("from"), request.args.get("to"))
+    if error:
+        flash(error, "error")
+        return redirect(url_for("daily_sheet_form"))
+    body = stream_roster_csv(iter_roster_export_rows(start_date, end_date))
+    return roster_export_response(body, 'text/csv', 'csv', start_date, end_date)
+
+
+@app.route("/export/roster.xlsx")
+def export_roster_xlsx():
+    """Stream who worked what and when over a date range as an Excel workbook."""
+    start_date, end_date, error = parse_export_range(request.args.get("from"), request.args.get("to"))
+    if error:
+        flash(error, "error")
+        return redirect(url_for("daily_sheet_form"))
+    body = stream_roster_xlsx(iter_roster_export_rows(start_date, end_date))
+    return roster_export_response(
+        body,
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'xlsx',
+        start_date,
+        end_date,
+    )
+
+# -----------------------------------------------------------------------------
+# Routes: Calendar Feeds
+# -----------------------------------------------------------------------------
+
+@app.route("/driver/<int:driver_id>/shifts.ics")
+def driver_calendar_feed(driver_id):
+    """iCalendar feed of one driver's shifts and time off, regenerated only when their inputs change."""
+    driver_version = db.session.execute(
+        select(Driver.schedule_version).where(Driver.id == driver_id)
+    ).scalar_one_or_none()
+    if driver_version is None:
+        return json_error("Driver not found", 404)
+    start_date, end_date = get_calendar_window()
+    cache_key = (
+        'driver', driver_id, driver_version, get_roster_version(SHARED_SCHEDULE_VERSION_KEY), start_date,
+    )
+    return calendar_feed_response(
+        cache_key,
+        lambda: render_driver_calendar(db.session.get(Driver, driver_id), start_date, end_date),
+    )
+
+
+@app.route("/calendar/<token>/fleet.ics")
+def fleet_calendar_feed(token):
+    """Token-protected iCalendar feed of every driver's shifts and time off."""
+    feed_token = get_calendar_feed_token()
+    if not feed_token or not hmac.compare_digest(token, feed_token):
+        return json_error("Calendar feed not found", 404)
+    start_date, end_date = get_calendar_window()
+    cache_key = ('fleet', get_roster_version(), start_date)
+    return calendar_feed_response(cache_key, lambda: render_fleet_calendar(start_date, end_date))
 
 # -----------------------------------------------------------------------------
 # Cars Working Helpers and Routes
 # -----------------------------------------------------------------------------
 
-def get_cars_working_at_time(target_date, target_time):
-    """Get count of cars working at a specific date and time"""
-    assignments = get_active_assignments_for_date(target_date)
-    timings_dict = {t.shift_type: t for t in ShiftTiming.query.all()}
+_cars_working_cache = OrderedDict()
+_cars_working_cache_lock = threading.Lock()
 
-    driver_ids = []
-    seen_driver_ids = set()
-    for assignment in assignments:
-        if assignment.driver_id in seen_driver_ids:
-            continue
-        seen_driver_ids.add(assignment.driver_id)
-        driver_ids.append(assignment.driver_id)
 
-    cars_working = 0
-    for driver_id in driver_ids:
-        driver = db.session.get(Driver, driver_id)
-        if not driver:
-            continue
+def _shift_covers_time(start_time, end_time, target_time):
+    if end_time < start_time:
+        return target_time >= start_time or target_time < end_time
+    return start_time <= target_time < end_time
 
-        effective_shifts = get_driver_shifts_for_date(driver, target_date, timings_dict=timings_dict, include_swaps=True)
-        is_working_now = False
-        for shift in effective_shifts:
-            if shift.get('shift_type') == 'day_off':
-                continue
 
-            start_time = shift.get('start_time')
-            end_time = shift.get('end_time')
+def get_cars_working_windows(target_date):
+    """Return each working driver's ``((start, end), ...)`` shift times on a date.
 
-            if start_time is None or end_time is None:
-                continue
-            if end_time < start_time:
-                if target_time >= start_time or target_time < end_time:
-                    is_working_now = True
-                    break
-            else:
-                if start_time <= target_time < end_time:
-                    is_working_now = True
-                    break
+    Drivers with an active pattern assignment are resolved through one
+    RosterWindow, and the result is cached per roster version, so every
+    point of the day (and the whole curve) is answered from memory.
+    """
+    version, version_at = get_roster_version()
+    cache_key = (target_date, version, version_at)
+    cached = lru_cache_get(_cars_working_cache, _cars_working_cache_lock, cache_key)
+    if cached is not None:
+        return cached
+
+    driver_ids = sorted({assignment.driver_id for assignment in get_active_assignments_for_date(target_date)})
+    windows = []
+    if driver_ids:
+        roster = RosterWindow(target_date, target_date, driver_ids=driver_ids)
+        for driver in Driver.query.filter(Driver.id.in_(driver_ids)).order_by(Driver.id):
+            effective_shifts = get_driver_shifts_for_date(
+                driver, target_date, roster.timings_dict, include_swaps=True, roster=roster
+            )
+            spans = tuple(
+                (shift['start_time'], shift['end_time'])
+                for shift in effective_shifts
+                if shift.get('shift_type') != 'day_off'
+                and shift.get('start_time') is not None
+                and shift.get('end_time') is not None
+            )
+            if spans:
+                windows.append(spans)
+    windows = tuple(windows)
+    lru_cache_put(_cars_working_cache, _cars_working_cache_lock, cache_key, windows, CARS_WORKING_CACHE_SIZE)
+    return windows
+
+
+def get_cars_working_at_time(target_date, target_time):
+    """Get count of cars working at a specific date and time"""
+    return sum(
+        1 for spans in get_cars_working_windows(target_date)
+        if any(_shift_covers_time(start, end, target_time) for start, end in spans)
+    )
 
-        if is_working_now:
-            cars_working += 1
-    
-    return cars_working
+
+def get_cars_working_curve(target_date, step_minutes=CARS_WORKING_CURVE_STEP_MINUTES):
+    """Return ``[(time, cars working)]`` every ``step_minutes`` across the date."""
+    windows = get_cars_working_windows(target_date)
+    points = []
+    for minute in range(0, 24 * 60, step_minutes):
+        slot = time(minute // 60, minute % 60)
+        count = sum(1 for spans in windows if any(_shift_covers_time(start, end, slot) for start, end in spans))
+        points.append((slot, count))
+    return points
 
 @app.route("/cars-working", methods=["GET", "POST"])
 def cars_working():
@@ -3266,6 +5634,22 @@ def cars_working():
     
     return render_template("cars_working.html", timings=all_timings_dict)
 
+@app.route("/cars-working/curve")
+def cars_working_curve():
+    """Cars working through a day at fixed intervals (JSON)."""
+    target_date = parse_date_string(request.args.get("date")) if request.args.get("date") else get_operational_date()
+    if not target_date:
+        return json_error("Invalid date format.")
+    step = parse_positive_int(request.args.get("step")) or CARS_WORKING_CURVE_STEP_MINUTES
+    if step > 24 * 60 or (24 * 60) % step:
+        return json_error("Step must divide the day into whole intervals.")
+    points = get_cars_working_curve(target_date, step)
+    return json_success(
+        date=target_date.isoformat(),
+        step_minutes=step,
+        points=[{'time': slot.strftime('%H:%M'), 'count': count} for slot, count in points],
+    )
+
     # -----------------------------------------------------------------------------
     # Routes: Driver Custom Timings
     # -----------------------------------------------------------------------------
@@ -3822,12 +6206,12 @@ def add_custom_timing_ajax(driver_id):
 # Scheduling Helpers
 # -----------------------------------------------------------------------------
 
-def _get_shift_datetime(driver, target_date, timings_dict=None):
+def _get_shift_datetime(driver, target_date, timings_dict=None, roster=None):
     """Return (start_datetime, end_datetime) for a driver on a date, or (None, None)."""
     if timings_dict is None:
-        timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+        timings_dict = roster.timings_dict if roster is not None else {st.shift_type: st for st in ShiftTiming.query.all()}
 
-    shifts = get_driver_shifts_for_date(driver, target_date, timings_dict)
+    shifts = get_driver_shifts_for_date(driver, target_date, timings_dict, roster=roster)
     # shifts is a list of dicts with 'start_time', 'end_time'
     if not shifts:
         return None, None
@@ -3850,11 +6234,24 @@ def _get_shift_datetime(driver, target_date, timings_dict=None):
     return earliest_start, latest_end
 
 
-def validate_swap(driver, give_up_date, work_date, work_shift_types):
+def build_swap_roster(driver, dates, timings_dict=None):
+    """Return a RosterWindow for one driver covering everything swap rules inspect for ``dates``.
+
+    That is the adjacent days (rest rule) and the full ISO weeks (weekly limit).
+    """
+    first, last = min(dates), max(dates)
+    start = min(first - timedelta(days=1), first - timedelta(days=first.weekday()))
+    end = max(last + timedelta(days=1), last + timedelta(days=6 - last.weekday()))
+    return RosterWindow(start, end, driver_ids=[driver.id], timings_dict=timings_dict)
+
+
+def validate_swap(driver, give_up_date, work_date, work_shift_types, roster=None):
     """Validate a single-driver day swap with one or more work shift types.
 
     ``work_shift_types`` may be a comma-separated string or a list of strings.
     Multiple types are only valid when they are all sub-shifts of the same parent.
+    Pass a ``roster`` (see ``build_swap_roster``) to evaluate many proposals
+    for the same driver without re-querying; one is built when omitted.
     """
     # Normalise to list
     if isinstance(work_shift_types, str):
@@ -3862,7 +6259,9 @@ def validate_swap(driver, give_up_date, work_date, work_shift_types):
     work_shift_types = [t for t in work_shift_types if t]
 
     errors = []
-    timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+    if roster is None or not (roster.covers(driver.id, give_up_date) and roster.covers(driver.id, work_date)):
+        roster = build_swap_roster(driver, [give_up_date, work_date])
+    timings_dict = roster.timings_dict
     same_day_selection = give_up_date == work_date
 
     if not work_shift_types:
@@ -3874,7 +6273,7 @@ def validate_swap(driver, give_up_date, work_date, work_shift_types):
             errors.append("Please choose a valid shift type for the work date.")
             return errors
 
-    if not is_school_term_operational_day(work_date):
+    if not is_school_term_operational_day(work_date, roster=roster):
         term_only_selected = [wst for wst in work_shift_types if timings_dict.get(wst) and timings_dict[wst].school_term_only]
         if term_only_selected:
             labels = ', '.join(shift_label(wst) for wst in term_only_selected)
@@ -3891,17 +6290,11 @@ def validate_swap(driver, give_up_date, work_date, work_shift_types):
             errors.append("When selecting multiple shift types, all selected shifts must be sub-shifts.")
             return errors
 
-    existing_swaps = ShiftSwap.query.filter(
-        ShiftSwap.driver_a_id == driver.id,
-        ShiftSwap.driver_b_id == driver.id,
-        ShiftSwap.work_shift_type.isnot(None),
-        or_(
-            ShiftSwap.date_a == give_up_date,
-            ShiftSwap.date_b == give_up_date,
-            ShiftSwap.date_a == work_date,
-            ShiftSwap.date_b == work_date,
-        ),
-    ).all()
+    existing_swaps = list({
+        swap.id: swap
+        for selected_date in (give_up_date, work_date)
+        for swap in roster.swaps_for(driver.id, selected_date)
+    }.values())
     if existing_swaps:
         for selected_date in {give_up_date, work_date}:
             date_swaps = [
@@ -3929,18 +6322,18 @@ def validate_swap(driver, give_up_date, work_date, work_shift_types):
                 )
                 return errors
 
-    if is_driver_on_holiday(driver.id, work_date):
+    if is_driver_on_holiday(driver.id, work_date, roster=roster):
         errors.append(f"{driver.formatted_name()} is marked as time off on {work_date.strftime('%d/%m/%Y')}.")
 
-    if is_driver_on_holiday(driver.id, give_up_date):
+    if is_driver_on_holiday(driver.id, give_up_date, roster=roster):
         errors.append(f"{driver.formatted_name()} is already marked as time off on {give_up_date.strftime('%d/%m/%Y')}.")
 
-    base_give_up_entries = get_driver_shifts_for_date(driver, give_up_date, timings_dict, include_swaps=False)
+    base_give_up_entries = get_driver_shifts_for_date(driver, give_up_date, timings_dict, include_swaps=False, roster=roster)
     base_give_up_shift_exists = any(entry.get('shift_type') != 'day_off' for entry in base_give_up_entries)
-    effective_give_up_entries = get_driver_shifts_for_date(driver, give_up_date, timings_dict, include_swaps=True)
+    effective_give_up_entries = get_driver_shifts_for_date(driver, give_up_date, timings_dict, include_swaps=True, roster=roster)
     effective_give_up_shift_exists = any(entry.get('shift_type') != 'day_off' for entry in effective_give_up_entries)
     give_up_shift_exists = base_give_up_shift_exists or effective_give_up_shift_exists
-    base_work_entries = get_driver_shifts_for_date(driver, work_date, timings_dict, include_swaps=False)
+    base_work_entries = get_driver_shifts_for_date(driver, work_date, timings_dict, include_swaps=False, roster=roster)
     existing_base_work_shift = any(entry.get('shift_type') != 'day_off' for entry in base_work_entries)
 
     if not give_up_shift_exists:
@@ -3960,63 +6353,1148 @@ def validate_swap(driver, give_up_date, work_date, work_shift_types):
     if existing_base_work_shift and not same_day_selection:
         errors.append(f"{driver.formatted_name()} already has a working shift on {work_date.strftime('%d/%m/%Y')}.")
 
-    if errors:
-        return errors
+    if errors:
+        return errors
+
+    # Rest rule: use earliest start and latest end across all selected shift types
+    start_times = [timings_dict[wst].start_time for wst in work_shift_types if timings_dict[wst].start_time]
+    end_times = [timings_dict[wst].end_time for wst in work_shift_types if timings_dict[wst].end_time]
+    if not start_times or not end_times:
+        errors.append("Selected shift type has incomplete timing configuration.")
+        return errors
+    work_start_time = min(start_times)
+    work_end_time = max(end_times)
+
+    latest_late_start, earliest_early_finish = get_adjustment_conflict_bounds(driver.id, work_date, roster=roster)
+    if latest_late_start is not None and work_start_time is not None:
+        work_start_time = latest_late_start
+    if earliest_early_finish is not None and work_end_time is not None:
+        work_end_time = earliest_early_finish
+
+    work_start = datetime.combine(work_date, work_start_time)
+    work_end = datetime.combine(work_date, work_end_time)
+    if work_end_time < work_start_time:
+        work_end += timedelta(days=1)
+
+    def _check_rest_with_adjacent_days(check_date, new_start, new_end, removed_shift_dates=None):
+        inner_errors = []
+        removed_shift_dates = removed_shift_dates or set()
+
+        def _adjacent_shift_window(adjacent_date):
+            if adjacent_date in removed_shift_dates:
+                return None, None
+            return _get_shift_datetime(driver, adjacent_date, timings_dict, roster=roster)
+
+        prev_date = check_date - timedelta(days=1)
+        prev_start, prev_end = _adjacent_shift_window(prev_date)
+        if prev_end and new_start:
+            rest = (new_start - prev_end).total_seconds() / 3600
+            if rest < MIN_REST_HOURS:
+                inner_errors.append(
+                    f"{driver.formatted_name()} would have only {rest:.1f}h rest before the shift on "
+                    f"{check_date.strftime('%d/%m/%Y')} (minimum {MIN_REST_HOURS} hours required)."
+                )
+
+        next_date = check_date + timedelta(days=1)
+        next_start, next_end = _adjacent_shift_window(next_date)
+        if new_end and next_start:
+            rest = (next_start - new_end).total_seconds() / 3600
+            if rest < MIN_REST_HOURS:
+                inner_errors.append(
+                    f"{driver.formatted_name()} would have only {rest:.1f}h rest after the shift on "
+                    f"{check_date.strftime('%d/%m/%Y')} (minimum {MIN_REST_HOURS} hours required)."
+                )
+
+        return inner_errors
+
+    errors += _check_rest_with_adjacent_days(work_date, work_start, work_end, removed_shift_dates={give_up_date})
+
+    # Weekly assignment limit: adjust the precomputed week count by what the swap adds and removes
+    weekly_limit, limit_pattern = roster.weekly_assignment_limit(driver.id, work_date)
+    if weekly_limit is not None and not same_day_selection:
+        work_week_days = roster.working_days_in_week(driver, work_date)
+        effective_work_entries = get_driver_shifts_for_date(driver, work_date, timings_dict, include_swaps=True, roster=roster)
+        if not any(entry.get('shift_type') != 'day_off' for entry in effective_work_entries):
+            work_week_days += 1
+        if effective_give_up_shift_exists and give_up_date.isocalendar()[:2] == work_date.isocalendar()[:2]:
+            work_week_days -= 1
+        if work_week_days > weekly_limit:
+            week_start = work_date - timedelta(days=work_date.weekday())
+            errors.append(
+                f"{driver.formatted_name()} would work {work_week_days} days in the week starting "
+                f"{week_start.strftime('%d/%m/%Y')}, above their weekly assignment limit of {weekly_limit} "
+                f"(pattern '{limit_pattern.name}')."
+            )
+
+    return errors
+
+
+def validate_swaps_batch(driver, proposals):
+    """Validate several (give_up_date, work_date, work_shift_types) proposals for one driver.
+
+    All proposals are checked against one preloaded roster window; each is
+    validated independently (they are alternatives, not a combined change).
+    Returns a list of error lists in proposal order.
+    """
+    if not proposals:
+        return []
+    dates = [proposal_date for proposal in proposals for proposal_date in proposal[:2]]
+    roster = build_swap_roster(driver, dates)
+    return [
+        validate_swap(driver, give_up_date, work_date, work_shift_types, roster=roster)
+        for give_up_date, work_date, work_shift_types in proposals
+    ]
+
+
+def plan_swap_options(driver, give_up_date, from_date, to_date):
+    """Return every legal (work_date, shift_type) swap for giving up ``give_up_date``.
+
+    Candidates are single shift types on each date in ``[from_date, to_date]``
+    (multi sub-shift combinations are left to the regular validate flow).
+    Returns ``(options, give_up_errors)``; ``give_up_errors`` is non-empty when
+    the give-up date itself cannot be swapped, in which case no options are tried.
+    """
+    timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+    candidate_timings = sorted(
+        (timing for timing in timings_dict.values() if timing.shift_type != 'day_off'),
+        key=lambda timing: (timing.start_time or time.max, timing.shift_type),
+    )
+    roster = build_swap_roster(driver, [from_date, to_date, give_up_date], timings_dict=timings_dict)
+
+    give_up_errors = []
+    if is_driver_on_holiday(driver.id, give_up_date, roster=roster):
+        give_up_errors.append(
+            f"{driver.formatted_name()} is already marked as time off on {give_up_date.strftime('%d/%m/%Y')}."
+        )
+    elif not any(
+        entry.get('shift_type') != 'day_off'
+        for entry in get_driver_shifts_for_date(driver, give_up_date, timings_dict, include_swaps=True, roster=roster)
+    ) and not any(
+        entry.get('shift_type') != 'day_off'
+        for entry in get_driver_shifts_for_date(driver, give_up_date, timings_dict, include_swaps=False, roster=roster)
+    ):
+        give_up_errors.append(f"{driver.formatted_name()} has no working shift on {give_up_date.strftime('%d/%m/%Y')}.")
+    if give_up_errors:
+        return [], give_up_errors
+
+    options = []
+    current_date = from_date
+    while current_date <= to_date:
+        for timing in candidate_timings:
+            if validate_swap(driver, give_up_date, current_date, [timing.shift_type], roster=roster):
+                continue
+            options.append({
+                "work_date": current_date.strftime("%Y-%m-%d"),
+                "shift_type": timing.shift_type,
+                "label": timing.display_label,
+                "start_time": timing.start_time.strftime("%H:%M") if timing.start_time else None,
+                "end_time": timing.end_time.strftime("%H:%M") if timing.end_time else None,
+            })
+        current_date += timedelta(days=1)
+
+    return options, []
+
+
+# -----------------------------------------------------------------------------
+# Compliance Helpers
+# -----------------------------------------------------------------------------
+
+def collect_driver_work_intervals(driver, start_date, end_date, roster):
+    """Return merged (start_dt, end_dt) work blocks for a driver from shifts starting in the date range.
+
+    Scheduled shifts (with swaps, adjustments and custom timings applied) and
+    extra-car work are included; overnight shifts roll into the next day.
+    """
+    intervals = []
+    current_date = start_date
+    while current_date <= end_date:
+        entries = get_driver_shifts_for_date(
+            driver, current_date, roster.timings_dict, include_swaps=True, include_extra=True, roster=roster
+        )
+        for entry in entries:
+            if entry.get('shift_type') == 'day_off':
+                continue
+            if not entry.get('start_time') or not entry.get('end_time'):
+                continue
+            start_dt = datetime.combine(current_date, entry['start_time'])
+            end_dt = datetime.combine(current_date, entry['end_time'])
+            if end_dt <= start_dt:
+                end_dt += timedelta(days=1)
+            intervals.append((start_dt, end_dt))
+        current_date += timedelta(days=1)
+    return merge_work_intervals(intervals)
+
+
+def find_work_rule_violations(blocks):
+    """Yield rest shortfalls and rolling-24h overruns from sorted, merged work blocks.
+
+    Each violation is attributed to a ``date``: the day the short-rest block
+    starts, or the day the overrun window opens. Rest is checked between
+    consecutive blocks. For the 24-hour rule every
+    window starting at a block start is measured with a two-pointer sweep, so
+    the whole scan is linear in the number of blocks. Overlapping overrun
+    windows are reported once.
+    """
+    window = timedelta(hours=24)
+    for previous, following in zip(blocks, blocks[1:]):
+        rest = (following[0] - previous[1]).total_seconds() / 3600
+        if rest < MIN_REST_HOURS:
+            yield {
+                'rule': 'rest',
+                'date': following[0].date(),
+                'start': previous[1],
+                'end': following[0],
+                'hours': rest,
+            }
+
+    durations = [(end_dt - start_dt).total_seconds() / 3600 for start_dt, end_dt in blocks]
+    reported_until = None
+    covered_hours = 0.0
+    right = 0
+    for left, (window_start, _) in enumerate(blocks):
+        window_end = window_start + window
+        while right < len(blocks) and blocks[right][0] < window_end:
+            covered_hours += durations[right]
+            right += 1
+        overhang = max(timedelta(0), blocks[right - 1][1] - window_end).total_seconds() / 3600
+        total = covered_hours - overhang
+        if total > MAX_WORK_HOURS_PER_24H and (reported_until is None or window_start >= reported_until):
+            yield {
+                'rule': 'max_24h',
+                'date': window_start.date(),
+                'start': window_start,
+                'end': window_end,
+                'hours': total,
+            }
+            reported_until = window_end
+        covered_hours -= durations[left]
+
+
+def scan_work_time_compliance(start_date, end_date, driver_ids=None):
+    """Yield working-time violations for every driver between ``start_date`` and ``end_date``.
+
+    One roster window is preloaded for the whole range, then drivers are
+    scanned one at a time so results can be streamed. Each violation is a dict
+    with ``driver``, ``rule`` (``'rest'`` or ``'max_24h'``), ``date``, ``start``,
+    ``end`` and ``hours``; only violations dated inside the range are reported.
+    """
+    # The previous day is included so rest before the first shift is checked
+    scan_start = start_date - timedelta(days=1)
+    roster = RosterWindow(scan_start, end_date + timedelta(days=1), driver_ids=driver_ids)
+    drivers_query = Driver.query.order_by(Driver.driver_number)
+    if driver_ids is not None:
+        drivers_query = drivers_query.filter(Driver.id.in_(driver_ids))
+
+    for driver in drivers_query.all():
+        blocks = collect_driver_work_intervals(driver, scan_start, end_date, roster)
+        for violation in find_work_rule_violations(blocks):
+            if start_date <= violation['date'] <= end_date:
+                violation['driver'] = driver
+                yield violation
+
+
+# -----------------------------------------------------------------------------
+# Roster Export Helpers
+# -----------------------------------------------------------------------------
+
+ROSTER_EXPORT_COLUMNS = [
+    'Date', 'Driver Number', 'Driver', 'Car Type', 'Shift Type', 'Shift',
+    'Start', 'End', 'Hours', 'Extra', 'Swap', 'Adjusted', 'Custom Time',
+]
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Roster" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def iter_roster_export_rows(start_date, end_date, batch_size=EXPORT_DRIVER_BATCH):
+    """Yield one row per worked shift between the dates, driver by driver.
+
+    Drivers are resolved a batch at a time through a RosterWindow limited to
+    that batch, so memory stays flat however long the range or large the fleet.
+    Rows follow ``ROSTER_EXPORT_COLUMNS``; hours is a float, flags are 'Y' or ''.
+    """
+    timings_dict = {timing.shift_type: timing for timing in ShiftTiming.query.all()}
+    driver_ids = [
+        row.id for row in Driver.query.order_by(Driver.driver_number, Driver.id).with_entities(Driver.id)
+    ]
+
+    for offset in range(0, len(driver_ids), batch_size):
+        batch_ids = driver_ids[offset:offset + batch_size]
+        roster = RosterWindow(start_date, end_date, driver_ids=batch_ids, timings_dict=timings_dict)
+        drivers_by_id = {driver.id: driver for driver in Driver.query.filter(Driver.id.in_(batch_ids))}
+
+        for driver_id in batch_ids:
+            driver = drivers_by_id.get(driver_id)
+            if driver is None:
+                continue
+            current_date = start_date
+            while current_date <= end_date:
+                entries = get_driver_shifts_for_date(
+                    driver, current_date, timings_dict, include_swaps=True, include_extra=True, roster=roster
+                )
+                for entry in entries:
+                    if entry.get('shift_type') == 'day_off':
+                        continue
+                    start_time, end_time = entry.get('start_time'), entry.get('end_time')
+                    hours = None
+                    if start_time and end_time:
+                        start_dt = datetime.combine(current_date, start_time)
+                        end_dt = datetime.combine(current_date, end_time)
+                        if end_dt <= start_dt:
+                            end_dt += timedelta(days=1)
+                        hours = round((end_dt - start_dt).total_seconds() / 3600, 2)
+                    yield [
+                        current_date.isoformat(),
+                        driver.formatted_driver_number(),
+                        driver.name,
+                        driver.car_type or '',
+                        entry['shift_type'],
+                        entry.get('label') or shift_label(entry['shift_type']),
+                        start_time.strftime('%H:%M') if start_time else '',
+                        end_time.strftime('%H:%M') if end_time else '',
+                        hours,
+                        'Y' if entry.get('is_extra') else '',
+                        'Y' if entry.get('is_swap') else '',
+                        'Y' if entry.get('is_adjusted') else '',
+                        'Y' if entry.get('is_custom_time') or entry.get('is_override') else '',
+                    ]
+                current_date += timedelta(days=1)
+            # Each driver is visited once, so memoised shifts are not needed again.
+            roster.shift_cache.clear()
+
+
+def stream_roster_csv(rows, chunk_size=16384):
+    """Yield CSV text for the export header and rows in chunks of about ``chunk_size`` characters."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ROSTER_EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ZipStreamBuffer:
+    """Write-only, non-seekable sink that lets ``zipfile`` emit an archive piece by piece."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_row_xml(values):
+    cells = []
+    for value in values:
+        if value is None or value == '':
+            cells.append('<c/>')
+        elif isinstance(value, (int, float)):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{xml_escape(str(value))}</t></is></c>')
+    return '<row>' + ''.join(cells) + '</row>'
+
+
+def stream_roster_xlsx(rows, rows_per_chunk=500):
+    """Yield a single-sheet XLSX workbook built incrementally from the export rows.
+
+    The sheet uses inline strings, so no shared-string table has to be held in
+    memory, and the zip is written as a stream (sizes go in data descriptors).
+    """
+    sink = _ZipStreamBuffer()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row_xml(ROSTER_EXPORT_COLUMNS).encode('utf-8'))
+            yield sink.drain()
+            pending = []
+            for row in rows:
+                pending.append(_xlsx_row_xml(row))
+                if len(pending) >= rows_per_chunk:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            if pending:
+                sheet.write(''.join(pending).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+# -----------------------------------------------------------------------------
+# Calendar Feed Helpers
+# -----------------------------------------------------------------------------
+
+TIME_OFF_LABELS = {'holiday': 'Holiday', 'sickness': 'Sickness', 'vor': 'VOR (Vehicle Off Road)', 'other': 'Time Off'}
+
+_calendar_feed_cache = OrderedDict()
+_calendar_feed_cache_lock = threading.Lock()
+
+
+def ics_escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\n', '\\n')
+    )
+
+
+def ics_fold(line):
+    """Fold a content line at 75 octets, never splitting a UTF-8 character."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts)
+
+
+def get_calendar_window(today=None):
+    today = today or get_operational_date()
+    return today - timedelta(days=ICS_PAST_DAYS), today + timedelta(days=ICS_FUTURE_DAYS)
+
+
+def build_ics_events(drivers, start_date, end_date, roster, include_driver_name=False):
+    """Return VEVENT lines for each driver's shifts (swaps, adjustments, extra-car work) and time off."""
+    stamp = utc_now().strftime('%Y%m%dT%H%M%SZ')
+    time_off = {}
+    holidays = DriverHoliday.query.filter(
+        DriverHoliday.driver_id.in_([driver.id for driver in drivers]),
+        DriverHoliday.holiday_date >= start_date,
+        DriverHoliday.holiday_date <= end_date,
+    ).all()
+    for holiday in holidays:
+        time_off[(holiday.driver_id, holiday.holiday_date)] = holiday
+
+    lines = []
+    for driver in drivers:
+        prefix = f"{driver.formatted_name()}: " if include_driver_name else ''
+        current_date = start_date
+        while current_date <= end_date:
+            holiday = time_off.get((driver.id, current_date))
+            if holiday is not None:
+                label = TIME_OFF_LABELS.get(holiday.time_off_type, 'Time Off')
+                lines.extend([
+                    'BEGIN:VEVENT',
+                    f"UID:{driver.id}-{current_date:%Y%m%d}-timeoff@driver-shift-sheets",
+                    f"DTSTAMP:{stamp}",
+                    f"DTSTART;VALUE=DATE:{current_date:%Y%m%d}",
+                    f"DTEND;VALUE=DATE:{current_date + timedelta(days=1):%Y%m%d}",
+                    f"SUMMARY:{ics_escape(prefix + label)}",
+                    'TRANSP:TRANSPARENT',
+                    'END:VEVENT',
+                ])
+
+            entries = get_driver_shifts_for_date(
+                driver, current_date, roster.timings_dict, include_swaps=True, include_extra=True, roster=roster
+            )
+            for index, entry in enumerate(entries):
+                if entry.get('shift_type') == 'day_off' or not entry.get('start_time') or not entry.get('end_time'):
+                    continue
+                start_dt = datetime.combine(current_date, entry['start_time'])
+                end_dt = datetime.combine(current_date, entry['end_time'])
+                if end_dt <= start_dt:
+                    end_dt += timedelta(days=1)
+
+                label = entry.get('label') or shift_label(entry['shift_type'])
+                if entry.get('is_extra'):
+                    label = 'Extra Car' if label == 'Extra' else f"Extra Car ({label})"
+                notes = []
+                if entry.get('is_swap'):
+                    notes.append('Swapped shift')
+                if entry.get('is_adjusted'):
+                    notes.append('Adjusted times')
+                if entry.get('is_custom_time') or entry.get('is_override'):
+                    notes.append('Custom timing')
+                description = f"Driver {driver.formatted_driver_number()} ({driver.car_type})"
+                if notes:
+                    description += '\n' + ', '.join(notes)
+
+                lines.extend([
+                    'BEGIN:VEVENT',
+                    f"UID:{driver.id}-{current_date:%Y%m%d}-{entry['shift_type']}-{index}@driver-shift-sheets",
+                    f"DTSTAMP:{stamp}",
+                    f"DTSTART:{start_dt:%Y%m%dT%H%M%S}",
+                    f"DTEND:{end_dt:%Y%m%dT%H%M%S}",
+                    f"SUMMARY:{ics_escape(prefix + label)}",
+                    f"DESCRIPTION:{ics_escape(description)}",
+                    'END:VEVENT',
+                ])
+            current_date += timedelta(days=1)
+        roster.shift_cache.clear()
+    return lines
+
+
+def build_ics_calendar(name, event_lines):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f"PRODID:-//{app.config.get('APP_NAME', 'Driver Shift Sheets')}//Roster//EN",
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{ics_escape(name)}",
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+        'X-PUBLISHED-TTL:PT15M',
+        *event_lines,
+        'END:VCALENDAR',
+    ]
+    return '\r\n'.join(ics_fold(line) for line in lines) + '\r\n'
+
+
+def render_driver_calendar(driver, start_date, end_date):
+    roster = RosterWindow(start_date, end_date, driver_ids=[driver.id])
+    events = build_ics_events([driver], start_date, end_date, roster)
+    return build_ics_calendar(f"Shifts – {driver.formatted_name()}", events)
+
+
+def render_fleet_calendar(start_date, end_date):
+    drivers = Driver.query.order_by(Driver.driver_number).all()
+    roster = RosterWindow(start_date, end_date)
+    events = build_ics_events(drivers, start_date, end_date, roster, include_driver_name=True)
+    return build_ics_calendar(f"{app.config.get('COMPANY_NAME', 'Fleet')} – Driver Shifts", events)
+
+
+def calendar_feed_response(cache_key, render):
+    """Serve an iCalendar body under an ETag derived from its inputs' versions.
+
+    A matching ``If-None-Match`` is answered with 304 before anything is
+    rendered; otherwise the body comes from the per-process LRU or ``render()``.
+    """
+    etag = hashlib.sha1(repr(cache_key).encode('utf-8')).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = lru_cache_get(_calendar_feed_cache, _calendar_feed_cache_lock, cache_key)
+        if body is None:
+            body = render()
+            lru_cache_put(
+                _calendar_feed_cache, _calendar_feed_cache_lock, cache_key, body,
+                app.config.get('CALENDAR_FEED_CACHE_SIZE', 256),
+            )
+        response = Response(body, mimetype='text/calendar')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def get_calendar_feed_token():
+    """Return the secret token of the fleet calendar feed (created at startup), or None."""
+    return get_app_setting('calendar_feed_token') or None
+
+
+# -----------------------------------------------------------------------------
+# Daily Sheet PDF Rendering
+# -----------------------------------------------------------------------------
+
+# Helvetica advance widths (1/1000 em) for printable ASCII, from the standard AFM metrics
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+
+class SimplePdf:
+    """Minimal PDF writer: A4 pages with Helvetica text, lines and rectangles.
+
+    Only the standard Type 1 fonts are used, so nothing is embedded and no
+    third-party package is needed. Coordinates are in points from the
+    bottom-left corner, as in PDF itself.
+    """
+
+    PAGE_WIDTH = 595.28
+    PAGE_HEIGHT = 841.89
+
+    def __init__(self):
+        self.pages = []
+
+    def add_page(self):
+        self.pages.append([])
+        return len(self.pages) - 1
+
+    @staticmethod
+    def text_width(value, size, bold=False):
+        units = sum(
+            _HELVETICA_WIDTHS[ord(char) - 32] if 32 <= ord(char) <= 126 else 556
+            for char in value
+        )
+        return units * size / 1000 * (1.06 if bold else 1.0)
+
+    def fit_text(self, value, size, max_width, bold=False):
+        if self.text_width(value, size, bold) <= max_width:
+            return value
+        while value and self.text_width(value + '...', size, bold) > max_width:
+            value = value[:-1]
+        return value + '...'
+
+    def text(self, x, y, value, size=10, bold=False, align='left', max_width=None, gray=0, page=-1):
+        value = str(value)
+        if max_width is not None:
+            value = self.fit_text(value, size, max_width, bold)
+        width = self.text_width(value, size, bold)
+        if align == 'center':
+            x -= width / 2
+        elif align == 'right':
+            x -= width
+        encoded = value.encode('cp1252', errors='replace')
+        escaped = encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+        font = b'F2' if bold else b'F1'
+        self.pages[page].append(
+            f'{gray:g} g BT /'.encode() + font + f' {size:g} Tf {x:.2f} {y:.2f} Td ('.encode()
+            + escaped + b') Tj ET 0 g'
+        )
+
+    def line(self, x1, y1, x2, y2, width=0.5, page=-1):
+        self.pages[page].append(f'{width:g} w {x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S'.encode())
+
+    def rect(self, x, y, w, h, fill_gray=None, width=0.5, page=-1):
+        if fill_gray is None:
+            self.pages[page].append(f'{width:g} w {x:.2f} {y:.2f} {w:.2f} {h:.2f} re S'.encode())
+        else:
+            self.pages[page].append(f'{fill_gray:g} g {x:.2f} {y:.2f} {w:.2f} {h:.2f} re f 0 g'.encode())
+
+    def output(self):
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # page tree, filled in once page object numbers are known
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        ]
+        page_refs = []
+        for ops in self.pages:
+            content = zlib.compress(b'\n'.join(ops))
+            objects.append(
+                f'<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n'.encode() + content + b'\nendstream'
+            )
+            content_number = len(objects)
+            objects.append(
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.PAGE_WIDTH} {self.PAGE_HEIGHT}] '
+                f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_number} 0 R >>'.encode()
+            )
+            page_refs.append(f'{len(objects)} 0 R')
+        objects[1] = f'<< /Type /Pages /Kids [{" ".join(page_refs)}] /Count {len(page_refs)} >>'.encode()
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+        xref_offset = len(out)
+        out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+        for offset in offsets:
+            out += f'{offset:010d} 00000 n \n'.encode()
+        out += (
+            f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'
+        ).encode()
+        return bytes(out)
+
+
+def render_daily_sheets_pdf(sheets, generated_at=None):
+    """Lay out daily sheets (``[(date, drivers_by_shift, timings), ...]``) as one PDF, one date per page run."""
+    generated_at = generated_at or datetime.now()
+    pdf = SimplePdf()
+    margin = 36
+    left, right = margin, SimplePdf.PAGE_WIDTH - margin
+    columns = [('Driver #', 55), ('Name', 170), ('Vehicle', 90), ('Times', 80), ('Badges', 48), ('Signature', 80)]
+    row_height = 18
+
+    for target_date, drivers_by_shift, timings in sheets:
+        date_label = ordinal_date(target_date, '%A, %d %B %Y')
+
+        def start_page(continued=False):
+            pdf.add_page()
+            top = SimplePdf.PAGE_HEIGHT - margin
+            title = 'DAILY SHIFT SHEET' + (' (continued)' if continued else '')
+            pdf.text(SimplePdf.PAGE_WIDTH / 2, top - 18, title, size=18, bold=True, align='center')
+            pdf.text(SimplePdf.PAGE_WIDTH / 2, top - 36, date_label, size=13, bold=True, align='center')
+            pdf.text(
+                SimplePdf.PAGE_WIDTH / 2, top - 50, app.config.get('COMPANY_NAME', ''), size=9, align='center'
+            )
+            pdf.line(left, top - 58, right, top - 58, width=2)
+            return top - 74
+
+        def table_row(y, values, bold=False, fill_gray=None):
+            if fill_gray is not None:
+                pdf.rect(left, y - row_height, right - left, row_height, fill_gray=fill_gray)
+            x = left
+            for (_, width), value in zip(columns, values):
+                pdf.rect(x, y - row_height, width, row_height)
+                if value:
+                    pdf.text(x + 4, y - row_height + 5, value, size=9, bold=bold, max_width=width - 8)
+                x += width
+            return y - row_height
+
+        y = start_page()
+        for shift_type, drivers in drivers_by_shift.items():
+            timing = timings.get(shift_type)
+            label = timing.display_label if timing else shift_label(shift_type)
+            blank_rows = 2 if drivers else 3
+            needed = 22 + row_height * (2 + min(len(drivers), 3))
+            if y - needed < margin + 30:
+                y = start_page(continued=True)
+
+            heading = f"{label.upper()} SHIFT ({len(drivers)})"
+            if timing and timing.start_time and timing.end_time:
+                heading += f"  {timing.start_time.strftime('%H:%M')}-{timing.end_time.strftime('%H:%M')}"
+            pdf.rect(left, y - 18, right - left, 18, fill_gray=0.2)
+            pdf.text(left + 6, y - 13, heading, size=11, bold=True, gray=1)
+            y = table_row(y - 18, [name for name, _ in columns], bold=True, fill_gray=0.9)
+
+            for info in drivers:
+                if y - row_height < margin + 30:
+                    y = start_page(continued=True)
+                    y = table_row(y, [name for name, _ in columns], bold=True, fill_gray=0.9)
+                driver = info['driver']
+                times = ''
+                if info['start_time'] and info['end_time']:
+                    times = f"{info['start_time'].strftime('%H:%M')}-{info['end_time'].strftime('%H:%M')}"
+                    if info.get('is_custom'):
+                        times += ' *'
+                badges = ('S' if driver.school_badge else '') + ('P' if driver.pet_friendly else '')
+                y = table_row(y, [
+                    driver.formatted_driver_number(), driver.formatted_name(), driver.car_type, times, badges, '',
+                ])
+            for _ in range(blank_rows):
+                if y - row_height < margin + 30:
+                    break
+                y = table_row(y, [''] * len(columns))
+            y -= 12
+
+        # Summary, notes box and sign-off
+        summary_height = 20 + 14 * (len(drivers_by_shift) + 1) + 110 + 40
+        if y - summary_height < margin + 20:
+            y = start_page(continued=True)
+        pdf.text(left, y - 12, 'SHIFT SUMMARY', size=11, bold=True)
+        y -= 26
+        total = len({info['driver'].id for drivers in drivers_by_shift.values() for info in drivers})
+        for shift_type, drivers in drivers_by_shift.items():
+            timing = timings.get(shift_type)
+            pdf.text(left, y, timing.display_label if timing else shift_label(shift_type), size=9)
+            pdf.text(left + 200, y, str(len(drivers)), size=9, align='right')
+            y -= 14
+        pdf.text(left, y, 'Total drivers', size=9, bold=True)
+        pdf.text(left + 200, y, str(total), size=9, bold=True, align='right')
+        y -= 20
+        pdf.text(left, y, 'NOTES / CHANGES', size=11, bold=True)
+        pdf.rect(left, y - 96, right - left, 90)
+        y -= 112
+        pdf.text(left, y, 'Legend: S = School Badge, P = Pet Friendly, * = custom times', size=8)
+        pdf.text(left, y - 16, 'Supervisor Signature: _________________________   Date: _____________', size=9)
+
+    for index in range(len(pdf.pages)):
+        pdf.text(
+            SimplePdf.PAGE_WIDTH / 2, margin / 2,
+            f"Generated {generated_at.strftime('%d/%m/%Y %H:%M')} - page {index + 1} of {len(pdf.pages)}",
+            size=7, align='center', page=index,
+        )
+    return pdf.output()
+
+
+def prune_pdf_cache(cache_dir, max_files):
+    """Delete the oldest cached PDFs beyond ``max_files``."""
+    prune_old_files(cache_dir, max_files, ('.pdf',))
+
+
+def prune_old_files(directory, max_files, suffixes):
+    """Delete the oldest files ending in one of ``suffixes`` beyond the newest ``max_files``."""
+    try:
+        entries = [
+            entry for entry in os.scandir(directory) if entry.is_file() and entry.name.endswith(suffixes)
+        ]
+    except OSError:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[max_files:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def get_daily_sheet_pdf(start_date, days=1):
+    """Return the path of a PDF with ``days`` daily sheets from ``start_date``, rendering it if not cached.
+
+    Files are keyed by the dates and the roster version, so a reprint of an
+    unchanged roster is served straight from disk.
+    """
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    version, version_at = get_roster_version()
+    cache_dir = str(app.config.get('PDF_CACHE_DIR') or os.path.join(app.config['BASE_DIR'], 'data', 'pdf-cache'))
+    digest = hashlib.sha1(
+        repr((start_date, days, version, version_at, app.config.get('COMPANY_NAME'))).encode('utf-8')
+    ).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"daily-sheet_{start_date.isoformat()}_{days}d_{digest}.pdf")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    all_timings = ShiftTiming.query.order_by(ShiftTiming.start_time, ShiftTiming.shift_type).all()
+    timings = {timing.shift_type: timing for timing in all_timings}
+    rosters = get_drivers_for_dates(dates)
+    pdf_bytes = render_daily_sheets_pdf([(day, rosters[day], timings) for day in dates])
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as pdf_file:
+        pdf_file.write(pdf_bytes)
+    os.replace(temp_path, path)
+    prune_pdf_cache(cache_dir, app.config.get('PDF_CACHE_MAX_FILES', 200))
+    return path
+
+
+# -----------------------------------------------------------------------------
+# Forecasting Helpers
+# -----------------------------------------------------------------------------
+
+def get_forecast_buckets(timings_dict):
+    """Return ``(buckets, bucket_for_type)``: top-level shift types in order, and each shift type's bucket.
+
+    Sub-shifts are counted under their parent, as on the daily sheet.
+    """
+    buckets = []
+    bucket_for_type = {}
+    for shift_type, timing in timings_dict.items():
+        if shift_type == 'day_off':
+            continue
+        bucket = timing.parent_shift_type or shift_type
+        bucket_for_type[shift_type] = bucket
+        if bucket not in buckets:
+            buckets.append(bucket)
+    return buckets, bucket_for_type
+
+
+def forecast_shift_coverage(start_date, weeks, use_numpy=None, exclude_assignment_ids=None, use_sql=None):
+    """Forecast per-day driver headcount for each top-level shift type.
+
+    Returns ``{'dates': [...], 'buckets': [...], 'counts': {bucket: [count per date]}}``.
+    Holidays, swaps, custom shift overrides and term-only shifts are applied;
+    extra-car work is not. On PostgreSQL the pattern expansion runs in the
+    database (``use_sql`` forces a choice); otherwise the vectorised NumPy
+    path is used when available (``use_numpy`` forces a choice), else each
+    driver-day is resolved through the roster engine. All give identical results.
+    ``exclude_assignment_ids`` forecasts as if those assignments did not exist.
+    """
+    dates = [start_date + timedelta(days=offset) for offset in range(weeks * 7)]
+    roster = RosterWindow(start_date, dates[-1], exclude_assignment_ids=exclude_assignment_ids)
+    buckets, bucket_for_type = get_forecast_buckets(roster.timings_dict)
+    if use_sql is None:
+        use_sql = db.session.get_bind().dialect.name == 'postgresql'
+    if use_numpy is None:
+        use_numpy = np is not None
+    pattern_rows = expand_pattern_roster(dates[0], dates[-1], exclude_assignment_ids) if use_sql else None
+    if pattern_rows is not None:
+        counts = _forecast_counts_sql(roster, dates, buckets, bucket_for_type, pattern_rows)
+    elif use_numpy:
+        counts = _forecast_counts_numpy(roster, dates, buckets, bucket_for_type)
+    else:
+        counts = _forecast_counts_roster(roster, dates, buckets, bucket_for_type)
+    return {'dates': dates, 'buckets': buckets, 'counts': counts}
+
 
-    # Rest rule: use earliest start and latest end across all selected shift types
-    start_times = [timings_dict[wst].start_time for wst in work_shift_types if timings_dict[wst].start_time]
-    end_times = [timings_dict[wst].end_time for wst in work_shift_types if timings_dict[wst].end_time]
-    if not start_times or not end_times:
-        errors.append("Selected shift type has incomplete timing configuration.")
-        return errors
-    work_start_time = min(start_times)
-    work_end_time = max(end_times)
+def _forecast_buckets_for_day(driver, target_date, roster, bucket_for_type):
+    entries = get_driver_shifts_for_date(driver, target_date, roster.timings_dict, include_swaps=True, roster=roster)
+    return {
+        bucket_for_type[entry['shift_type']]
+        for entry in entries
+        if entry['shift_type'] in bucket_for_type
+    }
 
-    latest_late_start, earliest_early_finish = get_adjustment_conflict_bounds(driver.id, work_date)
-    if latest_late_start is not None and work_start_time is not None:
-        work_start_time = latest_late_start
-    if earliest_early_finish is not None and work_end_time is not None:
-        work_end_time = earliest_early_finish
 
-    work_start = datetime.combine(work_date, work_start_time)
-    work_end = datetime.combine(work_date, work_end_time)
-    if work_end_time < work_start_time:
-        work_end += timedelta(days=1)
+def _forecast_counts_roster(roster, dates, buckets, bucket_for_type):
+    counts = {bucket: [0] * len(dates) for bucket in buckets}
+    for driver in Driver.query.all():
+        for index, target_date in enumerate(dates):
+            for bucket in _forecast_buckets_for_day(driver, target_date, roster, bucket_for_type):
+                counts[bucket][index] += 1
+    return counts
 
-    def _check_rest_with_adjacent_days(check_date, new_start, new_end, removed_shift_dates=None):
-        inner_errors = []
-        removed_shift_dates = removed_shift_dates or set()
 
-        def _adjacent_shift_window(adjacent_date):
-            if adjacent_date in removed_shift_dates:
-                return None, None
-            return _get_shift_datetime(driver, adjacent_date, timings_dict)
+def _forecast_counts_numpy(roster, dates, buckets, bucket_for_type):
+    """Build a (driver x day x shift type) occupancy matrix from pattern cycles, then patch exceptions."""
+    day_count = len(dates)
+    shift_types = list(bucket_for_type)
+    type_index = {shift_type: index for index, shift_type in enumerate(shift_types)}
+    bucket_index = {bucket: index for index, bucket in enumerate(buckets)}
 
-        prev_date = check_date - timedelta(days=1)
-        prev_start, prev_end = _adjacent_shift_window(prev_date)
-        if prev_end and new_start:
-            rest = (new_start - prev_end).total_seconds() / 3600
-            if rest < MIN_REST_HOURS:
-                inner_errors.append(
-                    f"{driver.formatted_name()} would have only {rest:.1f}h rest before the shift on "
-                    f"{check_date.strftime('%d/%m/%Y')} (minimum {MIN_REST_HOURS} hours required)."
+    type_to_bucket = np.zeros((len(shift_types), len(buckets)), dtype=np.int32)
+    for shift_type, bucket in bucket_for_type.items():
+        type_to_bucket[type_index[shift_type], bucket_index[bucket]] = 1
+    term_only_types = np.array(
+        [bool(roster.timings_dict[shift_type].school_term_only) for shift_type in shift_types], dtype=bool
+    )
+    term_days = np.array([roster.is_school_term_operational_day(day) for day in dates], dtype=bool)
+
+    # Driver-days whose roster is not just the pattern are resolved individually below
+    exception_keys = {key for key in roster.roster_exception_keys() if dates[0] <= key[1] <= dates[-1]}
+    override_driver_ids = roster.drivers_with_override_timings()
+    driver_ids = set(roster.assigned_driver_ids()) | {driver_id for driver_id, _ in exception_keys}
+    row_for_driver = {driver_id: row for row, driver_id in enumerate(sorted(driver_ids))}
+
+    occupancy = np.zeros((len(row_for_driver), day_count, len(shift_types)), dtype=bool)
+    pattern_matrices = {}
+    day_offsets = np.arange(day_count)
+    for driver_id in row_for_driver:
+        for assignment in roster.all_assignments_for(driver_id):
+            pattern = assignment.shift_pattern
+            matrix = pattern_matrices.get(pattern.id)
+            if matrix is None:
+                matrix = pattern_matrices[pattern.id] = pattern_shift_matrix(pattern, type_index)
+
+            first_offset = (assignment.start_date - dates[0]).days
+            last_offset = (assignment.end_date - dates[0]).days if assignment.end_date else day_count - 1
+            active = (day_offsets >= first_offset) & (day_offsets <= last_offset)
+            cycle_days = (day_offsets - first_offset + assignment.start_day_of_cycle - 1) % pattern.cycle_length
+            occupancy[row_for_driver[driver_id]] |= matrix[cycle_days] & active[:, None]
+
+    occupancy &= ~(~term_days[:, None] & term_only_types[None, :])
+    bucket_occupancy = (occupancy.astype(np.int32) @ type_to_bucket) > 0
+
+    exception_drivers = {driver_id for driver_id, _ in exception_keys} | (override_driver_ids & set(row_for_driver))
+    if exception_drivers:
+        for driver in Driver.query.filter(Driver.id.in_(exception_drivers)).all():
+            row = row_for_driver[driver.id]
+            if driver.id in override_driver_ids:
+                patch_dates = dates
+            else:
+                patch_dates = sorted(day for driver_id, day in exception_keys if driver_id == driver.id)
+            for target_date in patch_dates:
+                index = (target_date - dates[0]).days
+                bucket_occupancy[row, index, :] = False
+                for bucket in _forecast_buckets_for_day(driver, target_date, roster, bucket_for_type):
+                    bucket_occupancy[row, index, bucket_index[bucket]] = True
+
+    totals = bucket_occupancy.sum(axis=0)
+    return {bucket: [int(value) for value in totals[:, bucket_index[bucket]]] for bucket in buckets}
+
+
+def _forecast_counts_sql(roster, dates, buckets, bucket_for_type, pattern_rows):
+    """Count database-expanded pattern shifts per driver-day, then patch exceptions."""
+    occupied = set()
+    for roster_date, driver_id, shift_type in pattern_rows:
+        bucket = bucket_for_type.get(shift_type)
+        if bucket is None:
+            continue
+        if roster.timings_dict[shift_type].school_term_only and not roster.is_school_term_operational_day(roster_date):
+            continue
+        occupied.add((driver_id, (roster_date - dates[0]).days, bucket))
+
+    # Driver-days whose roster is not just the pattern are resolved individually
+    exception_keys = {key for key in roster.roster_exception_keys() if dates[0] <= key[1] <= dates[-1]}
+    override_driver_ids = roster.drivers_with_override_timings() & set(roster.assigned_driver_ids())
+    exception_drivers = {driver_id for driver_id, _ in exception_keys} | override_driver_ids
+    if exception_drivers:
+        for driver in Driver.query.filter(Driver.id.in_(exception_drivers)).all():
+            if driver.id in override_driver_ids:
+                patch_dates = dates
+            else:
+                patch_dates = sorted(day for driver_id, day in exception_keys if driver_id == driver.id)
+            for target_date in patch_dates:
+                index = (target_date - dates[0]).days
+                occupied.difference_update((driver.id, index, bucket) for bucket in buckets)
+                occupied.update(
+                    (driver.id, index, bucket)
+                    for bucket in _forecast_buckets_for_day(driver, target_date, roster, bucket_for_type)
                 )
 
-        next_date = check_date + timedelta(days=1)
-        next_start, next_end = _adjacent_shift_window(next_date)
-        if new_end and next_start:
-            rest = (next_start - new_end).total_seconds() / 3600
-            if rest < MIN_REST_HOURS:
-                inner_errors.append(
-                    f"{driver.formatted_name()} would have only {rest:.1f}h rest after the shift on "
-                    f"{check_date.strftime('%d/%m/%Y')} (minimum {MIN_REST_HOURS} hours required)."
-                )
+    counts = {bucket: [0] * len(dates) for bucket in buckets}
+    for _, index, bucket in occupied:
+        counts[bucket][index] += 1
+    return counts
 
-        return inner_errors
 
-    errors += _check_rest_with_adjacent_days(work_date, work_start, work_end, removed_shift_dates={give_up_date})
+def parse_forecast_targets(raw_targets, buckets):
+    """Parse ``{shift_type: n | [7 per-weekday values]}`` into a per-bucket weekday list.
 
-    return errors
+    Returns ``(targets, error_message)``; unknown shift types are rejected.
+    """
+    if raw_targets is not None and not isinstance(raw_targets, dict):
+        return None, "Targets must be an object mapping shift types to numbers."
+    targets = {}
+    for bucket, value in (raw_targets or {}).items():
+        if bucket not in buckets:
+            return None, f"Unknown shift type in targets: {bucket}"
+        values = value if isinstance(value, list) else [value] * 7
+        if len(values) != 7:
+            return None, f"Targets for {bucket} must be one number or seven weekday values."
+        try:
+            targets[bucket] = [float(item) for item in values]
+        except (TypeError, ValueError):
+            return None, f"Targets for {bucket} must be numbers."
+    return targets, None
+
+
+def suggest_cycle_offsets(driver, pattern, start_date, end_date=None, assignment=None, weeks=None, targets=None):
+    """Score every ``start_day_of_cycle`` for a (new or existing) assignment against coverage targets.
+
+    The fleet forecast without the assignment is the baseline. The driver's
+    contribution for every offset is built at once as an (offset x day x
+    shift type) matrix, with holidays and term-only days masked out. The
+    score is the squared gap between projected headcount and the target
+    summed over days and shift types, so lower is better. ``targets`` maps a
+    shift type to seven weekday headcounts; shift types without a target aim
+    for flat coverage at their average level. For a new assignment the
+    driver's existing assignments are left out, because the new one
+    replaces them from ``start_date``.
+
+    Returns a dict with ``offsets`` ranked best first. Each item has
+    ``start_day_of_cycle``, ``score``, ``improvement`` (score gain over the
+    current offset, or over day 1 for a new assignment), ``shortfall``
+    (driver-shifts below target) and ``coverage_delta`` (average extra
+    drivers per weekday for each shift type). Requires NumPy.
+    """
+    cycle_length = pattern.cycle_length
+    if weeks is None:
+        weeks = max(FORECAST_DEFAULT_WEEKS, math.ceil(math.lcm(cycle_length, 7) / 7))
+    weeks = min(weeks, FORECAST_MAX_WEEKS)
+    horizon_end = start_date + timedelta(days=weeks * 7 - 1)
+
+    if assignment is not None:
+        excluded_ids = {assignment.id}
+        assignment_start = assignment.start_date
+    else:
+        excluded_ids = {
+            existing.id
+            for existing in DriverAssignment.query.filter(
+                DriverAssignment.driver_id == driver.id,
+                DriverAssignment.start_date <= horizon_end,
+                or_(DriverAssignment.end_date.is_(None), DriverAssignment.end_date >= start_date),
+            ).all()
+        }
+        assignment_start = start_date
+
+    forecast = forecast_shift_coverage(start_date, weeks, use_numpy=True, exclude_assignment_ids=excluded_ids)
+    dates, buckets = forecast['dates'], forecast['buckets']
+    roster = RosterWindow(start_date, horizon_end, driver_ids=[driver.id])
+    _, bucket_for_type = get_forecast_buckets(roster.timings_dict)
+    shift_types = list(bucket_for_type)
+    type_index = {shift_type: index for index, shift_type in enumerate(shift_types)}
+    bucket_index = {bucket: index for index, bucket in enumerate(buckets)}
+
+    type_to_bucket = np.zeros((len(shift_types), len(buckets)), dtype=np.int32)
+    for shift_type, bucket in bucket_for_type.items():
+        type_to_bucket[type_index[shift_type], bucket_index[bucket]] = 1
+    pattern_matrix = pattern_shift_matrix(pattern, type_index)
+
+    day_offsets = np.arange(len(dates))
+    days_since_start = day_offsets + (start_date - assignment_start).days
+    on_duty = np.array(
+        [(end_date is None or day <= end_date) and not roster.is_on_holiday(driver.id, day) for day in dates],
+        dtype=bool,
+    ) & (days_since_start >= 0)
+    term_days = np.array([roster.is_school_term_operational_day(day) for day in dates], dtype=bool)
+    term_only_types = np.array(
+        [bool(roster.timings_dict[shift_type].school_term_only) for shift_type in shift_types], dtype=bool
+    )
+    allowed = on_duty[:, None] & ~(~term_days[:, None] & term_only_types[None, :])
+
+    cycle_days = (days_since_start[None, :] + np.arange(cycle_length)[:, None]) % cycle_length
+    contribution = ((pattern_matrix[cycle_days] & allowed[None]).astype(np.int32) @ type_to_bucket) > 0
+    contribution = contribution.astype(np.float64)
+
+    baseline = np.array([forecast['counts'][bucket] for bucket in buckets], dtype=np.float64).T
+    weekdays = np.array([day.weekday() for day in dates])
+    target = np.empty_like(baseline)
+    for bucket, index in bucket_index.items():
+        if bucket in (targets or {}):
+            target[:, index] = np.array(targets[bucket])[weekdays]
+        else:
+            target[:, index] = baseline[:, index].mean() + contribution[:, :, index].mean()
+
+    projected = baseline[None] + contribution
+    scores = ((projected - target[None]) ** 2).sum(axis=(1, 2))
+    shortfalls = np.clip(target[None] - projected, 0, None).sum(axis=(1, 2))
+    weekday_delta = np.stack(
+        [contribution[:, weekdays == weekday, :].mean(axis=1) for weekday in range(7)], axis=1
+    )
+
+    reference_offset = (assignment.start_day_of_cycle - 1) if assignment is not None else 0
+    ranked = sorted(range(cycle_length), key=lambda offset: (scores[offset], offset))
+    return {
+        'dates': (dates[0], dates[-1]),
+        'buckets': buckets,
+        'current_start_day_of_cycle': reference_offset + 1 if assignment is not None else None,
+        'offsets': [
+            {
+                'start_day_of_cycle': offset + 1,
+                'score': round(float(scores[offset]), 2),
+                'improvement': round(float(scores[reference_offset] - scores[offset]), 2),
+                'shortfall': round(float(shortfalls[offset]), 2),
+                'coverage_delta': {
+                    bucket: [round(float(value), 2) for value in weekday_delta[offset, :, index]]
+                    for bucket, index in bucket_index.items()
+                },
+            }
+            for offset in ranked
+        ],
+    }
 
 
 # -----------------------------------------------------------------------------
@@ -4954,6 +8432,13 @@ def delete_all_finished_swaps():
     return redirect(url_for("scheduling"))
 
 
+def parse_swap_shift_types(raw_wst):
+    """Parse a work_shift_type value given as a list or comma-separated string."""
+    if isinstance(raw_wst, list):
+        return [str(t).strip() for t in raw_wst if str(t).strip()]
+    return [t.strip() for t in str(raw_wst or "").split(',') if t.strip()]
+
+
 @app.route("/scheduling/swap/validate", methods=["POST"])
 def validate_swap_ajax():
     """AJAX endpoint to validate a proposed single-driver day swap before confirming."""
@@ -4961,11 +8446,7 @@ def validate_swap_ajax():
     driver_id = parse_positive_int(data.get("driver_id"))
     give_up_date_str = (data.get("give_up_date") or "").strip()
     work_date_str = (data.get("work_date") or "").strip()
-    raw_wst = data.get("work_shift_type") or ""
-    if isinstance(raw_wst, list):
-        work_shift_types = [t.strip() for t in raw_wst if str(t).strip()]
-    else:
-        work_shift_types = [t.strip() for t in str(raw_wst).split(',') if t.strip()]
+    work_shift_types = parse_swap_shift_types(data.get("work_shift_type"))
 
     if not driver_id:
         return json_error("Please select a driver.")
@@ -4986,6 +8467,69 @@ def validate_swap_ajax():
     return jsonify({"success": True, "errors": []})
 
 
+@app.route("/scheduling/swap/validate-batch", methods=["POST"])
+def validate_swap_batch_ajax():
+    """AJAX endpoint to validate several alternative swap proposals for one driver in one call."""
+    data = request.get_json(silent=True) or {}
+    driver_id = parse_positive_int(data.get("driver_id"))
+    raw_proposals = data.get("proposals") or []
+
+    if not driver_id:
+        return json_error("Please select a driver.")
+
+    driver = db.session.get(Driver, driver_id)
+    if not driver:
+        return json_error("Driver not found.")
+
+    if not isinstance(raw_proposals, list) or not raw_proposals:
+        return json_error("Please provide at least one proposal.")
+    if len(raw_proposals) > SWAP_BATCH_MAX_PROPOSALS:
+        return json_error(f"At most {SWAP_BATCH_MAX_PROPOSALS} proposals can be validated at once.")
+
+    proposals = []
+    for raw in raw_proposals:
+        give_up_date = parse_date_string((raw.get("give_up_date") or "").strip()) if isinstance(raw, dict) else None
+        work_date = parse_date_string((raw.get("work_date") or "").strip()) if isinstance(raw, dict) else None
+        if not give_up_date or not work_date:
+            return json_error("Invalid date format.")
+        proposals.append((give_up_date, work_date, parse_swap_shift_types(raw.get("work_shift_type"))))
+
+    results = [
+        {"valid": not errors, "errors": errors}
+        for errors in validate_swaps_batch(driver, proposals)
+    ]
+    return json_success(results=results)
+
+
+@app.route("/scheduling/swap/plan", methods=["POST"])
+def plan_swap_ajax():
+    """AJAX endpoint listing every legal work date/shift type for a driver's give-up date."""
+    data = request.get_json(silent=True) or request.form
+    driver_id = parse_positive_int(data.get("driver_id"))
+    give_up_date = parse_date_string((data.get("give_up_date") or "").strip())
+    from_date = parse_date_string((data.get("from_date") or "").strip())
+    to_date = parse_date_string((data.get("to_date") or "").strip())
+
+    if not driver_id:
+        return json_error("Please select a driver.")
+
+    driver = db.session.get(Driver, driver_id)
+    if not driver:
+        return json_error("Driver not found.")
+
+    if not give_up_date or not from_date or not to_date:
+        return json_error("Invalid date format.")
+    if to_date < from_date:
+        return json_error("End date must be on or after start date.")
+    if (to_date - from_date).days + 1 > SWAP_PLAN_MAX_DAYS:
+        return json_error(f"Date range cannot exceed {SWAP_PLAN_MAX_DAYS} days.")
+
+    options, give_up_errors = plan_swap_options(driver, give_up_date, from_date, to_date)
+    if give_up_errors:
+        return jsonify({"success": False, "errors": give_up_errors, "options": []})
+    return json_success(options=options)
+
+
 @app.route("/scheduling/swap/add", methods=["POST"])
 def add_swap():
     """Add a confirmed single-driver day swap."""
@@ -5140,15 +8684,15 @@ def extra_cars():
     )
     all_drivers = Driver.query.order_by(Driver.driver_number).all()
     all_shift_timings = ShiftTiming.query.order_by(ShiftTiming.shift_type).all()
-    # Attach coverage info and split into current vs finished
+    # Attach coverage info and split into current vs finished. This is a pure
+    # read: stored statuses are maintained when requests or assignments change
+    # and by close_finished_extra_car_requests() once a window has ended.
+    now = datetime.now()
     requests_with_coverage = []
     finished_requests_with_coverage = []
     for req in all_requests:
         filled_slots, suggested_status = req.compute_coverage()
         available_start, available_end = req.get_recommended_available_window()
-        # Auto-update status when it changes (skip CLOSED requests)
-        if req.status != 'CLOSED' and suggested_status != req.status:
-            req.status = suggested_status
 
         payload = {
             'request': req,
@@ -5157,11 +8701,11 @@ def extra_cars():
             'available_end': available_end,
         }
 
-        if req.status == 'CLOSED':
+        if req.status == 'CLOSED' or suggested_status == 'CLOSED':
             _, req_end_dt = req.get_time_window()
             if req_end_dt is not None:
                 delete_cutoff = req_end_dt + timedelta(hours=24)
-                payload['deletable'] = datetime.now() >= delete_cutoff
+                payload['deletable'] = now >= delete_cutoff
                 payload['delete_available_from'] = delete_cutoff.strftime('%-d %b %Y %H:%M')
             else:
                 payload['deletable'] = True
@@ -5169,7 +8713,6 @@ def extra_cars():
             finished_requests_with_coverage.append(payload)
         else:
             requests_with_coverage.append(payload)
-    db.session.commit()
 
     return render_template(
         'extra_cars.html',
@@ -5427,6 +8970,7 @@ def edit_extra_car_request(request_id):
     req.unlimited = unlimited
     req.required_slots = required_slots
     req.notes = notes
+    req.refresh_status()
     db.session.commit()
 
     flash("Extra car request updated.", "success")
@@ -5443,8 +8987,10 @@ def update_extra_car_request_status(request_id):
         flash("Invalid status.", "error")
         return redirect(url_for("extra_cars"))
     req.status = new_status
+    # Only DRAFT and CLOSED are kept as chosen; other statuses follow the request's coverage.
+    req.refresh_status()
     db.session.commit()
-    flash(f"Request status updated to {new_status.replace('_', ' ').title()}.", "success")
+    flash(f"Request status updated to {req.status.replace('_', ' ').title()}.", "success")
     return redirect(url_for("extra_cars"))
 
 
@@ -5539,6 +9085,67 @@ def validate_extra_car_assignment_ajax(request_id):
     })
 
 
+@app.route("/extra-cars/request/<int:request_id>/candidates")
+def extra_car_request_candidates(request_id):
+    """AJAX endpoint listing every driver who can legally cover the request, best first."""
+    req = db.get_or_404(ExtraCarRequest, request_id)
+    timings_dict = {st.shift_type: st for st in ShiftTiming.query.all()}
+    req_start, req_end = req.get_time_window(timings_dict)
+    if not req_start or not req_end:
+        return json_error("Request has an invalid or incomplete time window.")
+
+    preferences = {'car_type': (request.args.get("car_type") or "").strip() or None}
+    for flag in EXTRA_CAR_VEHICLE_FLAGS:
+        preferences[flag] = request.args.get(flag) in ("1", "true", "on", "yes")
+
+    candidates, evaluated = rank_extra_car_candidates(req, preferences, timings_dict)
+    return json_success(candidates=candidates, evaluated=evaluated)
+
+
+def parse_autofill_range(start_str, end_str):
+    """Parse the auto-fill date range; returns ``(start_date, end_date, error_message)``."""
+    start_date = parse_date_string(start_str) if start_str else get_operational_date()
+    end_date = parse_date_string(end_str) if end_str else start_date
+    if not start_date or not end_date:
+        return None, None, "Invalid date format."
+    if end_date < start_date:
+        return None, None, "End date must be on or after the start date."
+    if (end_date - start_date).days + 1 > AUTOFILL_MAX_DAYS:
+        return None, None, f"Date range cannot exceed {AUTOFILL_MAX_DAYS} days."
+    return start_date, end_date, None
+
+
+@app.route("/extra-cars/autofill")
+def preview_extra_car_autofill():
+    """AJAX endpoint proposing assignments for open extra-car requests (nothing is saved)."""
+    start_date, end_date, error = parse_autofill_range(request.args.get("start_date"), request.args.get("end_date"))
+    if error:
+        return json_error(error)
+    plan, unfilled = plan_extra_car_autofill(start_date, end_date)
+    return json_success(
+        start_date=start_date.strftime("%Y-%m-%d"),
+        end_date=end_date.strftime("%Y-%m-%d"),
+        plan=plan,
+        unfilled=unfilled,
+    )
+
+
+@app.route("/extra-cars/autofill/commit", methods=["POST"])
+def commit_extra_car_autofill():
+    """Save a previewed auto-fill plan atomically (AJAX/JSON)."""
+    data = request.get_json(silent=True) or {}
+    plan_items = data.get("plan")
+    if not isinstance(plan_items, list) or not plan_items:
+        return json_error("No plan to save.")
+    if not all(isinstance(item, dict) for item in plan_items):
+        return json_error("Invalid plan format.")
+
+    saved, errors = apply_extra_car_autofill(plan_items)
+    if errors:
+        return jsonify({"success": False, "error": "The plan is out of date; nothing was saved.", "errors": errors}), 409
+    return json_success(saved=saved, message=f"{saved} assignment(s) added.")
+
+
 @app.route("/extra-cars/request/<int:request_id>/assignment/add", methods=["POST"])
 def add_extra_car_assignment(request_id):
     """Add a driver assignment to an extra car request."""
@@ -5653,13 +9260,12 @@ def add_extra_car_assignment(request_id):
         end_time=final_end.time(),
         notes=notes,
     )
-    db.session.add(assignment)
+    # Through the relationship, so the collection read by refresh_status includes it
+    req.assignments.append(assignment)
     db.session.flush()
 
     # Recompute and persist status
-    filled_slots, new_status = req.compute_coverage()
-    if req.status != 'CLOSED':
-        req.status = new_status
+    req.refresh_status()
 
     db.session.commit()
 
@@ -5680,18 +9286,570 @@ def delete_extra_car_assignment(request_id, assignment_id):
     req = db.get_or_404(ExtraCarRequest, request_id)
     asgn = ExtraCarAssignment.query.filter_by(id=assignment_id, request_id=request_id).first_or_404()
 
-    db.session.delete(asgn)
+    # Removed from the collection (delete-orphan deletes the row), so refresh_status never sees it
+    req.assignments.remove(asgn)
     db.session.flush()
 
-    filled_slots, new_status = req.compute_coverage()
-    if req.status != 'CLOSED':
-        req.status = new_status
+    req.refresh_status()
 
     db.session.commit()
     flash("Assignment removed.", "success")
     return redirect(url_for("extra_cars"))
 
 
+def close_finished_extra_car_requests(now=None):
+    """Mark every request whose time window has ended as CLOSED; returns the count."""
+    now = now or datetime.now()
+    timings_dict = {t.shift_type: t for t in ShiftTiming.query.all()}
+    # Overnight windows end the day after the request date.
+    candidates = (
+        ExtraCarRequest.query
+        .filter(ExtraCarRequest.status != 'CLOSED')
+        .filter(ExtraCarRequest.date <= now.date())
+        .all()
+    )
+    closed = 0
+    for req in candidates:
+        _, req_end = req.get_time_window(timings_dict)
+        if req_end is not None and req_end <= now:
+            req.status = 'CLOSED'
+            closed += 1
+    if closed:
+        db.session.commit()
+    return closed
+
+
+_extra_car_status_worker = {'thread': None}
+_extra_car_status_worker_lock = threading.Lock()
+
+
+def try_process_lock(path):
+    """Take an exclusive cross-process lock on ``path`` without blocking.
+
+    Returns the open lock file (keep it open to hold the lock), or None when
+    another process holds it. The OS releases the lock when the holder exits.
+    Without ``fcntl`` every caller gets the lock.
+    """
+    os.makedirs(os.path.dirname(os.fspath(path)) or '.', exist_ok=True)
+    lock_file = open(path, 'a')
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _run_extra_car_status_worker(interval):
+    stop = threading.Event()
+    lock_file = None
+    while not stop.wait(interval):
+        # Every gunicorn worker starts this thread, but only the lock holder closes
+        # requests, so the workers' commits never race; when the holder exits (e.g.
+        # a max_requests recycle) another worker takes over on its next tick.
+        lock_file = lock_file or try_process_lock(app.config['EXTRA_CAR_CLOSE_LOCK_FILE'])
+        if lock_file is None:
+            continue
+        with app.app_context():
+            try:
+                close_finished_extra_car_requests()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Closing finished extra car requests failed")
+            finally:
+                db.session.remove()
+
+
+@app.before_request
+def ensure_extra_car_status_worker():
+    """Start the periodic closing job once per process (disabled under testing)."""
+    interval = app.config.get('EXTRA_CAR_CLOSE_INTERVAL_SECONDS', 0)
+    if app.testing or interval <= 0 or _extra_car_status_worker['thread'] is not None:
+        return
+    with _extra_car_status_worker_lock:
+        if _extra_car_status_worker['thread'] is None:
+            worker = threading.Thread(
+                target=_run_extra_car_status_worker,
+                args=(interval,),
+                name='extra-car-status',
+                daemon=True,
+            )
+            worker.start()
+            _extra_car_status_worker['thread'] = worker
+
+
+# -----------------------------------------------------------------------------
+# Roster Cache Warmer
+# -----------------------------------------------------------------------------
+
+def warm_roster_caches(operational_date, hold_until=None):
+    """Precompute what dispatch opens first on ``operational_date`` into this process's caches.
+
+    Renders the screen and print daily sheets for the date and the day after,
+    the dashboard summary and both days' cars-working windows. The dashboard
+    entry is held until ``hold_until`` (a datetime) plus its normal TTL.
+    Returns the dates warmed.
+    """
+    dates = [operational_date, operational_date + timedelta(days=1)]
+    ttl = app.config.get('DASHBOARD_CACHE_TTL_SECONDS', 30)
+    if hold_until is not None:
+        ttl += max(0.0, (hold_until - datetime.now()).total_seconds())
+    get_dashboard_summary(operational_date, ttl=ttl)
+
+    for target_date in dates:
+        get_cars_working_windows(target_date)
+        # Rendered in a request context of the real URL so links match a live render
+        with app.test_request_context('/daily-sheet/generate', query_string={'target_date': target_date.isoformat()}):
+            render_cached_daily_sheet("daily_sheet.html", target_date)
+        with app.test_request_context('/daily-sheet/print', query_string={'date': target_date.isoformat()}):
+            render_cached_daily_sheet("print_daily_sheet.html", target_date)
+    return dates
+
+
+_roster_warmer = {'thread': None}
+_roster_warmer_lock = threading.Lock()
+
+
+def _run_roster_warmer(lead_seconds):
+    stop = threading.Event()
+    while True:
+        crossover = get_next_operational_crossover()
+        warm_at = crossover - timedelta(seconds=lead_seconds)
+        # Sleep in bounded steps so clock changes are noticed
+        while (remaining := (warm_at - datetime.now()).total_seconds()) > 0:
+            stop.wait(min(remaining, 3600))
+        with app.app_context():
+            try:
+                warm_roster_caches(crossover.date(), hold_until=crossover)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Warming roster caches for %s failed", crossover.date())
+            finally:
+                db.session.remove()
+        while (remaining := (crossover - datetime.now()).total_seconds()) >= 0:
+            stop.wait(remaining + 1)
+
+
+@app.before_request
+def ensure_roster_warmer():
+    """Start the pre-crossover cache warm-up once per process (disabled under testing).
+
+    Unlike the extra car closer this deliberately runs in every worker: the
+    caches it fills are per process, and it only reads the database.
+    """
+    lead_seconds = app.config.get('ROSTER_WARM_LEAD_SECONDS', 0)
+    if app.testing or lead_seconds <= 0 or _roster_warmer['thread'] is not None:
+        return
+    with _roster_warmer_lock:
+        if _roster_warmer['thread'] is None:
+            warmer = threading.Thread(
+                target=_run_roster_warmer,
+                args=(lead_seconds,),
+                name='roster-warmer',
+                daemon=True,
+            )
+            warmer.start()
+            _roster_warmer['thread'] = warmer
+
+
+# -----------------------------------------------------------------------------
+# Background Jobs
+# -----------------------------------------------------------------------------
+
+JOB_HANDLERS = {}
+
+_job_executor = {'pid': None, 'executor': None}
+_job_executor_lock = threading.Lock()
+
+
+def job_handler(job_type):
+    """Register ``func(**params)`` as the handler for ``job_type``; its return value must be JSON-serialisable."""
+    def register(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return register
+
+
+def get_job_executor():
+    """Return this process's job thread pool, creating it after start-up or a fork."""
+    with _job_executor_lock:
+        if _job_executor['pid'] != os.getpid():
+            _job_executor['executor'] = ThreadPoolExecutor(
+                max_workers=max(1, app.config.get('JOB_WORKERS', 2)),
+                thread_name_prefix='job',
+            )
+            _job_executor['pid'] = os.getpid()
+        return _job_executor['executor']
+
+
+def enqueue_job(job_type, params=None, key=None):
+    """Queue ``job_type`` with ``params`` and return its Job row.
+
+    With a ``key`` the call is idempotent: a queued, running or successful job
+    with that key is returned as-is, while a failed or stale one, or one whose
+    result file was pruned, is re-queued.
+    Jobs run on this process's thread pool, or inline when testing or
+    ``JOBS_RUN_INLINE`` is set.
+    """
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+    params_json = json.dumps(params or {}, sort_keys=True)
+
+    job = Job.query.filter_by(job_key=key).first() if key else None
+    if job is not None and job.status != 'FAILED' and not job.is_stale() and not job.result_file_missing():
+        return job
+    if job is None:
+        job = Job(job_type=job_type, job_key=key)
+        db.session.add(job)
+    job.params = params_json
+    job.status = 'QUEUED'
+    job.result = None
+    job.error = None
+    job.created_at = utc_now()
+    job.started_at = None
+    job.finished_at = None
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request queued the same key first
+        db.session.rollback()
+        return Job.query.filter_by(job_key=key).one()
+
+    if app.testing or app.config.get('JOBS_RUN_INLINE'):
+        run_job(job.id)
+        db.session.refresh(job)
+    else:
+        get_job_executor().submit(_run_job_in_context, job.id)
+    return job
+
+
+def _run_job_in_context(job_id):
+    with app.app_context():
+        try:
+            run_job(job_id)
+        finally:
+            db.session.remove()
+
+
+def run_job(job_id):
+    """Claim a queued job, run its handler and store the result or error."""
+    claimed = Job.query.filter_by(id=job_id, status='QUEUED').update(
+        {'status': 'RUNNING', 'started_at': utc_now()}, synchronize_session=False
+    )
+    db.session.commit()
+    if not claimed:
+        return
+    job = db.session.get(Job, job_id)
+    try:
+        result = JOB_HANDLERS[job.job_type](**job.get_params())
+        result_json = json.dumps(result, default=str)
+    except Exception as exc:
+        db.session.rollback()
+        app.logger.exception("Background job %s (%s) failed", job_id, job.job_type)
+        job = db.session.get(Job, job_id)
+        job.status = 'FAILED'
+        job.error = str(exc) or exc.__class__.__name__
+    else:
+        job.status = 'SUCCEEDED'
+        job.result = result_json
+    job.finished_at = utc_now()
+    db.session.commit()
+
+
+def get_job_results_dir():
+    return str(app.config.get('JOB_RESULTS_DIR') or os.path.join(app.config['BASE_DIR'], 'data', 'job-results'))
+
+
+def refresh_extra_car_statuses():
+    """Recompute the coverage-derived status of every open, partially filled or filled request.
+
+    Returns the number of requests whose status changed. Closed and draft
+    requests keep their manually chosen status.
+    """
+    timings_dict = {timing.shift_type: timing for timing in ShiftTiming.query.all()}
+    requests_to_check = (
+        ExtraCarRequest.query
+        .filter(ExtraCarRequest.status.notin_(ExtraCarRequest.MANUAL_STATUSES))
+        .options(joinedload(ExtraCarRequest.assignments))
+        .all()
+    )
+    changed = 0
+    for req in requests_to_check:
+        _, new_status = req.compute_coverage(timings_dict)
+        if new_status != req.status:
+            req.status = new_status
+            changed += 1
+    if changed:
+        db.session.commit()
+    return changed
+
+
+@job_handler('refresh_extra_car_statuses')
+def run_refresh_extra_car_statuses_job():
+    return {'changed': refresh_extra_car_statuses()}
+
+
+@job_handler('compliance_scan')
+def run_compliance_scan_job(start_date, end_date):
+    violations = []
+    for violation in scan_work_time_compliance(date.fromisoformat(start_date), date.fromisoformat(end_date)):
+        driver = violation['driver']
+        violations.append({
+            'date': violation['date'].isoformat(),
+            'driver_id': driver.id,
+            'driver_number': driver.driver_number,
+            'driver': driver.formatted_name(),
+            'rule': violation['rule'],
+            'hours': round(violation['hours'], 2),
+            'description': describe_compliance_violation(violation),
+        })
+    return {'start_date': start_date, 'end_date': end_date, 'violations': violations}
+
+
+@job_handler('roster_export')
+def run_roster_export_job(start_date, end_date, export_format='csv'):
+    """Write a roster export to ``JOB_RESULTS_DIR``; the file is served by ``/jobs/<id>/download``."""
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    rows = iter_roster_export_rows(start, end)
+    if export_format == 'xlsx':
+        chunks, mode = stream_roster_xlsx(rows), 'wb'
+    else:
+        export_format, chunks, mode = 'csv', stream_roster_csv(rows), 'w'
+
+    results_dir = get_job_results_dir()
+    os.makedirs(results_dir, exist_ok=True)
+    filename = f"roster_{start_date}_{end_date}_{secrets.token_hex(4)}.{export_format}"
+    path = os.path.join(results_dir, filename)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, mode, **({'newline': '', 'encoding': 'utf-8'} if mode == 'w' else {})) as export_file:
+        for chunk in chunks:
+            export_file.write(chunk)
+    os.replace(temp_path, path)
+    prune_old_files(results_dir, app.config.get('JOB_RESULTS_MAX_FILES', 100), ('.csv', '.xlsx'))
+    return {'file': filename, 'download_name': f"roster_{start_date}_{end_date}.{export_format}"}
+
+
+# -----------------------------------------------------------------------------
+# Routes: Background Jobs
+# -----------------------------------------------------------------------------
+
+@app.route("/jobs/<int:job_id>")
+def job_status(job_id):
+    """Poll a background job's status and result."""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return json_error('Job not found', 404)
+    payload = job.to_dict()
+    if job.status == 'SUCCEEDED' and (payload['result'] or {}).get('file') and not job.result_file_missing():
+        payload['download_url'] = url_for('download_job_result', job_id=job.id)
+    return json_success(job=payload)
+
+
+@app.route("/jobs/<int:job_id>/download")
+def download_job_result(job_id):
+    """Download the file written by a finished export job."""
+    job = db.get_or_404(Job, job_id)
+    result = job.get_result() or {}
+    if job.status != 'SUCCEEDED' or not result.get('file'):
+        abort(404)
+    return send_from_directory(
+        get_job_results_dir(), result['file'], as_attachment=True, download_name=result.get('download_name')
+    )
+
+
+@app.route("/extra-cars/refresh-statuses", methods=["POST"])
+def queue_extra_car_status_refresh():
+    """Recompute every extra car request's status in the background."""
+    version, _ = get_roster_version()
+    job = enqueue_job('refresh_extra_car_statuses', key=f"refresh_extra_car_statuses:{version}")
+    return json_success(job_id=job.id, status=job.status, status_url=url_for('job_status', job_id=job.id)), 202
+
+
+@app.route("/compliance/scan", methods=["POST"])
+def queue_compliance_scan():
+    """Run a compliance scan in the background; poll the returned job for violations."""
+    start_date, end_date, error = parse_compliance_range(
+        request.values.get("start_date"), request.values.get("end_date")
+    )
+    if error:
+        return json_error(error)
+    version, _ = get_roster_version()
+    job = enqueue_job(
+        'compliance_scan',
+        {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
+        key=f"compliance_scan:{start_date.isoformat()}:{end_date.isoformat()}:{version}",
+    )
+    return json_success(job_id=job.id, status=job.status, status_url=url_for('job_status', job_id=job.id)), 202
+
+
+@app.route("/export/roster/jobs", methods=["POST"])
+def queue_roster_export():
+    """Build a roster export file in the background; the finished job links to the download."""
+    start_date, end_date, error = parse_export_range(request.values.get("from"), request.values.get("to"))
+    if error:
+        return json_error(error)
+    export_format = request.values.get("format", "csv")
+    if export_format not in ('csv', 'xlsx'):
+        return json_error('Format must be csv or xlsx')
+    version, _ = get_roster_version()
+    job = enqueue_job(
+        'roster_export',
+        {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(), 'export_format': export_format},
+        key=f"roster_export:{start_date.isoformat()}:{end_date.isoformat()}:{export_format}:{version}",
+    )
+    return json_success(job_id=job.id, status=job.status, status_url=url_for('job_status', job_id=job.id)), 202
+
+
+# -----------------------------------------------------------------------------
+# Routes: Coverage Forecast
+# -----------------------------------------------------------------------------
+
+@app.route("/forecast")
+def coverage_forecast():
+    """Per-day headcount for each shift type over the next N weeks."""
+    start_str = request.args.get("start_date")
+    start_date = parse_date_string(start_str) if start_str else get_operational_date()
+    weeks = parse_positive_int(request.args.get("weeks")) or FORECAST_DEFAULT_WEEKS
+    error = None
+    if not start_date:
+        error = "Invalid date format."
+    elif weeks > FORECAST_MAX_WEEKS:
+        error = f"Forecast cannot exceed {FORECAST_MAX_WEEKS} weeks."
+
+    if is_ajax_request():
+        if error:
+            return json_error(error)
+        forecast = forecast_shift_coverage(start_date, weeks)
+        return json_success(
+            dates=[day.strftime("%Y-%m-%d") for day in forecast['dates']],
+            buckets=forecast['buckets'],
+            counts=forecast['counts'],
+        )
+
+    if error:
+        flash(error, "error")
+        start_date = start_date or get_operational_date()
+        weeks = min(weeks, FORECAST_MAX_WEEKS)
+
+    forecast = forecast_shift_coverage(start_date, weeks)
+    timings_dict = {timing.shift_type: timing for timing in ShiftTiming.query.all()}
+    rows = [
+        {'date': day, 'counts': [forecast['counts'][bucket][index] for bucket in forecast['buckets']]}
+        for index, day in enumerate(forecast['dates'])
+    ]
+    summary = [
+        {
+            'bucket': bucket,
+            'minimum': min(forecast['counts'][bucket]),
+            'maximum': max(forecast['counts'][bucket]),
+        }
+        for bucket in forecast['buckets']
+    ]
+    return render_template(
+        "forecast.html",
+        start_date=start_date,
+        weeks=weeks,
+        max_weeks=FORECAST_MAX_WEEKS,
+        buckets=forecast['buckets'],
+        timings=timings_dict,
+        rows=rows,
+        summary=summary,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Routes: Working-Time Compliance
+# -----------------------------------------------------------------------------
+
+def describe_compliance_violation(violation):
+    """Return a one-line, human readable description of a compliance violation."""
+    start_text = violation['start'].strftime('%d/%m/%Y %H:%M')
+    end_text = violation['end'].strftime('%d/%m/%Y %H:%M')
+    if violation['rule'] == 'rest':
+        return (
+            f"Only {violation['hours']:.1f}h rest between {start_text} and {end_text} "
+            f"(minimum {MIN_REST_HOURS}h required)."
+        )
+    return (
+        f"{violation['hours']:.1f}h worked in the 24 hours from {start_text} "
+        f"(maximum {MAX_WORK_HOURS_PER_24H}h)."
+    )
+
+
+def parse_compliance_range(start_str, end_str):
+    """Parse a compliance report range, defaulting to four weeks from today.
+
+    Returns ``(start_date, end_date, error_message)``.
+    """
+    today = date.today()
+    start_date = parse_date_string(start_str) if start_str else today
+    end_date = parse_date_string(end_str) if end_str else (start_date or today) + timedelta(days=27)
+    if not start_date or not end_date:
+        return None, None, "Invalid date format."
+    if end_date < start_date:
+        return None, None, "End date must be on or after the start date."
+    if (end_date - start_date).days + 1 > COMPLIANCE_MAX_DAYS:
+        return None, None, f"Date range cannot exceed {COMPLIANCE_MAX_DAYS} days."
+    return start_date, end_date, None
+
+
+@app.route("/compliance")
+def compliance_report():
+    """Fleet-wide rest and rolling 24-hour working-time report."""
+    start_date, end_date, error = parse_compliance_range(
+        request.args.get("start_date"), request.args.get("end_date")
+    )
+    if error:
+        flash(error, "error")
+        start_date, end_date, _ = parse_compliance_range(None, None)
+
+    violations = [
+        dict(violation, description=describe_compliance_violation(violation))
+        for violation in scan_work_time_compliance(start_date, end_date)
+    ]
+    return render_template(
+        "compliance.html",
+        start_date=start_date,
+        end_date=end_date,
+        violations=violations,
+        min_rest_hours=MIN_REST_HOURS,
+        max_work_hours=MAX_WORK_HOURS_PER_24H,
+    )
+
+
+@app.cli.command("compliance-report")
+@click.option("--start", "start_str", help="First date to scan (YYYY-MM-DD, default today).")
+@click.option("--end", "end_str", help="Last date to scan (YYYY-MM-DD, default start + 27 days).")
+def compliance_report_command(start_str, end_str):
+    """Print rest and rolling 24-hour violations; exits 1 when any are found."""
+    start_date, end_date, error = parse_compliance_range(start_str, end_str)
+    if error:
+        raise click.BadParameter(error)
+
+    found = 0
+    for violation in scan_work_time_compliance(start_date, end_date):
+        found += 1
+        click.echo(
+            f"{violation['date'].isoformat()}\t{violation['driver'].formatted_name()}\t"
+            f"{violation['rule']}\t{describe_compliance_violation(violation)}"
+        )
+    click.echo(
+        f"{found} violation(s) between {start_date.isoformat()} and {end_date.isoformat()}.",
+        err=True,
+    )
+    if found:
+        raise SystemExit(1)
+
+
+
+@app.cli.command("close-extra-car-requests")
+def close_extra_car_requests_command():
+    """Close extra car requests whose time window has ended (for cron)."""
+    closed = close_finished_extra_car_requests()
+    click.echo(f"Closed {closed} extra car request(s).")
+
 if __name__ == "__main__":
     app.run(
         host=app.config.get('HOST', '0.0.0.0'),
@@ -0,0 +1,49 @@
+# Gunicorn configuration for Driver Shift Sheets
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# Every setting can be overridden through the environment variable shown.
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND') or f"{os.environ.get('FLASK_HOST') or '0.0.0.0'}:{os.environ.get('FLASK_PORT') or 5000}"
+
+# Import the app (and run its startup migrations) once in the master; workers fork from it
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Pages are mostly DB- and template-bound, so 2 x CPU + 1 processes of 4 threads.
+# An open /live/roster stream occupies one of its worker's threads until the client
+# leaves, so streams are capped per worker (LIVE_ROSTER_MAX_STREAMS, default half the
+# threads) and the rest stay free for pages. Past the cap a sheet simply isn't live;
+# raise both settings together for more concurrent viewers.
+workers = int(os.environ.get('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or 4)
+os.environ.setdefault('LIVE_ROSTER_MAX_STREAMS', str(max(1, threads // 2)))
+
+# Recycle workers periodically so cache and fragmentation growth stays bounded;
+# jitter staggers the restarts so workers don't all recycle at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS') or 2000)
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER') or 200)
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 60)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT') or 30)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE') or 5)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or '-'
+errorlog = os.environ.get('GUNICORN_ERROR_LOG') or '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL') or 'info'
+
+
+def post_fork(server, worker):
+    """Drop the pooled connections inherited from the preloaded master.
+
+    A forked DBAPI connection shares its socket (or SQLite file handle) with
+    the parent and every sibling, so each worker starts with an empty pool.
+    ``close=False`` leaves the parent's connections open for it to use.
+    """
+    from app import app, db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
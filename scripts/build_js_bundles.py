@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 import argparse
+import gzip
 import hashlib
 import importlib
 import json
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-JS_ROOT = ROOT / "static" / "js"
+STATIC_ROOT = ROOT / "static"
+JS_ROOT = STATIC_ROOT / "js"
 BUNDLES_ROOT = JS_ROOT / "bundles"
+CSS_ROOT = STATIC_ROOT / "css"
+CSS_BUNDLES_ROOT = CSS_ROOT / "bundles"
 
 BUNDLES = {
     "drivers.bundle.js": [
@@ -31,10 +35,33 @@ BUNDLES = {
         "scheduling.core.js",
         "scheduling.event-bindings.js",
     ],
+    "extra-cars.bundle.js": [
+        "shared.core.js",
+        "scheduling.flash-banner.js",
+        "extra-cars.core.js",
+    ],
+    "base.bundle.js": [
+        "utils/debug.js",
+        "utils/validation.js",
+        "utils/messages.js",
+        "base.delete-modal.js",
+    ],
+    "daily-sheet.bundle.js": ["daily-sheet.live.js"],
+    "daily-sheet-form.bundle.js": ["daily-sheet-form.init.js"],
+    "print-daily-sheet.bundle.js": ["print-daily-sheet.init.js"],
+    "cars-working.bundle.js": ["cars-working.init.js"],
+}
+
+STYLESHEETS = {
+    "style.css": "style.css",
 }
 
 MANIFEST_FILE = "manifest.json"
 
+# Precompressed siblings served by the app when the client accepts them
+GZIP_SUFFIX = ".gz"
+BROTLI_SUFFIX = ".br"
+
 
 def resolve_jsmin():
     try:
@@ -44,7 +71,34 @@ def resolve_jsmin():
         return None
 
 
-def build_bundle(bundle_name: str, files: list[str], minify: bool, jsmin_fn) -> tuple[str, str]:
+def resolve_brotli():
+    try:
+        module = importlib.import_module("brotli")
+        return getattr(module, "compress", None)
+    except Exception:
+        return None
+
+
+def write_asset(output_root: Path, stem: str, suffix: str, content: str, brotli_fn) -> tuple[str, list[str]]:
+    """Write a content-hashed asset plus its precompressed siblings."""
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    hashed_name = f"{stem}.{digest}{suffix}"
+    output_path = output_root / hashed_name
+    output_path.write_bytes(data)
+
+    # mtime=0 keeps the .gz output byte-identical between builds
+    encodings = ["gzip"]
+    (output_root / f"{hashed_name}{GZIP_SUFFIX}").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli_fn is not None:
+        (output_root / f"{hashed_name}{BROTLI_SUFFIX}").write_bytes(brotli_fn(data))
+        encodings.insert(0, "br")
+
+    print(f"Built {output_path.relative_to(ROOT)} (+{', '.join(encodings)})")
+    return f"{output_root.relative_to(STATIC_ROOT).as_posix()}/{hashed_name}", encodings
+
+
+def build_bundle(bundle_name: str, files: list[str], minify: bool, jsmin_fn, brotli_fn) -> tuple[str, list[str]]:
     chunks: list[str] = [
         "/* Auto-generated bundle. Do not edit directly. */\n",
         f"/* Bundle: {bundle_name} */\n\n",
@@ -62,30 +116,36 @@ def build_bundle(bundle_name: str, files: list[str], minify: bool, jsmin_fn) ->
     if minify and jsmin_fn is not None:
         content = jsmin_fn(content)
 
-    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
     stem = bundle_name[:-3] if bundle_name.endswith(".js") else bundle_name
-    hashed_name = f"{stem}.{digest}.js"
-    output_path = BUNDLES_ROOT / hashed_name
+    return write_asset(BUNDLES_ROOT, stem, ".js", content, brotli_fn)
 
-    output_path.write_text(content, encoding="utf-8")
-    print(f"Built {output_path.relative_to(ROOT)}")
-    return bundle_name, hashed_name
+
+def build_stylesheet(name: str, source: str, brotli_fn) -> tuple[str, list[str]]:
+    src = CSS_ROOT / source
+    if not src.exists():
+        raise FileNotFoundError(f"Missing source CSS file: {src}")
+    stem = name[:-4] if name.endswith(".css") else name
+    return write_asset(CSS_BUNDLES_ROOT, stem, ".css", src.read_text(encoding="utf-8"), brotli_fn)
 
 
 def clean_old_bundles(manifest_values: set[str]) -> None:
-    for existing in BUNDLES_ROOT.glob("*.js"):
-        if existing.name not in manifest_values:
-            existing.unlink(missing_ok=True)
+    keep = set()
+    for path in manifest_values:
+        keep.update({path, f"{path}{GZIP_SUFFIX}", f"{path}{BROTLI_SUFFIX}"})
+    for output_root, pattern in ((BUNDLES_ROOT, "*.js*"), (CSS_BUNDLES_ROOT, "*.css*")):
+        for existing in output_root.glob(pattern):
+            if existing.relative_to(STATIC_ROOT).as_posix() not in keep:
+                existing.unlink(missing_ok=True)
 
 
-def write_manifest(manifest: dict[str, str]) -> None:
+def write_manifest(manifest: dict) -> None:
     manifest_path = BUNDLES_ROOT / MANIFEST_FILE
     manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
     print(f"Updated {manifest_path.relative_to(ROOT)}")
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Build cache-busted JS bundles")
+    parser = argparse.ArgumentParser(description="Build cache-busted JS/CSS bundles with gzip/brotli siblings")
     parser.add_argument(
         "--minify",
         action="store_true",
@@ -97,18 +157,30 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
     jsmin_fn = resolve_jsmin()
+    brotli_fn = resolve_brotli()
     BUNDLES_ROOT.mkdir(parents=True, exist_ok=True)
+    CSS_BUNDLES_ROOT.mkdir(parents=True, exist_ok=True)
 
     if args.minify and jsmin_fn is None:
         print("Minify requested but rjsmin is not installed; building non-minified bundles.")
+    if brotli_fn is None:
+        print("brotli is not installed; emitting gzip siblings only.")
 
-    manifest: dict[str, str] = {}
+    # "bundles" maps logical names to static-relative hashed paths;
+    # "encodings" lists the precompressed siblings of each hashed path.
+    bundles: dict[str, str] = {}
+    encodings: dict[str, list[str]] = {}
     for name, source_files in BUNDLES.items():
-        key, hashed_name = build_bundle(name, source_files, minify=args.minify, jsmin_fn=jsmin_fn)
-        manifest[key] = hashed_name
-
-    clean_old_bundles(set(manifest.values()))
-    write_manifest(manifest)
+        path, available = build_bundle(name, source_files, minify=args.minify, jsmin_fn=jsmin_fn, brotli_fn=brotli_fn)
+        bundles[name] = path
+        encodings[path] = available
+    for name, source in STYLESHEETS.items():
+        path, available = build_stylesheet(name, source, brotli_fn)
+        bundles[name] = path
+        encodings[path] = available
+
+    clean_old_bundles(set(bundles.values()))
+    write_manifest({"bundles": bundles, "encodings": encodings})
 
 
 if __name__ == "__main__":
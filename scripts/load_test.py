@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Measure throughput of the dashboard and daily sheet routes.
+
+Run it against the development server and against gunicorn to compare:
+
+    python app.py                                    # :5000
+    gunicorn -c gunicorn.conf.py -b :8000 app:app    # :8000
+    python scripts/load_test.py http://127.0.0.1:5000 http://127.0.0.1:8000
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+
+def default_paths():
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    return [
+        "/",
+        f"/daily-sheet/generate?target_date={today.isoformat()}",
+        f"/daily-sheet/generate?target_date={tomorrow.isoformat()}",
+        f"/daily-sheet/print?date={today.isoformat()}",
+    ]
+
+
+def fetch(url, timeout):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def run_load(base_url, path, concurrency, duration, timeout):
+    """Hammer one URL with ``concurrency`` clients for ``duration`` seconds."""
+    url = base_url.rstrip("/") + path
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        while time.perf_counter() < deadline:
+            ok, elapsed = fetch(url, timeout)
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    fetch(url, timeout)  # warm caches so every target starts from the same state
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+    }
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test dashboard and daily sheet routes.")
+    parser.add_argument("targets", nargs="+", help="Base URLs to compare, e.g. http://127.0.0.1:5000")
+    parser.add_argument("--path", action="append", dest="paths", help="Route to test (repeatable; defaults to dashboard and daily sheets)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Concurrent clients per route")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds per route and target")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    paths = args.paths or default_paths()
+    baseline = {}
+    print(f"{'target':<28} {'route':<48} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} {'gain':>7}")
+    for index, target in enumerate(args.targets):
+        for path in paths:
+            result = run_load(target, path, args.concurrency, args.duration, args.timeout)
+            if index == 0:
+                baseline[path] = result["rps"]
+                gain = ""
+            else:
+                gain = f"{result['rps'] / baseline[path]:.2f}x" if baseline.get(path) else "n/a"
+            print(
+                f"{target:<28} {path:<48} {result['rps']:>8.1f} "
+                f"{result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} {result['errors']:>7} {gain:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
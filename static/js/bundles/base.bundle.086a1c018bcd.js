@@ -0,0 +1,524 @@
+/* Auto-generated bundle. Do not edit directly. */
+/* Bundle: base.bundle.js */
+
+
+/* ===== utils/debug.js ===== */
+/**
+ * Debug logging utility - respects log level
+ * 
+ * Usage:
+ *   DEBUG.log('User clicked button', 'info', { userId: 123 })
+ *   DEBUG.error('Failed to save', 'error', { error });
+ *   DEBUG.warn('Deprecated function used', 'warn');
+ * 
+ * Control level from browser console:
+ *   DEBUG.setLevel('debug')   - See all logs
+ *   DEBUG.setLevel('info')    - See info, warn, error (default)
+ *   DEBUG.setLevel('error')   - See only errors
+ * 
+ * @type {Object}
+ */
+const DEBUG = (() => {
+    const levels = { debug: 0, info: 1, warn: 2, error: 3 };
+    let currentLevel = localStorage.getItem('DEBUG_LEVEL') || 'info';
+    
+    const getPrefix = (level) => {
+        const emoji = {
+            debug: '🔍',
+            info: 'ℹ️',
+            warn: '⚠️',
+            error: '❌'
+        };
+        const timestamp = new Date().toLocaleTimeString();
+        return `${emoji[level] || '•'} [${timestamp}] [${level.toUpperCase()}]`;
+    };
+    
+    return {
+        /**
+         * Set logging level
+         * @param {string} level - 'debug', 'info', 'warn', 'error'
+         */
+        setLevel(level) {
+            if (!levels.hasOwnProperty(level)) {
+                console.warn(`Invalid debug level: ${level}`);
+                return;
+            }
+            currentLevel = level;
+            localStorage.setItem('DEBUG_LEVEL', level);
+            console.log(`%cDebug level set to: ${level}`, 'color: #0d6efd; font-weight: bold;');
+        },
+        
+        /**
+         * Generic log function
+         * @param {string} message - Log message
+         * @param {string} level - 'debug', 'info', 'warn', 'error'
+         * @param {*} data - Optional data to log
+         */
+        log(message, level = 'info', data = null) {
+            if (!levels.hasOwnProperty(level)) level = 'info';
+            if (levels[level] >= levels[currentLevel]) {
+                const prefix = getPrefix(level);
+                if (data) {
+                    console.log(`%c${prefix} ${message}`, 'color: #0d6efd; font-weight: bold;', data);
+                } else {
+                    console.log(`%c${prefix} ${message}`, 'color: #0d6efd; font-weight: bold;');
+                }
+            }
+        },
+        
+        /**
+         * Debug level logging (lowest priority)
+         * @param {string} message 
+         * @param {*} data 
+         */
+        debug(message, data) {
+            this.log(message, 'debug', data);
+        },
+        
+        /**
+         * Info level logging (default minimum)
+         * @param {string} message 
+         * @param {*} data 
+         */
+        info(message, data) {
+            this.log(message, 'info', data);
+        },
+        
+        /**
+         * Warning level logging
+         * @param {string} message 
+         * @param {*} data 
+         */
+        warn(message, data) {
+            this.log(message, 'warn', data);
+        },
+        
+        /**
+         * Error level logging (highest priority)
+         * @param {string} message 
+         * @param {*} data 
+         */
+        error(message, data) {
+            this.log(message, 'error', data);
+        },
+        
+        /**
+         * Get current debug level
+         * @returns {string}
+         */
+        getLevel() {
+            return currentLevel;
+        }
+    };
+})();
+
+// Initialize - log that debug module loaded
+if (window.location.href.includes('localhost') || window.location.href.includes('127.0.0.1')) {
+    DEBUG.debug('Debug module loaded');
+}
+
+
+/* ===== utils/validation.js ===== */
+/**
+ * Form input validation utilities
+ * All validators return null on success, or error message string on failure
+ * 
+ * Usage:
+ *   const error = Validate.driver_id(value);
+ *   if (error) {
+ *       showAlertBanner('error', error);
+ *       return;
+ *   }
+ * 
+ * @type {Object}
+ */
+const Validate = {
+    /**
+     * Validate positive integer with bounds
+     * @param {*} val - Value to validate
+     * @param {Object} options - {min, max, name}
+     * @returns {string|null} Error message or null
+     */
+    positive_integer(val, options = {}) {
+        const { min = 1, max = Infinity, name = 'Value' } = options;
+        const num = parseInt(val, 10);
+        
+        if (val === null || val === undefined || val === '') {
+            return `${name} is required`;
+        }
+        
+        if (isNaN(num)) {
+            return `${name} must be a number`;
+        }
+        
+        if (num < min) {
+            return `${name} must be at least ${min}`;
+        }
+        
+        if (num > max) {
+            return `${name} must be at most ${max}`;
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate driver ID (1-999999)
+     * @param {*} val 
+     * @returns {string|null}
+     */
+    driver_id(val) {
+        return this.positive_integer(val, { 
+            min: 1, 
+            max: 999999, 
+            name: 'Driver ID' 
+        });
+    },
+    
+    /**
+     * Validate cycle length (1-365)
+     * @param {*} val 
+     * @returns {string|null}
+     */
+    cycle_length(val) {
+        return this.positive_integer(val, { 
+            min: 1, 
+            max: 365, 
+            name: 'Cycle length' 
+        });
+    },
+    
+    /**
+     * Validate date string in YYYY-MM-DD format
+     * @param {*} val 
+     * @returns {string|null}
+     */
+    date_string(val) {
+        if (!val) return 'Date is required';
+        
+        if (!/^\d{4}-\d{2}-\d{2}$/.test(val)) {
+            return 'Invalid date format (use YYYY-MM-DD)';
+        }
+        
+        const date = new Date(val + 'T00:00:00');
+        if (isNaN(date.getTime())) {
+            return 'Invalid date';
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate time string in HH:MM format
+     * @param {*} val 
+     * @returns {string|null}
+     */
+    time_string(val) {
+        if (!val) return 'Time is required';
+        
+        if (!/^\d{2}:\d{2}$/.test(val)) {
+            return 'Invalid time format (use HH:MM)';
+        }
+        
+        const [h, m] = val.split(':').map(Number);
+        
+        if (h < 0 || h > 23 || m < 0 || m > 59) {
+            return 'Invalid time values (hours 0-23, minutes 0-59)';
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate email address
+     * @param {*} val 
+     * @returns {string|null}
+     */
+    email(val) {
+        if (!val) return 'Email is required';
+        
+        // Basic email validation - more complex regex available if needed
+        if (!/^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(val)) {
+            return 'Invalid email address';
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate required field (non-empty string)
+     * @param {*} val 
+     * @param {string} fieldName - Field display name
+     * @returns {string|null}
+     */
+    required(val, fieldName = 'This field') {
+        if (val === null || val === undefined) {
+            return `${fieldName} is required`;
+        }
+        
+        if (typeof val === 'string' && val.trim() === '') {
+            return `${fieldName} is required`;
+        }
+        
+        if (typeof val === 'number' && isNaN(val)) {
+            return `${fieldName} is required`;
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate minimum string length
+     * @param {*} val 
+     * @param {number} min 
+     * @returns {string|null}
+     */
+    min_length(val, min) {
+        if (!val) return `Required field (minimum ${min} characters)`;
+        
+        const str = String(val);
+        if (str.length < min) {
+            return `Must be at least ${min} characters (currently ${str.length})`;
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate maximum string length
+     * @param {*} val 
+     * @param {number} max 
+     * @returns {string|null}
+     */
+    max_length(val, max) {
+        if (!val) return null;
+        
+        const str = String(val);
+        if (str.length > max) {
+            return `Must be at most ${max} characters (currently ${str.length})`;
+        }
+        
+        return null;
+    },
+    
+    /**
+     * Validate URL format
+     * @param {*} val 
+     * @returns {string|null}
+     */
+    url(val) {
+        if (!val) return 'URL is required';
+        
+        try {
+            new URL(val);
+            return null;
+        } catch {
+            return 'Invalid URL format';
+        }
+    },
+    
+    /**
+     * Validate match between two values (passwords, etc)
+     * @param {*} val1 
+     * @param {*} val2 
+     * @param {string} fieldName 
+     * @returns {string|null}
+     */
+    match(val1, val2, fieldName = 'Values') {
+        if (val1 !== val2) {
+            return `${fieldName} do not match`;
+        }
+        return null;
+    },
+    
+    /**
+     * Run multiple validations, return first error or null
+     * @param {Object} validators - {fieldName: [validator_fn, validator_fn, ...], ...}
+     * @returns {string|null} First error found or null
+     */
+    multi(validators) {
+        for (const [fieldName, validatorFunctions] of Object.entries(validators)) {
+            if (!Array.isArray(validatorFunctions)) continue;
+            
+            for (const validatorFn of validatorFunctions) {
+                if (typeof validatorFn !== 'function') continue;
+                
+                const error = validatorFn();
+                if (error) return error;
+            }
+        }
+        return null;
+    }
+};
+
+
+/* ===== utils/messages.js ===== */
+/**
+ * Centralized user-facing messages
+ * Keeps all UI text in one place for easy maintenance and future i18n
+ * 
+ * Usage:
+ *   showAlertBanner('success', MESSAGES.DRIVER_ADDED);
+ *   showAlertBanner('error', MESSAGES.NETWORK_ERROR);
+ * 
+ * @type {Object}
+ */
+const MESSAGES = {
+    // ========== SUCCESS MESSAGES ==========
+    DRIVER_ADDED: '<i class="fas fa-check-circle"></i> Driver added successfully.',
+    DRIVER_UPDATED: '<i class="fas fa-check-circle"></i> Driver updated successfully.',
+    DRIVER_DELETED: '<i class="fas fa-check-circle"></i> Driver deleted successfully.',
+    
+    ASSIGNMENT_SAVED: '<i class="fas fa-check-circle"></i> Assignment saved successfully.',
+    ASSIGNMENT_ENDED: '<i class="fas fa-check-circle"></i> Assignment ended successfully.',
+    ASSIGNMENT_DELETED: '<i class="fas fa-check-circle"></i> Assignment deleted successfully.',
+    
+    PATTERN_CREATED: '<i class="fas fa-check-circle"></i> Shift pattern created successfully.',
+    PATTERN_UPDATED: '<i class="fas fa-check-circle"></i> Shift pattern updated successfully.',
+    PATTERN_DELETED: '<i class="fas fa-check-circle"></i> Shift pattern deleted successfully.',
+    PATTERN_COPIED: '<i class="fas fa-check-circle"></i> Shift pattern copied successfully.',
+    
+    SHIFT_TYPE_ADDED: '<i class="fas fa-check-circle"></i> Shift type added successfully.',
+    SHIFT_TYPE_UPDATED: '<i class="fas fa-check-circle"></i> Shift type updated successfully.',
+    SHIFT_TYPE_DELETED: '<i class="fas fa-check-circle"></i> Shift type deleted successfully.',
+    
+    CUSTOM_TIMING_SAVED: '<i class="fas fa-check-circle"></i> Custom timing saved successfully.',
+    CUSTOM_TIMING_DELETED: '<i class="fas fa-check-circle"></i> Custom timing deleted successfully.',
+    
+    HOLIDAY_ADDED: '<i class="fas fa-check-circle"></i> Holiday added successfully.',
+    HOLIDAY_DELETED: '<i class="fas fa-check-circle"></i> Holiday deleted successfully.',
+    
+    DATA_IMPORTED: '<i class="fas fa-check-circle"></i> Data imported successfully.',
+    DATA_EXPORTED: '<i class="fas fa-check-circle"></i> Data exported successfully.',
+    
+    // ========== ERROR MESSAGES ==========
+    INVALID_INPUT: '<i class="fas fa-exclamation-circle"></i> Invalid input. Please check your entries.',
+    
+    NETWORK_ERROR: '<i class="fas fa-exclamation-circle"></i> Network error. Please check your connection and try again.',
+    SERVER_ERROR: '<i class="fas fa-exclamation-circle"></i> Server error. Please try again later or contact support.',
+    TIMEOUT_ERROR: '<i class="fas fa-exclamation-circle"></i> Request timed out. Please try again.',
+    
+    PERMISSION_DENIED: '<i class="fas fa-exclamation-circle"></i> You do not have permission for this action.',
+    NOT_FOUND: '<i class="fas fa-exclamation-circle"></i> The requested item was not found.',
+    
+    DUPLICATE_ENTRY: '<i class="fas fa-exclamation-circle"></i> This entry already exists.',
+    VALIDATION_FAILED: '<i class="fas fa-exclamation-circle"></i> Validation failed. Please check your entries.',
+    
+    REQUIRED_FIELD_MISSING: '<i class="fas fa-exclamation-circle"></i> Please fill in all required fields.',
+    INVALID_DATE_RANGE: '<i class="fas fa-exclamation-circle"></i> Invalid date range. End date must be after start date.',
+    INVALID_TIME_RANGE: '<i class="fas fa-exclamation-circle"></i> Invalid time range. End time must be after start time.',
+    LOAD_DATA_ERROR: '<i class="fas fa-exclamation-circle"></i> Could not load data. Please try again.',
+    FORM_ERROR: '<i class="fas fa-exclamation-circle"></i> Form error. Please check your input.',
+    CUSTOM_TIMING_SAVE_ERROR: '<i class="fas fa-exclamation-circle"></i> Could not save custom timing. Please try again.',
+    CUSTOM_TIMING_DELETE_ERROR: '<i class="fas fa-exclamation-circle"></i> Could not delete custom timing. Please try again.',
+    
+    UNSAVED_CHANGES: '<i class="fas fa-exclamation-triangle"></i> You have unsaved changes. Please save before continuing.',
+    
+    // ========== WARNING MESSAGES ==========
+    CONFIRM_DELETE: '<i class="fas fa-exclamation-triangle"></i> Are you sure? This action cannot be undone.',
+    CONFIRM_OVERWRITE: '<i class="fas fa-exclamation-triangle"></i> This will overwrite existing data. Continue?',
+    
+    DEPRECATED_FEATURE: '<i class="fas fa-info-circle"></i> This feature is deprecated and will be removed soon.',
+    
+    // ========== LOADING/PROCESS MESSAGES ==========
+    LOADING: '<i class="fas fa-spinner fa-spin"></i> Loading...',
+    LOADING_DATA: '<i class="fas fa-spinner fa-spin"></i> Loading data...',
+    
+    SAVING: '<i class="fas fa-spinner fa-spin"></i> Saving...',
+    SAVING_CHANGES: '<i class="fas fa-spinner fa-spin"></i> Saving changes...',
+    
+    DELETING: '<i class="fas fa-spinner fa-spin"></i> Deleting...',
+    
+    PROCESSING: '<i class="fas fa-spinner fa-spin"></i> Processing...',
+    PROCESSING_FILE: '<i class="fas fa-spinner fa-spin"></i> Processing file...',
+    
+    UPLOADING: '<i class="fas fa-spinner fa-spin"></i> Uploading...',
+    DOWNLOADING: '<i class="fas fa-spinner fa-spin"></i> Downloading...',
+    
+    GENERATING: '<i class="fas fa-spinner fa-spin"></i> Generating...',
+    GENERATING_REPORT: '<i class="fas fa-spinner fa-spin"></i> Generating report...',
+    
+    // ========== INFO MESSAGES ==========
+    NO_DATA: '<i class="fas fa-info-circle"></i> No data to display.',
+    NO_RESULTS: '<i class="fas fa-info-circle"></i> No results found.',
+    EMPTY_SELECTION: '<i class="fas fa-info-circle"></i> Please select at least one item.',
+    
+    // ========== CUSTOM MESSAGE BUILDERS ==========
+    error: (message) => `<i class="fas fa-exclamation-circle"></i> ${message}`,
+    success: (message) => `<i class="fas fa-check-circle"></i> ${message}`,
+    warning: (message) => `<i class="fas fa-exclamation-triangle"></i> ${message}`,
+    info: (message) => `<i class="fas fa-info-circle"></i> ${message}`,
+};
+
+
+/* ===== base.delete-modal.js ===== */
+(function () {
+    window.showGlobalDeleteConfirm = function (options) {
+        const config = options || {};
+        const title = config.title || 'Confirm Deletion';
+        const message = config.message || 'Are you sure you want to delete this item?';
+        const name = config.name || '';
+        const warning = config.warning || '';
+        const action = config.action || '#';
+        const submitLabel = config.submitLabel || 'Delete';
+
+        const titleEl = document.getElementById('globalDeleteTitle');
+        const messageEl = document.getElementById('globalDeleteMessage');
+        const nameRowEl = document.getElementById('globalDeleteNameRow');
+        const nameEl = document.getElementById('globalDeleteName');
+        const warningEl = document.getElementById('globalDeleteWarning');
+        const formEl = document.getElementById('deleteForm');
+        const submitEl = document.getElementById('globalDeleteSubmitBtn');
+
+        if (titleEl) titleEl.textContent = title;
+        if (messageEl) messageEl.textContent = message;
+
+        if (nameRowEl && nameEl) {
+            if (name) {
+                nameEl.textContent = name;
+                nameRowEl.classList.remove('d-none');
+            } else {
+                nameEl.textContent = '';
+                nameRowEl.classList.add('d-none');
+            }
+        }
+
+        if (warningEl) {
+            if (warning) {
+                warningEl.innerHTML = '<i class="fas fa-exclamation-triangle"></i> ' + warning;
+                warningEl.classList.remove('d-none');
+            } else {
+                warningEl.innerHTML = '';
+                warningEl.classList.add('d-none');
+            }
+        }
+
+        if (formEl) formEl.action = action;
+        if (submitEl) {
+            submitEl.textContent = submitLabel;
+            submitEl.type = action === 'javascript:void(0);' ? 'button' : 'submit';
+        }
+
+        let feedbackEl = document.getElementById('deletePatternFeedback');
+        if (!feedbackEl) {
+            feedbackEl = document.createElement('div');
+            feedbackEl.id = 'deletePatternFeedback';
+            feedbackEl.className = 'alert d-none mt-3';
+            feedbackEl.setAttribute('role', 'alert');
+            const modalBody = document.querySelector('#deleteModal .modal-body');
+            if (modalBody) {
+                modalBody.appendChild(feedbackEl);
+            }
+        } else {
+            feedbackEl.classList.add('d-none');
+            feedbackEl.textContent = '';
+            feedbackEl.classList.remove('alert-success', 'alert-danger', 'alert-warning', 'alert-info', 'fade', 'show', 'alert-dismissible');
+        }
+
+        const modalEl = document.getElementById('deleteModal');
+        if (!modalEl || typeof bootstrap === 'undefined') return;
+        const modal = bootstrap.Modal.getOrCreateInstance(modalEl);
+        modal.show();
+    };
+})();
+
@@ -0,0 +1,50 @@
+/* Auto-generated bundle. Do not edit directly. */
+/* Bundle: daily-sheet.bundle.js */
+
+
+/* ===== daily-sheet.live.js ===== */
+document.addEventListener('DOMContentLoaded', function () {
+    const banner = document.getElementById('liveRosterBanner');
+    if (!banner || typeof window.EventSource !== 'function') return;
+
+    const sheetDate = banner.dataset.date;
+    const list = banner.querySelector('ul');
+    let source = null;
+
+    function describe(entry, verb) {
+        const times = entry.start_time && entry.end_time ? ' ' + entry.start_time + '–' + entry.end_time : '';
+        return entry.driver_name + ' (' + entry.driver_number + ') ' + verb + ' ' +
+            entry.shift_type.replace(/_/g, ' ') + times;
+    }
+
+    function addLine(text) {
+        const item = document.createElement('li');
+        item.textContent = text;
+        list.appendChild(item);
+        banner.classList.remove('d-none');
+    }
+
+    source = new EventSource(banner.dataset.url);
+
+    source.addEventListener('snapshot', function (event) {
+        const payload = JSON.parse(event.data);
+        if (payload.dates.indexOf(sheetDate) === -1) {
+            // Only today's and tomorrow's sheets are streamed.
+            source.close();
+        }
+    });
+
+    source.addEventListener('diff', function (event) {
+        const payload = JSON.parse(event.data);
+        payload.added.forEach(function (entry) {
+            if (entry.date === sheetDate) addLine(describe(entry, 'added to'));
+        });
+        payload.changed.forEach(function (entry) {
+            if (entry.date === sheetDate) addLine(describe(entry, 'now on'));
+        });
+        payload.removed.forEach(function (entry) {
+            if (entry.date === sheetDate) addLine(describe(entry, 'removed from'));
+        });
+    });
+});
+
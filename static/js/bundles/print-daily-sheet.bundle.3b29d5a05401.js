@@ -0,0 +1,18 @@
+/* Auto-generated bundle. Do not edit directly. */
+/* Bundle: print-daily-sheet.bundle.js */
+
+
+/* ===== print-daily-sheet.init.js ===== */
+document.addEventListener('DOMContentLoaded', function () {
+    const printButton = document.getElementById('printDailySheetBtn');
+    if (printButton) {
+        printButton.addEventListener('click', function () {
+            window.print();
+        });
+    }
+
+    window.setTimeout(function () {
+        window.print();
+    }, 500);
+});
+
@@ -5,6 +5,7 @@ coverage/slot counting, and status transitions.
 """
 import pytest
 from datetime import date, time, datetime, timedelta
+from sqlalchemy import event
 
 from app import app as flask_app, db as _db
 from app import (
@@ -13,6 +14,9 @@ from app import (
     DriverHoliday, ShiftAdjustment, DriverCustomTiming,
     validate_extra_car_assignment, get_driver_all_work_intervals,
     MIN_REST_HOURS, MAX_WORK_HOURS_PER_24H,
+    RosterWindow, rank_extra_car_candidates,
+    plan_extra_car_autofill, apply_extra_car_autofill,
+    close_finished_extra_car_requests,
 )
 from tests.conftest import make_driver, make_shift_timing, make_pattern, make_assignment
 
@@ -815,6 +819,56 @@ class TestStatusTransitions:
             filled, status = req.compute_coverage()
             assert status == 'CLOSED'
 
+    def test_page_view_does_not_write_statuses(self, client, db):
+        """Viewing /extra-cars must not change stored statuses."""
+        future = date.today() + timedelta(days=30)
+        with flask_app.app_context():
+            driver = make_driver(db, '1', 'D')
+            covered = make_extra_request(db, req_date=future, status='OPEN')
+            make_extra_assignment(db, covered, driver)
+            ended = make_extra_request(db, req_date=date.today() - timedelta(days=3))
+            covered_id, ended_id = covered.id, ended.id
+
+        resp = client.get('/extra-cars')
+        assert resp.status_code == 200
+        with flask_app.app_context():
+            assert db.session.get(ExtraCarRequest, covered_id).status == 'OPEN'
+            assert db.session.get(ExtraCarRequest, ended_id).status == 'OPEN'
+
+    def test_edit_recomputes_status(self, client, db):
+        future = date.today() + timedelta(days=30)
+        with flask_app.app_context():
+            driver = make_driver(db, '1', 'D')
+            req = make_extra_request(db, req_date=future, required_slots=2)
+            make_extra_assignment(db, req, driver)
+            req_id = req.id
+
+        client.post(f'/extra-cars/request/{req_id}/edit', data={
+            'request_type': 'time_window',
+            'date': future.isoformat(),
+            'window_start': '08:00',
+            'window_end': '18:00',
+            'required_slots': '1',
+        })
+        with flask_app.app_context():
+            req = db.session.get(ExtraCarRequest, req_id)
+            assert req.required_slots == 1
+            assert req.status == 'FILLED'
+
+    def test_close_finished_requests_job(self, db):
+        with flask_app.app_context():
+            ended = make_extra_request(db, req_date=date(2026, 6, 15))
+            overnight = make_extra_request(db, req_date=date(2026, 6, 15),
+                                           window_start='20:00', window_end='06:00')
+            upcoming = make_extra_request(db, req_date=date(2026, 6, 20))
+
+            closed = close_finished_extra_car_requests(now=datetime(2026, 6, 16, 1, 0))
+
+            assert closed == 1
+            assert db.session.get(ExtraCarRequest, ended.id).status == 'CLOSED'
+            assert db.session.get(ExtraCarRequest, overnight.id).status == 'OPEN'
+            assert db.session.get(ExtraCarRequest, upcoming.id).status == 'OPEN'
+
     def test_assignment_route_rejects_invalid_driver(self, client, db):
         with flask_app.app_context():
             req = make_extra_request(db)
@@ -951,6 +1005,41 @@ class TestStatusTransitions:
             req = db.session.get(ExtraCarRequest, req_id)
             assert req.status == 'OPEN'
 
+    def test_add_assignment_route_fills_request(self, client, db):
+        future = date.today() + timedelta(days=30)
+        with flask_app.app_context():
+            driver = make_driver(db, '1', 'D')
+            req = make_extra_request(db, req_date=future, required_slots=1)
+            req_id, driver_id = req.id, driver.id
+
+        client.post(
+            f'/extra-cars/request/{req_id}/assignment/add',
+            data={'driver_id': str(driver_id), 'start_time': '08:00', 'end_time': '18:00'},
+        )
+        with flask_app.app_context():
+            assert ExtraCarAssignment.query.filter_by(request_id=req_id).count() == 1
+            assert db.session.get(ExtraCarRequest, req_id).status == 'FILLED'
+
+    def test_delete_assignment_route_reopens_filled_request(self, client, db):
+        future = date.today() + timedelta(days=30)
+        with flask_app.app_context():
+            driver = make_driver(db, '1', 'D')
+            req = make_extra_request(db, req_date=future, required_slots=1)
+            req_id, driver_id = req.id, driver.id
+
+        client.post(
+            f'/extra-cars/request/{req_id}/assignment/add',
+            data={'driver_id': str(driver_id), 'start_time': '08:00', 'end_time': '18:00'},
+        )
+        with flask_app.app_context():
+            assert db.session.get(ExtraCarRequest, req_id).status == 'FILLED'
+            asgn_id = ExtraCarAssignment.query.filter_by(request_id=req_id).one().id
+
+        client.post(f'/extra-cars/request/{req_id}/assignment/{asgn_id}/delete')
+        with flask_app.app_context():
+            assert ExtraCarAssignment.query.filter_by(request_id=req_id).count() == 0
+            assert db.session.get(ExtraCarRequest, req_id).status == 'OPEN'
+
     def test_assignment_rejected_when_capacity_already_fully_covered(self, client, db):
         with flask_app.app_context():
             d1 = make_driver(db, '81', 'Full Coverage Driver')
@@ -1216,3 +1305,185 @@ class TestExtraCarIntervals:
             assert not valid
             assert len(errors) == 1
             assert 'no legal assignment window' in errors[0].lower()
+
+
+# ===========================================================================
+# Bulk candidate ranking
+# ===========================================================================
+
+class TestCandidateRanking:
+    def _setup_fleet(self, db, ref):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        make_shift_timing(db, 'night', '20:00', '04:00')
+        mornings = make_pattern(db, 'Mornings', 7, ['morning'] * 7)
+        nights = make_pattern(db, 'Nights', 7, ['night'] * 7)
+
+        make_driver(db, '1', 'Free Driver')
+        early = make_driver(db, '2', 'Early Driver')
+        make_assignment(db, early, mornings, ref - timedelta(days=7))
+        late = make_driver(db, '3', 'Night Driver')
+        make_assignment(db, late, nights, ref - timedelta(days=7))
+        away = make_driver(db, '4', 'Away Driver')
+        make_driver_holiday(db, away, ref)
+        make_assignment(db, away, nights, ref - timedelta(days=7))
+        electric = make_driver(db, '5', 'Electric Driver')
+        electric.electric_vehicle = True
+        assigned = make_driver(db, '6', 'Assigned Driver')
+        db.session.commit()
+
+        req = make_extra_request(db, req_date=ref, window_start='08:00', window_end='18:00',
+                                 unlimited=True, required_slots=None)
+        make_extra_assignment(db, req, assigned)
+        return req
+
+    def test_candidates_ranked_by_net_new_hours_and_rest_margin(self, db):
+        with flask_app.app_context():
+            req = self._setup_fleet(db, date(2026, 6, 15))
+            candidates, evaluated = rank_extra_car_candidates(req)
+
+            assert evaluated == 5
+            by_number = {c['driver_number']: c for c in candidates}
+            # The night driver has no legal window between last night's and tonight's shift
+            assert list(by_number) == ['1', '5', '4', '2']
+
+            assert by_number['1']['net_new_hours'] == 10.0
+            assert by_number['1']['rest_margin_hours'] is None
+            # Trimmed to the part after the morning shift
+            assert (by_number['2']['suggested_start'], by_number['2']['suggested_end']) == ('14:00', '18:00')
+            assert by_number['2']['net_new_hours'] == 4.0
+            # On holiday today, but last night's shift ends at 04:00
+            assert (by_number['4']['suggested_start'], by_number['4']['suggested_end']) == ('12:00', '18:00')
+            assert by_number['4']['rest_margin_hours'] == 0.0
+
+    def test_vehicle_preferences_break_ties(self, db):
+        with flask_app.app_context():
+            req = self._setup_fleet(db, date(2026, 6, 15))
+            candidates, _ = rank_extra_car_candidates(req, {'electric_vehicle': True})
+            assert [c['driver_number'] for c in candidates][:2] == ['5', '1']
+            assert candidates[0]['preference_matches'] == 1
+
+    def test_roster_window_matches_per_driver_validation(self, db):
+        with flask_app.app_context():
+            ref = date(2026, 6, 15)
+            req = self._setup_fleet(db, ref)
+            roster = RosterWindow(ref - timedelta(days=1), ref + timedelta(days=1))
+            start, end = datetime(2026, 6, 15, 8, 0), datetime(2026, 6, 15, 18, 0)
+            for driver in Driver.query.all():
+                assert (
+                    validate_extra_car_assignment(driver, req, start, end, roster=roster)
+                    == validate_extra_car_assignment(driver, req, start, end)
+                )
+
+    def test_candidates_endpoint(self, client, db):
+        with flask_app.app_context():
+            req = self._setup_fleet(db, date(2026, 6, 15))
+            req_id = req.id
+
+        resp = client.get(f'/extra-cars/request/{req_id}/candidates?electric_vehicle=1')
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data['success'] is True
+        assert data['evaluated'] == 5
+        assert data['candidates'][0]['name'] == 'E. Driver'
+
+
+# ===========================================================================
+# Auto-fill planner
+# ===========================================================================
+
+class TestAutofill:
+    def _setup_day(self, db):
+        ref = date.today() + timedelta(days=60)
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        mornings = make_pattern(db, 'Mornings', 7, ['morning'] * 7)
+        make_driver(db, '1', 'Alice Free')
+        make_driver(db, '2', 'Bob Free')
+        early = make_driver(db, '3', 'Carol Early')
+        make_assignment(db, early, mornings, ref - timedelta(days=7))
+        morning_req = make_extra_request(db, req_date=ref, window_start='08:00', window_end='12:00', required_slots=1)
+        afternoon_req = make_extra_request(db, req_date=ref, window_start='14:00', window_end='18:00', required_slots=2)
+        return ref, morning_req, afternoon_req
+
+    def test_plan_respects_rest_and_one_driver_per_request(self, db):
+        with flask_app.app_context():
+            ref, morning_req, afternoon_req = self._setup_day(db)
+            plan, unfilled = plan_extra_car_autofill(ref, ref)
+
+            assert [(item['request_id'], item['driver_name']) for item in plan] == [
+                (morning_req.id, 'A. Free'),
+                # Alice would only get 2h rest after the morning request
+                (afternoon_req.id, 'B. Free'),
+                (afternoon_req.id, 'C. Early'),
+            ]
+            assert unfilled == []
+            # Previewing saves nothing
+            assert ExtraCarAssignment.query.count() == 0
+            assert db.session.get(ExtraCarRequest, morning_req.id).status == 'OPEN'
+
+    def test_plan_issues_no_writes(self, db):
+        with flask_app.app_context():
+            ref, morning_req, _ = self._setup_day(db)
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                plan, _ = plan_extra_car_autofill(ref, ref)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            assert len(plan) == 3
+            assert all(statement.lstrip().upper().startswith('SELECT') for statement in statements)
+            assert [a.driver_id for a in db.session.get(ExtraCarRequest, morning_req.id).assignments] == []
+
+    def test_unfilled_capacity_is_reported(self, db):
+        with flask_app.app_context():
+            ref = date.today() + timedelta(days=60)
+            make_driver(db, '1', 'Only Driver')
+            req = make_extra_request(db, req_date=ref, window_start='08:00', window_end='12:00', required_slots=2)
+            plan, unfilled = plan_extra_car_autofill(ref, ref)
+            assert len(plan) == 1
+            assert unfilled[0]['request_id'] == req.id
+            assert unfilled[0]['uncovered'] == ['08:00–12:00']
+
+    def test_apply_saves_plan_atomically(self, db):
+        with flask_app.app_context():
+            ref, morning_req, afternoon_req = self._setup_day(db)
+            plan, _ = plan_extra_car_autofill(ref, ref)
+
+            saved, errors = apply_extra_car_autofill(plan)
+            assert errors == []
+            assert saved == 3
+            assert db.session.get(ExtraCarRequest, morning_req.id).status == 'FILLED'
+            assert db.session.get(ExtraCarRequest, afternoon_req.id).status == 'FILLED'
+
+    def test_stale_plan_is_rejected_without_saving(self, db):
+        with flask_app.app_context():
+            ref, morning_req, afternoon_req = self._setup_day(db)
+            plan, _ = plan_extra_car_autofill(ref, ref)
+            # Someone fills the morning request by hand after the preview
+            make_extra_assignment(db, morning_req, Driver.query.filter_by(driver_number='2').one())
+
+            saved, errors = apply_extra_car_autofill(plan)
+            assert saved == 0
+            assert errors and 'Plan item 1' in errors[0]
+            assert ExtraCarAssignment.query.count() == 1
+
+    def test_autofill_routes(self, client, db):
+        with flask_app.app_context():
+            ref, _, _ = self._setup_day(db)
+            ref_str = ref.strftime('%Y-%m-%d')
+
+        resp = client.get(f'/extra-cars/autofill?start_date={ref_str}&end_date={ref_str}')
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert len(data['plan']) == 3
+
+        resp = client.post('/extra-cars/autofill/commit', json={'plan': data['plan']})
+        assert resp.status_code == 200
+        assert resp.get_json()['saved'] == 3
+
+        resp = client.post('/extra-cars/autofill/commit', json={'plan': data['plan']})
+        assert resp.status_code == 409
+        assert resp.get_json()['success'] is False
+
+        resp = client.get('/extra-cars/autofill?start_date=2026-01-01&end_date=2026-12-31')
+        assert resp.status_code == 400
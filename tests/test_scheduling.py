@@ -2,18 +2,36 @@
 tests/test_scheduling.py
 Tests for the Scheduling section: holidays, one-off adjustments, swap validation.
 """
+import gzip
 import json
 import pytest
+from sqlalchemy import event as _event
 from datetime import date, time, datetime, timedelta
+from types import SimpleNamespace
 
+from flask import g as _flask_g
 from app import app as flask_app, db as _db
 from app import (
     Driver, ShiftPattern, ShiftTiming, DriverAssignment,
     DriverHoliday, ShiftAdjustment, ShiftSwap, DriverCustomTiming,
-    ExtraCarRequest, ExtraCarAssignment,
+    ExtraCarRequest, ExtraCarAssignment, AppSetting,
     validate_swap, get_driver_shifts_for_date, get_cars_working_at_time,
     group_consecutive_holidays,
     get_drivers_for_date,
+    RosterWindow, plan_swap_options, validate_swaps_batch,
+    compute_weekly_shift_counts,
+    find_work_rule_violations, scan_work_time_compliance,
+    forecast_shift_coverage, SchoolTerm, suggest_cycle_offsets,
+    get_roster_version, get_dashboard_summary, get_drivers_for_dates,
+    live_roster_broker, diff_live_roster, get_operational_date,
+    iter_roster_export_rows, get_calendar_feed_token, ics_fold,
+    get_daily_sheet_pdf, SimplePdf, get_bundle_manifest,
+    PatternDayShift, rebuild_pattern_day_shifts, pack_pattern_days, unpack_day_shift_keys, unpack_cycle_codes,
+    pattern_shift_matrix, AssignmentTimeline, get_assignment_timeline, get_active_assignments_for_date,
+    begin_read_snapshot, end_read_snapshot, expand_pattern_roster,
+    Job, enqueue_job, job_handler, JOB_HANDLERS, _run_job_in_context,
+    warm_roster_caches, get_next_operational_crossover, get_cars_working_curve,
+    try_process_lock, fcntl, refresh_extra_car_statuses,
 )
 from tests.conftest import make_driver, make_shift_timing, make_pattern, make_assignment
 
@@ -1364,6 +1382,448 @@ class TestSwapValidation:
             assert errors == []
 
 
+class TestSwapPlanner:
+    """Roster-window resolution, batch validation and the what-if swap planner."""
+
+    def _setup_driver(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        make_shift_timing(db, 'late', '15:00', '23:30')
+        ref = date(2026, 6, 1)  # Monday
+        pattern = make_pattern(db, 'Planner Pattern', 7,
+            ['morning', 'late', 'day_off', 'morning', 'day_off', 'day_off', 'day_off'])
+        driver = make_driver(db, '1', 'Alice Smith')
+        make_assignment(db, driver, pattern, ref, start_day_of_cycle=1)
+        return driver, ref
+
+    def test_roster_window_matches_per_date_resolution(self, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            db.session.add(DriverHoliday(driver_id=driver.id, holiday_date=ref + timedelta(days=7)))
+            db.session.add(ShiftAdjustment(
+                driver_id=driver.id,
+                adjustment_date=ref + timedelta(days=3),
+                adjustment_type='late_start',
+                adjusted_time=time(8, 0),
+            ))
+            db.session.add(ShiftSwap(
+                driver_a_id=driver.id,
+                driver_b_id=driver.id,
+                date_a=ref + timedelta(days=8),
+                date_b=ref + timedelta(days=9),
+                work_shift_type='morning',
+            ))
+            db.session.add(DriverCustomTiming(
+                driver_id=driver.id,
+                shift_type='late',
+                start_time=time(16, 0),
+                priority=1,
+            ))
+            db.session.commit()
+
+            roster = RosterWindow(ref, ref + timedelta(days=13), driver_ids=[driver.id])
+            for offset in range(14):
+                current = ref + timedelta(days=offset)
+                for include_swaps in (True, False):
+                    expected = get_driver_shifts_for_date(driver, current, include_swaps=include_swaps, include_extra=True)
+                    actual = get_driver_shifts_for_date(
+                        driver, current, include_swaps=include_swaps, include_extra=True, roster=roster
+                    )
+                    assert actual == expected, current
+
+    def test_planner_options_agree_with_single_validation(self, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            give_up_date = ref  # Monday morning
+            from_date = ref + timedelta(days=1)
+            to_date = ref + timedelta(days=13)
+
+            options, give_up_errors = plan_swap_options(driver, give_up_date, from_date, to_date)
+            assert give_up_errors == []
+
+            legal = {(opt['work_date'], opt['shift_type']) for opt in options}
+            for offset in range(1, 14):
+                current = ref + timedelta(days=offset)
+                for shift_type in ('morning', 'late'):
+                    errors = validate_swap(driver, give_up_date, current, shift_type)
+                    assert ((current.strftime('%Y-%m-%d'), shift_type) in legal) == (not errors)
+            # Wednesday is off and far enough from Tuesday's late for a morning
+            assert ('2026-06-03', 'morning') not in legal
+            assert ('2026-06-05', 'morning') in legal
+
+    def test_planner_reports_give_up_day_without_shift(self, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            options, give_up_errors = plan_swap_options(
+                driver, ref + timedelta(days=2), ref, ref + timedelta(days=6)
+            )
+            assert options == []
+            assert any('no working shift' in e.lower() for e in give_up_errors)
+
+    def test_batch_validation_matches_individual_results(self, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            proposals = [
+                (ref, ref + timedelta(days=4), 'morning'),
+                (ref, ref + timedelta(days=2), 'morning'),
+                (ref + timedelta(days=2), ref + timedelta(days=4), 'late'),
+            ]
+            batch = validate_swaps_batch(driver, proposals)
+            assert batch == [validate_swap(driver, *proposal) for proposal in proposals]
+
+    def test_plan_endpoint(self, client, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            driver_id = driver.id
+
+        resp = client.post('/scheduling/swap/plan', json={
+            'driver_id': driver_id,
+            'give_up_date': '2026-06-01',
+            'from_date': '2026-06-02',
+            'to_date': '2026-06-14',
+        })
+        assert resp.status_code == 200
+        payload = json.loads(resp.data)
+        assert payload['success'] is True
+        assert {'work_date': '2026-06-05', 'shift_type': 'morning'}.items() <= next(
+            opt for opt in payload['options']
+            if opt['work_date'] == '2026-06-05' and opt['shift_type'] == 'morning'
+        ).items()
+
+    def test_plan_endpoint_rejects_oversized_range(self, client, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            driver_id = driver.id
+
+        resp = client.post('/scheduling/swap/plan', json={
+            'driver_id': driver_id,
+            'give_up_date': '2026-06-01',
+            'from_date': '2026-06-02',
+            'to_date': '2026-12-31',
+        })
+        assert resp.status_code == 400
+
+    def test_validate_batch_endpoint(self, client, db):
+        with flask_app.app_context():
+            driver, ref = self._setup_driver(db)
+            driver_id = driver.id
+
+        resp = client.post('/scheduling/swap/validate-batch', json={
+            'driver_id': driver_id,
+            'proposals': [
+                {'give_up_date': '2026-06-01', 'work_date': '2026-06-05', 'work_shift_type': 'morning'},
+                {'give_up_date': '2026-06-03', 'work_date': '2026-06-05', 'work_shift_type': 'morning'},
+            ],
+        })
+        assert resp.status_code == 200
+        payload = json.loads(resp.data)
+        assert payload['success'] is True
+        assert [r['valid'] for r in payload['results']] == [True, False]
+
+
+class TestWeeklyAssignmentLimit:
+    """Weekly assignment limit derived from the driver's shift pattern."""
+
+    def test_weekly_counts_wrap_around_the_cycle(self):
+        days = [['morning'], ['morning'], ['day_off'], ['day_off']]
+        # Every 7-day window of a 4-day cycle covers one day twice
+        assert compute_weekly_shift_counts(days) == [4, 3, 3, 4]
+        fortnight = [['morning']] * 5 + [['day_off']] * 8 + [['late']]
+        counts = compute_weekly_shift_counts(fortnight)
+        assert counts[0] == 5
+        assert counts[7] == 1
+        assert len(counts) == 14
+
+    def test_limit_respects_start_day_of_cycle(self, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'morning', '06:00', '14:00')
+            ref = date(2026, 6, 1)  # Monday
+            # Week A works Mon-Fri, week B works Sat-Sun only
+            pattern = make_pattern(db, 'Fortnight', 14,
+                ['morning'] * 5 + ['day_off'] * 7 + ['morning'] * 2)
+            aligned = make_driver(db, '1', 'Alice Smith')
+            make_assignment(db, aligned, pattern, ref, start_day_of_cycle=1)
+            shifted = make_driver(db, '2', 'Bob Jones')
+            make_assignment(db, shifted, pattern, ref, start_day_of_cycle=3)
+
+            roster = RosterWindow(ref, ref + timedelta(days=13))
+            assert roster.weekly_assignment_limit(aligned.id, ref)[0] == 5
+            # Mondays land on cycle days 2 and 9, whose weeks hold 3 and 4 working days
+            assert roster.weekly_assignment_limit(shifted.id, ref)[0] == 4
+            assert roster.working_days_in_week(aligned, ref) == 5
+            assert roster.working_days_in_week(aligned, ref + timedelta(days=7)) == 2
+
+    def test_swap_into_other_week_above_limit_is_rejected(self, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'morning', '06:00', '14:00')
+            ref = date(2026, 6, 1)  # Monday
+            pattern = make_pattern(db, 'Three Day', 7,
+                ['morning', 'morning', 'morning', 'day_off', 'day_off', 'day_off', 'day_off'])
+            driver = make_driver(db)
+            make_assignment(db, driver, pattern, ref)
+
+            same_week = validate_swap(driver, ref, ref + timedelta(days=5), 'morning')
+            assert same_week == []
+
+            next_week = validate_swap(driver, ref, ref + timedelta(days=12), 'morning')
+            assert any('weekly assignment limit of 3' in e for e in next_week)
+
+            batch = validate_swaps_batch(driver, [
+                (ref, ref + timedelta(days=5), 'morning'),
+                (ref, ref + timedelta(days=12), 'morning'),
+            ])
+            assert batch == [same_week, next_week]
+
+
+class TestWorkTimeCompliance:
+    """Fleet-wide rest and rolling 24-hour compliance scanner."""
+
+    def test_rule_sweep_flags_rest_and_24h_overruns(self):
+        day = datetime(2026, 6, 1)
+        blocks = [
+            (day.replace(hour=6), day.replace(hour=14)),
+            (day.replace(hour=18), day.replace(hour=23)),  # 4h rest, 13h so far
+            (day + timedelta(days=1, hours=3), day + timedelta(days=1, hours=8)),
+        ]
+        violations = list(find_work_rule_violations(blocks))
+        rules = [v['rule'] for v in violations]
+        assert rules.count('rest') == 2
+        overruns = [v for v in violations if v['rule'] == 'max_24h']
+        # 06:00 window holds 8 + 5 + 3 hours, exactly the limit
+        assert overruns == []
+
+        blocks.append((day + timedelta(days=1, hours=9), day + timedelta(days=1, hours=20)))
+        overruns = [v for v in find_work_rule_violations(blocks) if v['rule'] == 'max_24h']
+        assert len(overruns) == 1
+        assert overruns[0]['start'] == day.replace(hour=18)
+        # 18:00 window holds 5 + 5 + 9 hours
+        assert overruns[0]['hours'] == pytest.approx(19.0)
+
+    def test_scan_reports_short_rest_between_pattern_days(self, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'late', '15:00', '23:00')
+            make_shift_timing(db, 'morning', '06:00', '13:00')
+            ref = date(2026, 6, 1)
+            pattern = make_pattern(db, 'Late Then Early', 7,
+                ['late', 'morning', 'day_off', 'day_off', 'day_off', 'day_off', 'day_off'])
+            driver = make_driver(db, '1', 'Alice Smith')
+            make_assignment(db, driver, pattern, ref)
+            make_driver(db, '2', 'Bob Jones')
+
+            violations = list(scan_work_time_compliance(ref, ref + timedelta(days=6)))
+            assert len(violations) == 1
+            assert violations[0]['driver'].id == driver.id
+            assert violations[0]['rule'] == 'rest'
+            assert violations[0]['date'] == ref + timedelta(days=1)
+            assert violations[0]['hours'] == pytest.approx(7.0)
+
+            # A holiday on the morning removes the shortfall
+            db.session.add(DriverHoliday(driver_id=driver.id, holiday_date=ref + timedelta(days=1)))
+            db.session.commit()
+            assert list(scan_work_time_compliance(ref, ref + timedelta(days=6))) == []
+
+    def test_compliance_page_and_cli(self, client, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'late', '15:00', '23:00')
+            make_shift_timing(db, 'morning', '06:00', '13:00')
+            pattern = make_pattern(db, 'Late Then Early', 7,
+                ['late', 'morning', 'day_off', 'day_off', 'day_off', 'day_off', 'day_off'])
+            driver = make_driver(db, '1', 'Alice Smith')
+            make_assignment(db, driver, pattern, date(2026, 6, 1))
+            driver_name = driver.formatted_name()
+
+        resp = client.get('/compliance?start_date=2026-06-01&end_date=2026-06-07')
+        assert resp.status_code == 200
+        assert driver_name.encode() in resp.data
+        assert b'Short rest' in resp.data
+
+        resp = client.get('/compliance?start_date=2026-06-07&end_date=2026-06-01')
+        assert resp.status_code == 200
+        assert b'End date must be on or after the start date.' in resp.data
+
+        runner = flask_app.test_cli_runner()
+        result = runner.invoke(args=['compliance-report', '--start', '2026-06-01', '--end', '2026-06-07'])
+        assert result.exit_code == 1
+        assert '2026-06-02' in result.output
+        assert 'rest' in result.output
+
+
+class TestCoverageForecast:
+    """Per-day shift headcount forecast (vectorised and roster-engine paths)."""
+
+    def _setup_roster(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        make_shift_timing(db, 'late', '15:00', '23:00')
+        make_shift_timing(db, 'school_am', '07:30', '09:30', parent_shift_type='morning')
+        db.session.query(ShiftTiming).filter_by(shift_type='school_am').update({'school_term_only': True})
+        ref = date(2026, 6, 1)  # Monday
+        db.session.add(SchoolTerm(name='Summer', start_date=ref, end_date=ref + timedelta(days=11)))
+        db.session.commit()
+
+        earlies = make_pattern(db, 'Earlies', 7,
+            ['morning', 'morning', 'morning', 'morning', 'morning', 'day_off', 'day_off'])
+        mixed = make_pattern(db, 'Mixed', 5,
+            ['late', ['school_am', 'late'], 'day_off', 'school_am', 'morning'])
+
+        alice = make_driver(db, '1', 'Alice Smith')
+        bob = make_driver(db, '2', 'Bob Jones')
+        carol = make_driver(db, '3', 'Carol White')
+        make_assignment(db, alice, earlies, ref - timedelta(days=10))
+        make_assignment(db, bob, mixed, ref, end_date=ref + timedelta(days=9), start_day_of_cycle=3)
+        make_assignment(db, carol, mixed, ref + timedelta(days=4))
+
+        db.session.add(DriverHoliday(driver_id=alice.id, holiday_date=ref + timedelta(days=2)))
+        db.session.add(ShiftSwap(
+            driver_a_id=carol.id,
+            driver_b_id=carol.id,
+            date_a=ref + timedelta(days=4),
+            date_b=ref + timedelta(days=6),
+            work_shift_type='morning',
+        ))
+        db.session.add(DriverCustomTiming(
+            driver_id=alice.id,
+            shift_type='morning',
+            day_of_week=3,
+            override_shift='late',
+            priority=1,
+        ))
+        db.session.commit()
+        return ref
+
+    def test_numpy_path_matches_roster_engine(self, db):
+        pytest.importorskip('numpy')
+        with flask_app.app_context():
+            ref = self._setup_roster(db)
+            vectorised = forecast_shift_coverage(ref, 3, use_numpy=True)
+            resolved = forecast_shift_coverage(ref, 3, use_numpy=False)
+            assert vectorised == resolved
+            assert vectorised['buckets'] == ['morning', 'late']
+            # Thursday: Alice's morning is overridden to a late
+            assert vectorised['counts']['late'][3] >= 1
+
+    def test_sql_expansion_matches_roster_engine(self, db):
+        with flask_app.app_context():
+            ref = self._setup_roster(db)
+            expanded = forecast_shift_coverage(ref, 3, use_sql=True)
+            resolved = forecast_shift_coverage(ref, 3, use_sql=False, use_numpy=False)
+            assert expanded == resolved
+
+    def test_sql_expansion_follows_cycle_offset(self, db):
+        with flask_app.app_context():
+            pattern = make_pattern(db, 'Offset', 3, ['morning', 'late', 'day_off'])
+            driver = make_driver(db, '1', 'Alice Smith')
+            make_assignment(db, driver, pattern, date(2026, 6, 2), date(2026, 6, 6), start_day_of_cycle=2)
+            rows = expand_pattern_roster(date(2026, 6, 1), date(2026, 6, 10))
+            assert sorted(rows) == [
+                (date(2026, 6, 2), driver.id, 'late'),
+                (date(2026, 6, 4), driver.id, 'morning'),
+                (date(2026, 6, 5), driver.id, 'late'),
+            ]
+
+    def test_counts_match_daily_sheet(self, db):
+        with flask_app.app_context():
+            ref = self._setup_roster(db)
+            forecast = forecast_shift_coverage(ref, 2)
+            for index, day in enumerate(forecast['dates']):
+                sheet = get_drivers_for_date(day)
+                for bucket in forecast['buckets']:
+                    expected = len({info['driver'].id for info in sheet.get(bucket, [])})
+                    assert forecast['counts'][bucket][index] == expected, (day, bucket)
+
+    def test_forecast_page_and_json(self, client, db):
+        with flask_app.app_context():
+            self._setup_roster(db)
+
+        resp = client.get('/forecast?start_date=2026-06-01&weeks=2')
+        assert resp.status_code == 200
+        assert b'Coverage Forecast' in resp.data
+        assert b'Mon 01/06/2026' in resp.data
+
+        resp = client.get(
+            '/forecast?start_date=2026-06-01&weeks=1',
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        )
+        payload = json.loads(resp.data)
+        assert payload['success'] is True
+        assert len(payload['dates']) == 7
+        assert len(payload['counts']['morning']) == 7
+
+        resp = client.get(
+            '/forecast?start_date=2026-06-01&weeks=500',
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        )
+        assert resp.status_code == 400
+
+
+class TestCycleOffsetSuggester:
+    """Ranking start_day_of_cycle offsets by projected coverage."""
+
+    def _setup_fleet(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        ref = date(2026, 6, 1)  # Monday
+        pattern = make_pattern(db, 'Week On Week Off', 14, ['morning'] * 7 + ['day_off'] * 7)
+        for number in ('1', '2'):
+            make_assignment(db, make_driver(db, number, f'Driver {number}'), pattern, ref)
+        newcomer = make_driver(db, '3', 'New Starter')
+        return ref, pattern, newcomer
+
+    def test_new_assignment_fills_the_uncovered_week(self, db):
+        pytest.importorskip('numpy')
+        with flask_app.app_context():
+            ref, pattern, newcomer = self._setup_fleet(db)
+            result = suggest_cycle_offsets(newcomer, pattern, ref, weeks=4)
+            ranked = result['offsets']
+            assert len(ranked) == 14
+            assert ranked[0]['start_day_of_cycle'] == 8
+            assert ranked[0]['improvement'] > 0
+            assert ranked[-1]['start_day_of_cycle'] == 1
+            assert ranked[0]['coverage_delta']['morning'] == [0.5] * 7
+
+    def test_existing_assignment_is_scored_without_itself(self, db):
+        pytest.importorskip('numpy')
+        with flask_app.app_context():
+            ref, pattern, newcomer = self._setup_fleet(db)
+            assignment = make_assignment(db, newcomer, pattern, ref, start_day_of_cycle=8)
+            result = suggest_cycle_offsets(newcomer, pattern, ref, assignment=assignment, weeks=4)
+            assert result['current_start_day_of_cycle'] == 8
+            assert result['offsets'][0]['start_day_of_cycle'] == 8
+            assert result['offsets'][0]['improvement'] == 0
+
+    def test_explicit_weekday_targets(self, db):
+        pytest.importorskip('numpy')
+        with flask_app.app_context():
+            ref, _, newcomer = self._setup_fleet(db)
+            one_day = make_pattern(db, 'One Day', 7, ['morning'] + ['day_off'] * 6)
+            # Wednesdays want an extra driver: cycle day 1 must land on 3 June
+            result = suggest_cycle_offsets(
+                newcomer, one_day, ref, weeks=4, targets={'morning': [1, 1, 2, 1, 1, 1, 1]}
+            )
+            assert result['offsets'][0]['start_day_of_cycle'] == 6
+            assert result['offsets'][0]['coverage_delta']['morning'][2] == 1.0
+
+    def test_suggest_offset_endpoint(self, client, db):
+        pytest.importorskip('numpy')
+        with flask_app.app_context():
+            ref, pattern, newcomer = self._setup_fleet(db)
+            driver_id, pattern_id = newcomer.id, pattern.id
+
+        url = f'/driver/{driver_id}/assign-pattern/suggest-offset'
+        resp = client.post(url, json={'pattern_id': pattern_id, 'start_date': '2026-06-01', 'weeks': 4})
+        assert resp.status_code == 200
+        payload = json.loads(resp.data)
+        assert payload['success'] is True
+        assert payload['offsets'][0]['start_day_of_cycle'] == 8
+
+        resp = client.post(url, json={'pattern_id': pattern_id, 'start_date': '2026-06-01', 'targets': {'nights': 2}})
+        assert resp.status_code == 400
+        resp = client.post(url, json={'start_date': '2026-06-01'})
+        assert resp.status_code == 400
+        resp = client.post(url, json={'pattern_id': pattern_id, 'start_date': '2026-06-01', 'targets': [2, 2]})
+        assert resp.status_code == 400
+        resp = client.post(url, json=[pattern_id])
+        assert resp.status_code == 400
+        assert 'error' in resp.get_json()
+
+
 class TestSwapRoutes:
 
     @staticmethod
@@ -1525,3 +1985,1027 @@ class TestSwapRoutes:
         resp = client.get('/scheduling')
         assert resp.status_code == 200
         assert b'01/06/2026' in resp.data
+
+
+class TestDailySheetCache:
+    def _setup_roster(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        pattern = make_pattern(db, 'Cache Pattern', 7, ['morning'] * 7)
+        driver = make_driver(db, '1', 'Alice Smith')
+        make_assignment(db, driver, pattern, date(2026, 6, 1))
+        return driver
+
+    def test_commit_bumps_roster_version(self, db):
+        with flask_app.app_context():
+            before, _ = get_roster_version()
+            driver = self._setup_roster(db)
+            after_setup, _ = get_roster_version()
+            assert after_setup > before
+
+            DriverHoliday.query.filter_by(driver_id=driver.id).delete()
+            db.session.add(DriverHoliday(driver_id=driver.id, holiday_date=date(2026, 6, 3)))
+            db.session.commit()
+            assert get_roster_version()[0] == after_setup + 1
+
+    def test_bulk_delete_bumps_roster_version(self, db):
+        with flask_app.app_context():
+            driver = self._setup_roster(db)
+            db.session.add(DriverHoliday(driver_id=driver.id, holiday_date=date(2026, 6, 3)))
+            db.session.commit()
+            version, _ = get_roster_version()
+
+            DriverHoliday.query.filter_by(driver_id=driver.id).delete(synchronize_session=False)
+            db.session.commit()
+            assert get_roster_version()[0] == version + 1
+
+    def test_print_sheet_answers_304_for_matching_etag(self, client, db):
+        with flask_app.app_context():
+            self._setup_roster(db)
+
+        first = client.get('/daily-sheet/print?date=2026-06-03')
+        assert first.status_code == 200
+        assert first.headers.get('ETag')
+        assert first.headers.get('Last-Modified')
+        assert b'A. Smith' in first.data
+
+        again = client.get('/daily-sheet/print?date=2026-06-03',
+                           headers={'If-None-Match': first.headers['ETag']})
+        assert again.status_code == 304
+
+    def test_roster_change_invalidates_cached_sheet(self, client, db):
+        with flask_app.app_context():
+            driver = self._setup_roster(db)
+            driver_id = driver.id
+
+        first = client.get('/daily-sheet/generate?target_date=2026-06-03')
+        assert first.status_code == 200
+        assert b'A. Smith' in first.data
+
+        with flask_app.app_context():
+            db.session.add(DriverHoliday(driver_id=driver_id, holiday_date=date(2026, 6, 3)))
+            db.session.commit()
+
+        second = client.get('/daily-sheet/generate?target_date=2026-06-03',
+                            headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 200
+        assert second.headers['ETag'] != first.headers['ETag']
+        assert b'A. Smith' not in second.data
+
+    def test_generate_post_still_renders(self, client, db):
+        with flask_app.app_context():
+            self._setup_roster(db)
+
+        resp = client.post('/daily-sheet/generate', data={'target_date': '2026-06-03'})
+        assert resp.status_code == 200
+        assert b'A. Smith' in resp.data
+
+    def test_modal_query_is_not_served_from_plain_page(self, client, db):
+        with flask_app.app_context():
+            self._setup_roster(db)
+
+        plain = client.get('/daily-sheet/generate?target_date=2026-06-03')
+        modal = client.get('/daily-sheet/generate?target_date=2026-06-03&modal=1')
+        assert b'modal-mode-shell' not in plain.data
+        assert b'modal-mode-shell' in modal.data
+        assert modal.headers['ETag'] != plain.headers['ETag']
+
+
+class TestDashboardSummary:
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        pattern = make_pattern(db, 'Dashboard Pattern', 7, ['morning'] * 7)
+        alice = make_driver(db, '1', 'Alice Smith')
+        bob = make_driver(db, '2', 'Bob Jones')
+        make_assignment(db, alice, pattern, date(2026, 6, 1))
+        make_assignment(db, bob, pattern, date(2026, 6, 1))
+        db.session.add(DriverHoliday(driver_id=bob.id, holiday_date=date(2026, 6, 4)))
+        db.session.commit()
+        return alice, bob
+
+    def test_batched_dates_match_single_date_resolution(self, db):
+        with flask_app.app_context():
+            self._setup(db)
+            days = [date(2026, 6, 3), date(2026, 6, 4)]
+            batched = get_drivers_for_dates(days)
+            for day in days:
+                single = get_drivers_for_date(day)
+                assert {
+                    k: [info['driver'].id for info in v] for k, v in batched[day].items()
+                } == {k: [info['driver'].id for info in v] for k, v in single.items()}
+
+    def test_summary_counts_both_days(self, db):
+        with flask_app.app_context():
+            self._setup(db)
+            summary = get_dashboard_summary(date(2026, 6, 3))
+            assert summary['today_total'] == 2
+            assert summary['tomorrow_total'] == 1
+            assert summary['today_shift_counts']['morning'] == 2
+
+    def test_summary_is_reused_until_roster_changes(self, db):
+        with flask_app.app_context():
+            alice, _ = self._setup(db)
+            first = get_dashboard_summary(date(2026, 6, 3))
+            assert get_dashboard_summary(date(2026, 6, 3)) is first
+
+            db.session.add(DriverHoliday(driver_id=alice.id, holiday_date=date(2026, 6, 3)))
+            db.session.commit()
+            refreshed = get_dashboard_summary(date(2026, 6, 3))
+            assert refreshed is not first
+            assert refreshed['today_total'] == 1
+
+    def test_dashboard_page_renders(self, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+        resp = client.get('/')
+        assert resp.status_code == 200
+
+
+class TestLiveRoster:
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        pattern = make_pattern(db, 'Live Pattern', 7, ['morning'] * 7)
+        driver = make_driver(db, '1', 'Alice Smith')
+        make_assignment(db, driver, pattern, get_operational_date() - timedelta(days=14))
+        return driver
+
+    def test_diff_reports_added_removed_and_changed(self):
+        old = {'dates': ['2026-06-03'], 'entries': {
+            'a': {'key': 'a', 'start_time': '06:00'},
+            'b': {'key': 'b', 'start_time': '06:00'},
+        }}
+        new = {'dates': ['2026-06-03'], 'entries': {
+            'b': {'key': 'b', 'start_time': '07:00'},
+            'c': {'key': 'c', 'start_time': '06:00'},
+        }}
+        diff = diff_live_roster(old, new)
+        assert [e['key'] for e in diff['added']] == ['c']
+        assert [e['key'] for e in diff['removed']] == ['a']
+        assert [e['key'] for e in diff['changed']] == ['b']
+
+    def test_commit_affecting_today_publishes_diff(self, db):
+        with flask_app.app_context():
+            driver = self._setup(db)
+            today = get_operational_date()
+            subscriber, snapshot = live_roster_broker.subscribe(start_worker=False)
+            try:
+                key = f"{today.isoformat()}:{driver.id}:morning"
+                assert key in snapshot['entries']
+
+                live_roster_broker._wake.clear()
+                db.session.add(DriverHoliday(driver_id=driver.id, holiday_date=today))
+                db.session.commit()
+                assert live_roster_broker._wake.is_set()
+
+                live_roster_broker.refresh(force=True)
+                diff = subscriber.get_nowait()
+                assert [e['key'] for e in diff['removed']] == [key]
+                assert diff['removed'][0]['driver_number'] == '1'
+                assert diff['added'] == []
+            finally:
+                live_roster_broker.unsubscribe(subscriber)
+
+    def test_commit_outside_live_dates_does_not_wake_publisher(self, db):
+        with flask_app.app_context():
+            driver = self._setup(db)
+            live_roster_broker._wake.clear()
+            db.session.add(DriverHoliday(
+                driver_id=driver.id, holiday_date=get_operational_date() + timedelta(days=30),
+            ))
+            db.session.commit()
+            assert not live_roster_broker._wake.is_set()
+
+    def test_stream_starts_with_snapshot_event(self, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+        resp = client.get('/live/roster', buffered=False)
+        try:
+            assert resp.status_code == 200
+            assert resp.mimetype == 'text/event-stream'
+            first = next(resp.response)
+            if isinstance(first, bytes):
+                first = first.decode()
+            assert first.startswith('event: snapshot')
+            payload = json.loads(first.split('data: ', 1)[1])
+            assert any(entry['driver_name'] == 'A. Smith' for entry in payload['entries'])
+        finally:
+            resp.close()
+
+    def test_streams_past_the_per_process_limit_are_refused(self, app, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+        app.config['LIVE_ROSTER_MAX_STREAMS'] = 1
+        subscriber, _ = live_roster_broker.subscribe(start_worker=False)
+        try:
+            resp = client.get('/live/roster')
+            assert resp.status_code == 503
+            assert resp.headers['Retry-After']
+        finally:
+            live_roster_broker.unsubscribe(subscriber)
+            app.config['LIVE_ROSTER_MAX_STREAMS'] = 0
+
+
+class TestRosterExport:
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        make_shift_timing(db, 'night', '22:00', '06:00')
+        pattern = make_pattern(db, 'Export Pattern', 7,
+            ['morning', 'morning', 'night', 'day_off', 'day_off', 'day_off', 'day_off'])
+        alice = make_driver(db, '1', 'Alice Smith')
+        bob = make_driver(db, '2', 'Bob Jones')
+        # 2026-06-01 is a Monday
+        make_assignment(db, alice, pattern, date(2026, 6, 1))
+        make_assignment(db, bob, pattern, date(2026, 6, 1), start_day_of_cycle=3)
+        db.session.add(DriverHoliday(driver_id=alice.id, holiday_date=date(2026, 6, 2)))
+        db.session.commit()
+        return alice, bob
+
+    def test_rows_are_grouped_by_driver_and_skip_days_off(self, db):
+        with flask_app.app_context():
+            self._setup(db)
+            rows = list(iter_roster_export_rows(date(2026, 6, 1), date(2026, 6, 3), batch_size=1))
+            assert [(r[0], r[1], r[4]) for r in rows] == [
+                ('2026-06-01', '1', 'morning'),
+                ('2026-06-03', '1', 'night'),
+                ('2026-06-01', '2', 'night'),
+            ]
+            assert rows[1][8] == 8.0
+
+    def test_csv_export_streams_rows(self, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+        resp = client.get('/export/roster.csv?from=2026-06-01&to=2026-06-03')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/csv'
+        assert 'roster_2026-06-01_2026-06-03.csv' in resp.headers['Content-Disposition']
+        lines = resp.get_data(as_text=True).strip().splitlines()
+        assert lines[0].startswith('Date,Driver Number,Driver')
+        assert len(lines) == 4
+        assert lines[1].startswith('2026-06-01,1,Alice Smith')
+
+    def test_xlsx_export_is_a_valid_workbook_archive(self, client, db):
+        import io
+        import zipfile
+        with flask_app.app_context():
+            self._setup(db)
+        resp = client.get('/export/roster.xlsx?from=2026-06-01&to=2026-06-03')
+        assert resp.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(resp.data))
+        assert archive.testzip() is None
+        assert {'[Content_Types].xml', 'xl/workbook.xml', 'xl/worksheets/sheet1.xml'} <= set(archive.namelist())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        assert sheet.count('<row>') == 4
+        assert 'Bob Jones' in sheet
+
+    def test_export_rejects_oversized_range(self, client, db):
+        resp = client.get('/export/roster.csv?from=2026-01-01&to=2027-06-01')
+        assert resp.status_code == 302
+
+
+class TestCalendarFeeds:
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        pattern = make_pattern(db, 'Feed Pattern', 7, ['morning'] * 7)
+        alice = make_driver(db, '1', 'Alice Smith')
+        bob = make_driver(db, '2', 'Bob Jones')
+        start = get_operational_date() - timedelta(days=30)
+        make_assignment(db, alice, pattern, start)
+        make_assignment(db, bob, pattern, start)
+        return alice.id, bob.id, pattern.id
+
+    def test_driver_feed_lists_shifts_and_time_off(self, client, db):
+        today = get_operational_date()
+        with flask_app.app_context():
+            alice_id, _, _ = self._setup(db)
+            db.session.add(DriverHoliday(driver_id=alice_id, holiday_date=today + timedelta(days=2),
+                                         time_off_type='sickness'))
+            db.session.commit()
+
+        resp = client.get(f'/driver/{alice_id}/shifts.ics')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/calendar'
+        body = resp.get_data(as_text=True)
+        assert body.startswith('BEGIN:VCALENDAR\r\n')
+        assert f"DTSTART:{today:%Y%m%d}T060000" in body
+        assert f"DTSTART;VALUE=DATE:{today + timedelta(days=2):%Y%m%d}" in body
+        assert 'SUMMARY:Sickness' in body
+
+    def test_matching_etag_gets_304(self, client, db):
+        with flask_app.app_context():
+            alice_id, _, _ = self._setup(db)
+        first = client.get(f'/driver/{alice_id}/shifts.ics')
+        again = client.get(f'/driver/{alice_id}/shifts.ics', headers={'If-None-Match': first.headers['ETag']})
+        assert again.status_code == 304
+
+    def test_feed_changes_only_with_own_or_shared_inputs(self, client, db):
+        today = get_operational_date()
+        with flask_app.app_context():
+            alice_id, bob_id, pattern_id = self._setup(db)
+        etag = client.get(f'/driver/{alice_id}/shifts.ics').headers['ETag']
+
+        with flask_app.app_context():
+            db.session.add(DriverHoliday(driver_id=bob_id, holiday_date=today))
+            db.session.commit()
+        assert client.get(f'/driver/{alice_id}/shifts.ics').headers['ETag'] == etag
+
+        with flask_app.app_context():
+            db.session.add(DriverHoliday(driver_id=alice_id, holiday_date=today))
+            db.session.commit()
+        own_change = client.get(f'/driver/{alice_id}/shifts.ics').headers['ETag']
+        assert own_change != etag
+
+        with flask_app.app_context():
+            pattern = db.session.get(ShiftPattern, pattern_id)
+            pattern.name = 'Renamed Pattern'
+            db.session.commit()
+        assert client.get(f'/driver/{alice_id}/shifts.ics').headers['ETag'] != own_change
+
+    def test_fleet_feed_requires_token(self, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+            assert get_calendar_feed_token() is None
+        assert client.get('/calendar/wrong-token/fleet.ics').status_code == 404
+        assert b'Fleet Calendar Feed' not in client.get('/drivers').data
+
+        with flask_app.app_context():
+            db.session.add(AppSetting(key='calendar_feed_token', value='feed-token'))
+            db.session.commit()
+            token = get_calendar_feed_token()
+        assert client.get('/calendar/wrong-token/fleet.ics').status_code == 404
+        assert token.encode() in client.get('/drivers').data
+        resp = client.get(f'/calendar/{token}/fleet.ics')
+        assert resp.status_code == 200
+        body = resp.get_data(as_text=True)
+        assert 'SUMMARY:A. Smith: Morning' in body
+        assert 'SUMMARY:B. Jones: Morning' in body
+
+    def test_long_lines_are_folded(self):
+        folded = ics_fold('SUMMARY:' + 'é' * 80)
+        for part in folded.split('\r\n'):
+            assert len(part.encode('utf-8')) <= 75
+
+
+class TestDailySheetPdf:
+    @pytest.fixture(autouse=True)
+    def pdf_cache_dir(self, app, tmp_path):
+        previous = app.config.get('PDF_CACHE_DIR')
+        app.config['PDF_CACHE_DIR'] = str(tmp_path)
+        yield tmp_path
+        app.config['PDF_CACHE_DIR'] = previous
+
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        pattern = make_pattern(db, 'Pdf Pattern', 7, ['morning'] * 7)
+        driver = make_driver(db, '1', 'Alice Smith')
+        make_assignment(db, driver, pattern, date(2026, 6, 1))
+        return driver
+
+    def test_pdf_route_returns_a_pdf(self, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+        resp = client.get('/daily-sheet/print.pdf?date=2026-06-03')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'application/pdf'
+        assert resp.data.startswith(b'%PDF-1.4')
+        assert resp.data.rstrip().endswith(b'%%EOF')
+
+    def test_week_batch_has_a_page_per_day(self, db):
+        with flask_app.app_context():
+            self._setup(db)
+            path = get_daily_sheet_pdf(date(2026, 6, 1), 7)
+            with open(path, 'rb') as pdf_file:
+                data = pdf_file.read()
+            assert data.count(b'/Type /Page ') == 7
+            assert b'/Count 7' in data
+
+    def test_cached_file_reused_until_roster_changes(self, db, pdf_cache_dir):
+        with flask_app.app_context():
+            driver = self._setup(db)
+            first = get_daily_sheet_pdf(date(2026, 6, 3))
+            assert get_daily_sheet_pdf(date(2026, 6, 3)) == first
+
+            db.session.add(DriverHoliday(driver_id=driver.id, holiday_date=date(2026, 6, 3)))
+            db.session.commit()
+            second = get_daily_sheet_pdf(date(2026, 6, 3))
+            assert second != first
+            assert len(list(pdf_cache_dir.iterdir())) == 2
+
+    def test_rejects_oversized_batch(self, client, db):
+        resp = client.get('/daily-sheet/print.pdf?date=2026-06-03&days=60')
+        assert resp.status_code == 302
+
+    def test_long_text_is_truncated_to_fit(self):
+        pdf = SimplePdf()
+        fitted = pdf.fit_text('Bartholomew Featherstonehaugh-Smythe', 9, 60)
+        assert fitted.endswith('...')
+        assert pdf.text_width(fitted, 9) <= 60
+
+
+class TestStaticAssets:
+    def _hashed(self, name):
+        with flask_app.app_context():
+            return get_bundle_manifest()['bundles'][name]
+
+    def test_templates_reference_hashed_assets(self, client, db):
+        resp = client.get('/daily-sheet')
+        html = resp.get_data(as_text=True)
+        assert f"/static/{self._hashed('style.css')}" in html
+        assert f"/static/{self._hashed('base.bundle.js')}" in html
+        assert f"/static/{self._hashed('daily-sheet-form.bundle.js')}" in html
+
+    def test_gzip_variant_served_when_accepted(self, client):
+        path = self._hashed('base.bundle.js')
+        plain = client.get(f'/static/{path}', headers={'Accept-Encoding': 'identity'})
+        resp = client.get(f'/static/{path}', headers={'Accept-Encoding': 'gzip'})
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert resp.mimetype == 'text/javascript'
+        assert gzip.decompress(resp.data) == plain.data
+        assert 'Content-Encoding' not in plain.headers
+        assert 'Accept-Encoding' in resp.headers['Vary']
+
+    def test_hashed_names_are_immutable(self, client):
+        resp = client.get(f"/static/{self._hashed('style.css')}")
+        assert resp.cache_control.immutable
+        assert resp.cache_control.max_age == 365 * 24 * 3600
+
+    def test_unhashed_files_keep_default_caching(self, client):
+        resp = client.get('/static/js/shared.core.js', headers={'Accept-Encoding': 'gzip'})
+        assert resp.status_code == 200
+        assert 'Content-Encoding' not in resp.headers
+        assert not resp.cache_control.immutable
+
+
+class TestPatternDayShiftIndex:
+    def _rows(self, db):
+        return sorted(db.session.query(PatternDayShift.cycle_day, PatternDayShift.shift_type).all())
+
+    def test_index_follows_pattern_data(self, db):
+        with flask_app.app_context():
+            pattern = make_pattern(db, 'Index Pattern', 3, ['morning', ['morning', 'late'], 'day_off'])
+            assert self._rows(db) == [(0, 'morning'), (1, 'late'), (1, 'morning'), (2, 'day_off')]
+            pattern.set_pattern_data(['late', 'day_off', 'late'])
+            db.session.commit()
+            assert self._rows(db) == [(0, 'late'), (1, 'day_off'), (2, 'late')]
+            db.session.delete(pattern)
+            db.session.commit()
+            assert self._rows(db) == []
+
+    def test_usage_lookups_use_index(self, db):
+        with flask_app.app_context():
+            late = make_shift_timing(db, 'late', '14:00', '22:00')
+            make_pattern(db, 'Mornings', 7, ['morning'] * 7)
+            pattern = make_pattern(db, 'Lates', 7, ['late'] * 5 + ['day_off'] * 2)
+            driver = make_driver(db, '7', 'Late Driver')
+            make_assignment(db, driver, pattern, date(2026, 6, 1))
+            assert [p.name for p in late.get_patterns_using_shift()] == ['Lates']
+            assert [d.id for d in late.get_drivers_using_shift()] == [driver.id]
+
+    def test_rebuild_backfills_from_json(self, db):
+        with flask_app.app_context():
+            make_pattern(db, 'Backfill', 2, ['morning', 'late'])
+            db.session.execute(PatternDayShift.__table__.delete())
+            db.session.commit()
+            assert rebuild_pattern_day_shifts() == 2
+            db.session.commit()
+            assert self._rows(db) == [(0, 'morning'), (1, 'late')]
+
+    def test_rename_rewrites_patterns_and_index(self, client, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'late', '14:00', '22:00')
+            pattern = make_pattern(db, 'Rename', 2, ['late', 'day_off'])
+            pattern_id = pattern.id
+        resp = client.post('/shift-types/update', data={
+            'late_name': 'Evening', 'late_start': '14:00', 'late_end': '22:00',
+        })
+        assert resp.get_json()['success']
+        with flask_app.app_context():
+            assert db.session.get(ShiftPattern, pattern_id).get_pattern_data() == ['evening', 'day_off']
+            assert self._rows(db) == [(0, 'evening'), (1, 'day_off')]
+
+    def test_delete_blocked_while_pattern_uses_shift(self, client, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'late', '14:00', '22:00')
+            make_pattern(db, 'Blocking', 1, ['late'])
+        resp = client.post('/shift-types/delete/late')
+        assert not resp.get_json()['success']
+        assert 'Blocking' in resp.get_json()['error']
+
+
+class TestPackedPatternStorage:
+    def test_pack_round_trip_shares_repeated_days(self):
+        keys_text, blob = pack_pattern_days([['early'], ['early', 'late'], ['day_off'], ['early']])
+        assert unpack_day_shift_keys(keys_text) == (('early',), ('early', 'late'), ('day_off',))
+        assert list(unpack_cycle_codes(blob)) == [0, 1, 2, 0]
+        assert len(blob) == 8
+
+    def test_json_writes_keep_packed_columns_in_step(self, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'morning', '06:00', '14:00')
+            make_shift_timing(db, 'late', '14:00', '22:00')
+            pattern = make_pattern(db, 'Packed', 3, ['morning', ['late', 'morning'], None])
+            assert pattern.get_shifts_for_day(1) == ['morning', 'late']
+            assert pattern.get_shifts_for_day(2) == ['day_off']
+            assert pattern.get_shifts_for_day(3) == []
+            assert pattern.get_pattern_data() == ['morning', ['morning', 'late'], 'day_off']
+            pattern.set_pattern_data(['late', 'late', 'day_off'])
+            assert pattern.get_shift_for_day(0) == 'late'
+            db.session.commit()
+            db.session.expire_all()
+            reloaded = db.session.get(ShiftPattern, pattern.id)
+            assert reloaded.get_day_shifts() == [['late'], ['late'], ['day_off']]
+
+    def test_shift_matrix_reads_packed_codes(self, db):
+        pytest.importorskip('numpy')
+        with flask_app.app_context():
+            pattern = make_pattern(db, 'Matrix', 4, ['morning', 'late', 'day_off'])
+            matrix = pattern_shift_matrix(pattern, {'morning': 0, 'late': 1})
+            assert matrix.tolist() == [[True, False], [False, True], [False, False], [False, False]]
+
+
+class TestAssignmentTimeline:
+    def _span(self, span_id, start, end, driver_id=1):
+        return SimpleNamespace(id=span_id, driver_id=driver_id, start_date=start, end_date=end)
+
+    def test_bisect_lookup_over_pause_resume_chain(self):
+        spans = [
+            self._span(1, date(2026, 1, 1), date(2026, 12, 31)),
+            self._span(2, date(2026, 3, 1), date(2026, 3, 14)),
+            self._span(3, date(2026, 6, 1), None),
+            self._span(4, date(2026, 2, 1), date(2026, 2, 7), driver_id=2),
+        ]
+        timeline = AssignmentTimeline(spans)
+        assert [s.id for s in timeline.active_on(1, date(2026, 3, 5))] == [1, 2]
+        assert [s.id for s in timeline.active_on(1, date(2027, 1, 1))] == [3]
+        assert timeline.active_on(1, date(2025, 12, 31)) == []
+        assert timeline.active_on(3, date(2026, 3, 5)) == []
+        assert [s.id for s in timeline.active_between(1, date(2026, 3, 15), date(2026, 6, 1))] == [1, 3]
+        bulk = timeline.all_active_between(date(2026, 2, 5), date(2026, 2, 6))
+        assert {driver_id: [s.id for s in items] for driver_id, items in bulk.items()} == {1: [1], 2: [4]}
+
+    def test_fleet_timeline_tracks_committed_writes(self, db):
+        with flask_app.app_context():
+            pattern = make_pattern(db, 'Timeline', 7, ['morning'] * 7)
+            driver = make_driver(db, '1', 'Alice Smith')
+            first = make_assignment(db, driver, pattern, date(2026, 6, 1), date(2026, 6, 30))
+            assert driver.get_current_assignment(date(2026, 6, 10)).id == first.id
+            assert driver.get_current_assignment(date(2026, 7, 10)) is None
+            timeline = get_assignment_timeline()
+            assert get_assignment_timeline() is timeline
+
+            second = make_assignment(db, driver, pattern, date(2026, 7, 1))
+            assert get_assignment_timeline() is not timeline
+            assert driver.get_current_assignment(date(2026, 7, 10)).id == second.id
+            assert [a.id for a in get_active_assignments_for_date(date(2026, 6, 15))] == [first.id]
+
+    def test_uncommitted_assignment_writes_are_visible(self, db):
+        with flask_app.app_context():
+            pattern = make_pattern(db, 'Pending', 7, ['morning'] * 7)
+            driver = make_driver(db, '1', 'Alice Smith')
+            get_assignment_timeline()
+            db.session.add(DriverAssignment(
+                driver_id=driver.id, shift_pattern_id=pattern.id, start_date=date(2026, 6, 1), start_day_of_cycle=1,
+            ))
+            db.session.flush()
+            assert driver.get_current_assignment(date(2026, 6, 2)) is not None
+            db.session.rollback()
+
+    def test_lookups_check_version_once_per_transaction(self, db):
+        with flask_app.app_context():
+            pattern = make_pattern(db, 'Per Transaction', 7, ['morning'] * 7)
+            drivers = [make_driver(db, str(n), f'Driver {n}') for n in range(1, 6)]
+            for driver in drivers:
+                make_assignment(db, driver, pattern, date(2026, 6, 1))
+            driver_ids = [driver.id for driver in drivers]
+            db.session.expunge_all()
+            db.session.commit()
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            _event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                drivers = Driver.query.filter(Driver.id.in_(driver_ids)).all()
+                before = len(statements)
+                first = [driver.get_current_assignment(date(2026, 6, 10)) for driver in drivers]
+                again = [driver.get_current_assignment(date(2026, 6, 10)) for driver in drivers]
+            finally:
+                _event.remove(db.engine, 'before_cursor_execute', listener)
+            assert all(first) and again == first
+            # one version check, at most one timeline build, then one load per driver;
+            # repeat lookups are answered from the identity map
+            assert len(statements) - before <= len(drivers) + 2
+
+
+class TestReadSnapshot:
+    def test_reads_ignore_commits_made_during_the_request(self, db):
+        if db.engine.url.database in (None, '', ':memory:'):
+            pytest.skip('snapshot isolation needs a file database')
+        with flask_app.app_context():
+            make_driver(db, '1', 'Alice Smith')
+        with flask_app.test_request_context('/drivers'):
+            begin_read_snapshot()
+            try:
+                assert Driver.query.count() == 1
+                with db.engine.begin() as other:
+                    other.execute(
+                        Driver.__table__.insert(),
+                        {'driver_number': '2', 'name': 'Bob Jones', 'car_type': 'Standard'},
+                    )
+                assert Driver.query.count() == 1
+            finally:
+                end_read_snapshot()
+            assert Driver.query.count() == 2
+
+    def test_snapshot_only_wraps_get_requests(self, client, db):
+        seen = []
+        flask_app.after_request_funcs.setdefault(None, []).append(
+            lambda response: seen.append(bool(_flask_g.get('read_snapshot'))) or response
+        )
+        try:
+            client.get('/drivers')
+            client.post('/shift-types/update', data={})
+        finally:
+            flask_app.after_request_funcs[None].pop()
+        assert seen == [True, False]
+
+
+class TestBackgroundJobs:
+    @pytest.fixture(autouse=True)
+    def job_results_dir(self, app, tmp_path):
+        previous = app.config.get('JOB_RESULTS_DIR')
+        app.config['JOB_RESULTS_DIR'] = str(tmp_path)
+        yield tmp_path
+        app.config['JOB_RESULTS_DIR'] = previous
+
+    @pytest.fixture
+    def flaky_handler(self):
+        calls = []
+
+        @job_handler('test_flaky')
+        def run(fail):
+            calls.append(fail)
+            if fail:
+                raise RuntimeError('boom')
+            return {'calls': len(calls)}
+
+        yield calls
+        JOB_HANDLERS.pop('test_flaky', None)
+
+    def test_keyed_job_runs_once(self, db, flaky_handler):
+        with flask_app.app_context():
+            first = enqueue_job('test_flaky', {'fail': False}, key='flaky:1')
+            second = enqueue_job('test_flaky', {'fail': False}, key='flaky:1')
+            assert first.id == second.id
+            assert first.status == 'SUCCEEDED'
+            assert first.get_result() == {'calls': 1}
+            assert flaky_handler == [False]
+
+    def test_failed_job_is_requeued_under_the_same_key(self, db, flaky_handler):
+        with flask_app.app_context():
+            failed = enqueue_job('test_flaky', {'fail': True}, key='flaky:2')
+            assert failed.status == 'FAILED'
+            assert failed.error == 'boom'
+            retried = enqueue_job('test_flaky', {'fail': False}, key='flaky:2')
+            assert retried.id == failed.id
+            assert retried.status == 'SUCCEEDED'
+            assert retried.error is None
+
+    def test_job_rows_do_not_bump_the_roster_version(self, db, flaky_handler):
+        with flask_app.app_context():
+            before = get_roster_version()[0]
+            enqueue_job('test_flaky', {'fail': False})
+            assert get_roster_version()[0] == before
+
+    def test_worker_thread_context_claims_and_finishes_job(self, db, flaky_handler):
+        with flask_app.app_context():
+            job = Job(job_type='test_flaky', params=json.dumps({'fail': False}))
+            db.session.add(job)
+            db.session.commit()
+            job_id = job.id
+        _run_job_in_context(job_id)
+        _run_job_in_context(job_id)
+        with flask_app.app_context():
+            assert db.session.get(Job, job_id).status == 'SUCCEEDED'
+            assert flaky_handler == [False]
+
+    def test_compliance_scan_job_is_polled_for_violations(self, client, db):
+        with flask_app.app_context():
+            make_shift_timing(db, 'late', '14:00', '23:00')
+            make_shift_timing(db, 'early', '05:00', '13:00')
+            pattern = make_pattern(db, 'Short Rest', 2, ['late', 'early'])
+            driver = make_driver(db, '1', 'Alice Smith')
+            make_assignment(db, driver, pattern, date(2026, 6, 1))
+        resp = client.post('/compliance/scan', data={'start_date': '2026-06-01', 'end_date': '2026-06-02'})
+        assert resp.status_code == 202
+        status = client.get(resp.get_json()['status_url']).get_json()['job']
+        assert status['status'] == 'SUCCEEDED'
+        assert 'rest' in {v['rule'] for v in status['result']['violations']}
+        assert status['result']['violations'][0]['driver_number'] == '1'
+
+    def test_roster_export_job_links_to_the_file(self, client, db):
+        with flask_app.app_context():
+            TestRosterExport()._setup(db)
+        resp = client.post('/export/roster/jobs', data={'from': '2026-06-01', 'to': '2026-06-03'})
+        status = client.get(resp.get_json()['status_url']).get_json()['job']
+        assert status['status'] == 'SUCCEEDED'
+        download = client.get(status['download_url'])
+        assert download.status_code == 200
+        assert 'roster_2026-06-01_2026-06-03.csv' in download.headers['Content-Disposition']
+        assert len(download.get_data(as_text=True).strip().splitlines()) == 4
+
+    def test_pruned_export_is_rerun(self, app, client, db, tmp_path):
+        with flask_app.app_context():
+            TestRosterExport()._setup(db)
+        app.config['JOB_RESULTS_MAX_FILES'] = 1
+        try:
+            first = client.post('/export/roster/jobs', data={'from': '2026-06-01', 'to': '2026-06-03'}).get_json()
+            client.post('/export/roster/jobs', data={'from': '2026-06-01', 'to': '2026-06-04'})
+            assert len(list(tmp_path.iterdir())) == 1
+            assert 'download_url' not in client.get(first['status_url']).get_json()['job']
+
+            again = client.post('/export/roster/jobs', data={'from': '2026-06-01', 'to': '2026-06-03'}).get_json()
+            assert again['job_id'] == first['job_id']
+            status = client.get(again['status_url']).get_json()['job']
+            assert client.get(status['download_url']).status_code == 200
+        finally:
+            app.config['JOB_RESULTS_MAX_FILES'] = 100
+
+    def test_status_refresh_job_keeps_drafts_like_refresh_status(self, db):
+        with flask_app.app_context():
+            driver = make_driver(db, '1', 'Alice Smith')
+            day = get_operational_date() + timedelta(days=7)
+            draft, covered = (
+                ExtraCarRequest(
+                    date=day, request_type='time_window', window_start=time(9, 0), window_end=time(15, 0),
+                    required_slots=1, status=status,
+                )
+                for status in ('DRAFT', 'OPEN')
+            )
+            db.session.add_all([draft, covered])
+            db.session.flush()
+            for req in (draft, covered):
+                db.session.add(ExtraCarAssignment(request_id=req.id, driver_id=driver.id))
+            db.session.commit()
+
+            assert refresh_extra_car_statuses() == 1
+            assert covered.status == 'FILLED'
+            assert draft.status == 'DRAFT'
+            draft.refresh_status()
+            assert draft.status == 'DRAFT'
+
+    def test_unknown_job_returns_404(self, client, db):
+        resp = client.get('/jobs/999999')
+        assert resp.status_code == 404
+        assert resp.get_json()['success'] is False
+
+
+class TestRosterCacheWarmer:
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        make_shift_timing(db, 'night', '22:00', '06:00')
+        pattern = make_pattern(db, 'Warm Pattern', 2, ['morning', 'night'])
+        alice = make_driver(db, '1', 'Alice Smith')
+        bob = make_driver(db, '2', 'Bob Jones')
+        make_assignment(db, alice, pattern, date(2026, 6, 1))
+        make_assignment(db, bob, pattern, date(2026, 6, 1), start_day_of_cycle=2)
+
+    def test_next_crossover_is_the_coming_six_am(self):
+        assert get_next_operational_crossover(datetime(2026, 6, 1, 5, 55)) == datetime(2026, 6, 1, 6, 0)
+        assert get_next_operational_crossover(datetime(2026, 6, 1, 6, 0)) == datetime(2026, 6, 2, 6, 0)
+
+    def test_first_view_after_warm_up_is_a_cache_hit(self, client, db, monkeypatch):
+        import app as app_module
+        with flask_app.app_context():
+            self._setup(db)
+            assert warm_roster_caches(date(2026, 6, 1)) == [date(2026, 6, 1), date(2026, 6, 2)]
+
+        def fail(*args, **kwargs):
+            raise AssertionError('daily sheet was rebuilt')
+
+        monkeypatch.setattr(app_module, 'build_daily_sheet_context', fail)
+        monkeypatch.setattr(app_module, 'get_drivers_for_dates', fail)
+        monkeypatch.setattr(app_module, 'get_active_assignments_for_date', fail)
+        assert client.get('/daily-sheet/generate?target_date=2026-06-02').status_code == 200
+        assert client.get('/daily-sheet/print?date=2026-06-01').status_code == 200
+        with flask_app.app_context():
+            assert get_dashboard_summary(date(2026, 6, 1))['today_total'] == 2
+            assert get_cars_working_at_time(date(2026, 6, 2), time(23, 0)) == 1
+
+    def test_warmed_dashboard_survives_views_of_the_current_day(self, db, monkeypatch):
+        import app as app_module
+        with flask_app.app_context():
+            self._setup(db)
+            warm_roster_caches(date(2026, 6, 2))
+            get_dashboard_summary(date(2026, 6, 1))
+            monkeypatch.setattr(app_module, 'get_drivers_for_dates', lambda dates: pytest.fail('summary rebuilt'))
+            assert get_dashboard_summary(date(2026, 6, 2))['tomorrow_total'] == 2
+
+    def test_cars_working_curve_follows_shift_times(self, client, db):
+        with flask_app.app_context():
+            self._setup(db)
+            curve = dict(get_cars_working_curve(date(2026, 6, 1), 60))
+            assert curve[time(5, 0)] == 1
+            assert curve[time(9, 0)] == 1
+            assert curve[time(15, 0)] == 0
+            assert curve[time(22, 0)] == 1
+        resp = client.get('/cars-working/curve?date=2026-06-01&step=30')
+        body = resp.get_json()
+        assert len(body['points']) == 48
+        assert body['points'][18] == {'time': '09:00', 'count': 1}
+        assert client.get('/cars-working/curve?date=2026-06-01&step=7').status_code == 400
+
+
+class TestProcessLock:
+    def test_only_one_holder_until_released(self, tmp_path):
+        if fcntl is None:
+            pytest.skip('file locks need fcntl')
+        path = tmp_path / 'job.lock'
+        holder = try_process_lock(path)
+        assert holder is not None
+        assert try_process_lock(path) is None
+        holder.close()
+        again = try_process_lock(path)
+        assert again is not None
+        again.close()
+
+
+class TestBulkPatternAssignment:
+    def _setup(self, db):
+        make_shift_timing(db, 'morning', '06:00', '14:00')
+        base = make_pattern(db, 'Base Rota', 7)
+        temp = make_pattern(db, 'Summer Rota', 2, ['morning', 'day_off'])
+        drivers = [make_driver(db, '1', 'Alice Smith'), make_driver(db, '2', 'Bob Jones')]
+        for driver in drivers:
+            make_assignment(db, driver, base, date(2026, 1, 1), start_day_of_cycle=3)
+        return base.id, temp.id, [driver.id for driver in drivers]
+
+    def _timeline(self, driver_id):
+        assignments = DriverAssignment.query.filter_by(driver_id=driver_id).order_by(
+            DriverAssignment.start_date, DriverAssignment.id
+        ).all()
+        positions = {assignment.id: index for index, assignment in enumerate(assignments)}
+        return [
+            (
+                a.shift_pattern_id, a.start_date, a.end_date, a.start_day_of_cycle, a.original_end_date,
+                positions.get(a.paused_by_assignment_id), positions.get(a.resumes_assignment_id),
+            )
+            for a in assignments
+        ]
+
+    def test_bulk_rows_match_repeated_single_assignments(self, client, db):
+        with flask_app.app_context():
+            base_id, temp_id, (alice_id, bob_id) = self._setup(db)
+        steps = [
+            {'pattern_id': temp_id, 'start_date': '2026-06-01', 'end_date': '2026-06-30', 'start_day_of_cycle': '2'},
+            {'pattern_id': base_id, 'start_date': '2026-06-10', 'end_date': '2026-06-12', 'start_day_of_cycle': '1'},
+        ]
+        for step in steps:
+            client.post(f'/driver/{alice_id}/assign-pattern', data=step)
+        resp = client.post('/assignments/bulk', json={'rows': [
+            {'driver_number': '2', 'pattern': 'Summer Rota', 'start_date': '2026-06-01',
+             'end_date': '2026-06-30', 'start_day_of_cycle': 2},
+            {'driver_number': '2', 'pattern': str(base_id), 'start_date': '2026-06-10',
+             'end_date': '2026-06-12', 'start_day_of_cycle': 1},
+        ]})
+        body = resp.get_json()
+        assert body['assigned'] == 2
+        assert [(r['paused'], r['resumed']) for r in body['results']] == [(1, 1), (1, 1)]
+        with flask_app.app_context():
+            assert self._timeline(bob_id) == self._timeline(alice_id)
+            assert len(self._timeline(bob_id)) == 5
+
+    def test_invalid_rows_are_reported_and_skipped(self, client, db):
+        with flask_app.app_context():
+            _, temp_id, (alice_id, _) = self._setup(db)
+        resp = client.post('/assignments/bulk', json={'rows': [
+            {'driver_number': '99', 'pattern': 'Summer Rota', 'start_date': '2026-06-01'},
+            {'driver_number': '1', 'pattern': 'Summer Rota', 'start_date': '2026-13-01'},
+            {'driver_number': '1', 'pattern': 'Summer Rota', 'start_date': '2026-06-01', 'start_day_of_cycle': 3},
+            {'driver_number': '1', 'pattern': 'Summer Rota', 'start_date': '2026-06-01', 'start_day_of_cycle': 0},
+            {'driver_number': '1', 'pattern': 'summer rota', 'start_date': '2026-06-01'},
+        ]})
+        body = resp.get_json()
+        assert [r['ok'] for r in body['results']] == [False, False, False, False, True]
+        assert body['results'][0]['error'] == 'Unknown driver number: 99'
+        assert 'between 1 and 2' in body['results'][2]['error']
+        assert 'between 1 and 2' in body['results'][3]['error']
+        with flask_app.app_context():
+            assert DriverAssignment.query.filter_by(driver_id=alice_id, shift_pattern_id=temp_id).count() == 1
+
+    def test_csv_import_reports_lines_and_supports_dry_run(self, client, db):
+        import io
+        with flask_app.app_context():
+            _, temp_id, _ = self._setup(db)
+        csv_text = (
+            'driver_number,pattern,start_date,end_date,start_day_of_cycle\n'
+            '1,Summer Rota,2026-06-01,,\n'
+            '\n'
+            '2,No Such Rota,2026-06-01,,\n'
+        )
+        resp = client.post('/assignments/import', data={
+            'file': (io.BytesIO(csv_text.encode('utf-8')), 'rota.csv'), 'dry_run': '1',
+        })
+        body = resp.get_json()
+        assert body['dry_run'] is True
+        assert [(r['line'], r['ok']) for r in body['results']] == [(2, True), (4, False)]
+        with flask_app.app_context():
+            assert DriverAssignment.query.filter_by(shift_pattern_id=temp_id).count() == 0
+
+        resp = client.post('/assignments/import', data={
+            'file': (io.BytesIO(csv_text.encode('utf-8')), 'rota.csv'),
+        })
+        assert resp.get_json()['assigned'] == 1
+        with flask_app.app_context():
+            assert DriverAssignment.query.filter_by(shift_pattern_id=temp_id).count() == 1
+
+    def test_csv_import_requires_columns(self, client, db):
+        resp = client.post('/assignments/import', data='driver_number,start_date\n1,2026-06-01\n',
+                           content_type='text/csv')
+        assert resp.status_code == 400
+        assert 'pattern' in resp.get_json()['error']
+
+
+class TestDriverCsvImportExport:
+    def _post(self, client, csv_text, **data):
+        import io
+        data['file'] = (io.BytesIO(csv_text.encode('utf-8')), 'drivers.csv')
+        return client.post('/drivers/import', data=data, headers={'X-Requested-With': 'XMLHttpRequest'})
+
+    def test_import_upserts_by_driver_number(self, client, db):
+        with flask_app.app_context():
+            driver = make_driver(db, '7', 'Old Name')
+            driver.pet_friendly = True
+            db.session.commit()
+            driver_id = driver.id
+        resp = self._post(client, (
+            'Driver_Number,Name,Car_Type,School_Badge\n'
+            '7,Alice Smith,Estate,Y\n'
+            '8,Bob Jones,Minibus,\n'
+        ))
+        body = resp.get_json()
+        assert (body['created'], body['updated'], body['errors']) == (1, 1, [])
+        with flask_app.app_context():
+            updated = db.session.get(Driver, driver_id)
+            assert (updated.name, updated.car_type, updated.school_badge) == ('Alice Smith', 'Estate', True)
+            # Flag columns missing from the file keep their stored values
+            assert updated.pet_friendly is True
+            assert Driver.query.filter_by(driver_number='8').one().school_badge is False
+
+    def test_invalid_lines_are_reported_and_skipped(self, client, db):
+        resp = self._post(client, (
+            'driver_number,name,car_type,electric_vehicle\n'
+            '1,Alice Smith,Standard,maybe\n'
+            '2,,Standard,\n'
+            '3,Carol White,Estate,yes\n'
+            '3,Carol Again,Estate,\n'
+        ))
+        body = resp.get_json()
+        assert body['created'] == 1
+        assert [error['line'] for error in body['errors']] == [2, 3, 5]
+        assert 'already appears on line 4' in body['errors'][2]['error']
+        with flask_app.app_context():
+            assert [d.name for d in Driver.query.all()] == ['Carol White']
+
+    def test_import_writes_in_batches_and_bumps_roster_version(self, client, db):
+        import io
+        import app as app_module
+        csv_text = 'driver_number,name,car_type\n' + ''.join(f'{n},Driver {n},Standard\n' for n in range(1, 8))
+        with flask_app.app_context():
+            before = get_roster_version()[0]
+            summary = app_module.import_drivers_csv(io.StringIO(csv_text, newline=''), batch_size=3)
+            assert summary['created'] == 7
+            assert Driver.query.count() == 7
+            assert get_roster_version()[0] > before
+
+    def test_dry_run_saves_nothing(self, client, db):
+        resp = self._post(client, 'driver_number,name,car_type\n1,Alice Smith,Standard\n', dry_run='1')
+        assert resp.get_json()['created'] == 1
+        with flask_app.app_context():
+            assert Driver.query.count() == 0
+
+    def test_missing_columns_are_rejected(self, client, db):
+        resp = self._post(client, 'driver_number,name\n1,Alice Smith\n')
+        assert resp.status_code == 400
+        assert 'car_type' in resp.get_json()['error']
+
+    def test_form_post_flashes_summary_and_redirects(self, client, db):
+        import io
+        resp = client.post('/drivers/import', data={
+            'file': (io.BytesIO(b'driver_number,name,car_type\n1,Alice Smith,Standard\n'), 'drivers.csv'),
+        })
+        assert resp.status_code == 302
+        with client.session_transaction() as flask_session:
+            assert ('success', '1 driver(s) added, 0 updated.') in flask_session['_flashes']
+
+    def test_export_round_trips_through_import(self, client, db):
+        with flask_app.app_context():
+            alice = make_driver(db, '1', 'Alice Smith')
+            alice.electric_vehicle = True
+            make_driver(db, '2', 'Bob Jones')
+            db.session.commit()
+        resp = client.get('/export/drivers.csv')
+        assert resp.mimetype == 'text/csv'
+        text = resp.get_data(as_text=True)
+        lines = text.strip().splitlines()
+        assert lines[0] == 'driver_number,name,car_type,school_badge,pet_friendly,assistance_guide_dogs_exempt,electric_vehicle'
+        assert lines[1] == '1,Alice Smith,Standard,,,,Y'
+        body = self._post(client, text).get_json()
+        assert (body['created'], body['updated'], body['errors']) == (0, 2, [])